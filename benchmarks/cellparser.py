@@ -0,0 +1,79 @@
+"""
+Microbenchmark of CellParser.split_into_lists over the cells of the test workbooks.
+
+The reference implementation splits each cell by each separator in turn with
+split_by_separator and then unescapes the result, which is what split_into_lists
+did before it was rewritten as a single scan.
+
+Usage: python benchmarks/cellparser.py [workbook ...]
+"""
+
+import sys
+import timeit
+from pathlib import Path
+
+from rpft.converters import create_sheet_reader
+from rpft.parsers.common.cellparser import CellParser, unescape
+
+ROOT = Path(__file__).parent.parent
+DEFAULT_WORKBOOKS = [
+    ROOT / "tests/input/all_test_flows.xlsx",
+    ROOT / "tests/input/example1/csv_workbook",
+    ROOT / "tests/input/survey_templates",
+]
+
+
+def load_cells(workbooks):
+    cells = []
+
+    for workbook in workbooks:
+        reader = create_sheet_reader(None, str(workbook))
+
+        for sheet in reader.sheets.values():
+            cells += [str(cell) for row in sheet.table for cell in row]
+
+    return cells
+
+
+def reference_split(parser, string):
+    parts = parser.split_by_separator(string, CellParser.SEPARATORS[0])
+
+    if type(parts) is str:
+        output = parser.split_by_separator(string, CellParser.SEPARATORS[1])
+    else:
+        output = [parser.split_by_separator(s, CellParser.SEPARATORS[1]) for s in parts]
+
+    return unescape(output)
+
+
+def main(workbooks):
+    parser = CellParser()
+    cells = load_cells(workbooks)
+    plain = sum(1 for cell in cells if not set(cell) & set("|;\\{"))
+
+    for cell in cells:
+        assert parser.split_into_lists(cell) == reference_split(parser, cell), cell
+
+    reference = min(
+        timeit.repeat(
+            lambda: [reference_split(parser, cell) for cell in cells],
+            number=20,
+            repeat=5,
+        )
+    )
+    current = min(
+        timeit.repeat(
+            lambda: [parser.split_into_lists(cell) for cell in cells],
+            number=20,
+            repeat=5,
+        )
+    )
+
+    print(f"{len(cells)} cells, {plain} plain")
+    print(f"reference:        {reference * 1000 / 20:.2f} ms per pass")
+    print(f"split_into_lists: {current * 1000 / 20:.2f} ms per pass")
+    print(f"speedup:          {reference / current:.1f}x")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:] or DEFAULT_WORKBOOKS)
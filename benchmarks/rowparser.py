@@ -0,0 +1,77 @@
+"""
+Microbenchmark of RowParser.parse_row with FlowRowModel over the flow sheets used
+in the tests.
+
+Every row is parsed as a fresh dict, as is the case for sheets that are only
+parsed once, e.g. flows that are not instantiated from a template.
+
+The reference clears the parse plan cache before every row, so that the field and
+type of every column are resolved again for every row, which is what parse_row did
+before parse plans were cached.
+
+Usage: python benchmarks/rowparser.py [sheet.csv ...]
+"""
+
+import sys
+import timeit
+from pathlib import Path
+
+from rpft.parsers.common.cellparser import CellParser
+from rpft.parsers.common.rowparser import RowParser, get_parse_plan
+from rpft.parsers.creation.flowrowmodel import FlowRowModel
+from rpft.parsers.sheets import load_csv
+
+
+ROOT = Path(__file__).parent.parent
+DEFAULT_SHEETS = [
+    path
+    for path in sorted((ROOT / "tests/input").glob("*.csv"))
+    if path.stem != "master_sheet"
+]
+
+
+def load_rows(paths):
+    rows = []
+
+    for path in paths:
+        table = load_csv(path)
+        rows += [dict(zip(table.headers, row)) for row in table]
+
+    return rows
+
+
+def parse_all(rows):
+    parser = RowParser(FlowRowModel, CellParser())
+
+    return [parser.parse_row(dict(row)) for row in rows]
+
+
+def reference_parse_all(rows):
+    parser = RowParser(FlowRowModel, CellParser())
+    instances = []
+
+    for row in rows:
+        get_parse_plan.cache_clear()
+        instances.append(parser.parse_row(dict(row)))
+
+    return instances
+
+
+def main(paths):
+    rows = load_rows(paths)
+
+    assert reference_parse_all(rows) == parse_all(rows)
+
+    reference = min(
+        timeit.repeat(lambda: reference_parse_all(rows), number=10, repeat=5)
+    )
+    current = min(timeit.repeat(lambda: parse_all(rows), number=10, repeat=5))
+
+    print(f"{len(rows)} rows, {len(FlowRowModel.model_fields)} fields")
+    print(f"reference: {reference * 1000 / 10:.2f} ms per pass")
+    print(f"parse_row: {current * 1000 / 10:.2f} ms per pass")
+    print(f"speedup:   {reference / current:.1f}x")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:] or DEFAULT_SHEETS)
@@ -0,0 +1,140 @@
+"""
+Microbenchmark of universal.parse_table and universal.tabulate on a wide table.
+
+The reference implementations look up and assign every cell through a benedict with
+a list keypath, recomputing the keypaths of the headers for every row, and build
+the regular expressions of parse_cell for every cell, which is what parse_table and
+tabulate did before their key paths and patterns were precomputed.
+
+Usage: python benchmarks/universal.py [columns] [rows]
+"""
+
+import json
+import re
+import sys
+import timeit
+
+from benedict import benedict
+
+from rpft.parsers.universal import (
+    DELIMS,
+    META_KEY,
+    TABULATE_KEY,
+    HEADERS_KEY,
+    is_template,
+    keypaths,
+    parse_table,
+    stringify,
+    tabulate,
+)
+
+
+def wide_table(columns, rows):
+    headers = []
+
+    for i in range(columns // 4):
+        headers += [f"plain{i}", f"obj{i}.name", f"obj{i}.tags", f"list{i}.1"]
+
+    values = ["text", "a | b | c", "k; v | k2; v2", "42", "{{ template }}", "x\\|y"]
+    table = [
+        [values[(row + column) % len(values)] for column in range(len(headers))]
+        for row in range(rows)
+    ]
+
+    return headers, table
+
+
+def reference_parse_cell(s, delimiters=DELIMS, depth=0):
+    clean = s.strip() if s else ""
+
+    try:
+        return int(clean)
+    except Exception:
+        pass
+
+    try:
+        return float(clean)
+    except Exception:
+        pass
+
+    if clean in ("true", "false"):
+        return clean == "true"
+
+    if is_template(clean):
+        return clean
+
+    d = delimiters[depth] if depth < len(delimiters) else ""
+    pattern = rf"(?<!\\)\{d}"
+
+    if d and re.search(pattern, clean):
+        seq = [
+            reference_parse_cell(item, delimiters=delimiters, depth=depth + 1)
+            for item in re.split(pattern, clean)
+        ]
+
+        return seq[:-1] if re.search(rf"(?<!\\)\{d}$", clean) else seq
+
+    delims = delimiters[depth + 1 :]
+
+    if delims and re.search(rf"(?<!\\)[{''.join(delims)}]", clean):
+        return reference_parse_cell(clean, delimiters=delimiters, depth=depth + 1)
+
+    return re.sub(rf"\\([{delimiters}])", r"\g<1>", clean)
+
+
+def reference_parse_table(title, headers, rows):
+    obj = benedict()
+    obj[[META_KEY, TABULATE_KEY, title, HEADERS_KEY]] = headers
+
+    for i, row in enumerate(rows):
+        for h, v in zip(keypaths(headers), row):
+            obj[[title, i] + h] = reference_parse_cell(v)
+
+    return obj
+
+
+def reference_tabulate(data, headers):
+    paths = keypaths(headers)
+
+    return [headers] + [
+        [stringify(benedict(item)[kp]) for kp in paths] for item in data
+    ]
+
+
+def main(columns=100, rows=50):
+    headers, table = wide_table(columns, rows)
+    parsed = parse_table("table", headers, table)
+    data = json.loads(json.dumps(parsed["table"]))
+
+    assert json.dumps(parsed) == json.dumps(
+        reference_parse_table("table", headers, table)
+    )
+    assert tabulate(data, {"headers": headers}) == reference_tabulate(data, headers)
+
+    timings = [
+        (
+            "parse_table",
+            lambda: reference_parse_table("table", headers, table),
+            lambda: parse_table("table", headers, table),
+        ),
+        (
+            "tabulate",
+            lambda: reference_tabulate(data, headers),
+            lambda: tabulate(data, {"headers": headers}),
+        ),
+    ]
+
+    print(f"{len(headers)} columns, {rows} rows")
+
+    for name, reference, current in timings:
+        reference = min(timeit.repeat(reference, number=1, repeat=3))
+        current = min(timeit.repeat(current, number=1, repeat=3))
+
+        print(
+            f"{name}: reference {reference * 1000:.0f} ms,"
+            f" current {current * 1000:.0f} ms, speedup {reference / current:.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main(*[int(arg) for arg in sys.argv[1:]])
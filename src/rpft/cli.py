@@ -2,29 +2,50 @@ import argparse
 import json
 
 from rpft import converters
+from rpft.parsers.creation.buildcache import BuildCache
+from rpft.parsers.sheets import GoogleSheetCache
+from rpft.rapidpro.diff import format_diff
 from rpft.logger.logger import initialize_main_logger
 
 
 def main():
     initialize_main_logger()
-    args = create_parser().parse_args()
+    parser = create_parser()
+    args = parser.parse_args()
+
+    if getattr(args, "explain", False) and not args.cache:
+        parser.error("--explain requires --cache")
+
+    if getattr(args, "workbook", False) and args.format not in (None, "xlsx"):
+        parser.error("--workbook writes XLSX, so -f/--format must be xlsx if given")
+
     args.func(args)
 
 
 def create_flows(args):
-    flows = converters.create_flows(
+    build_cache = BuildCache(args.cache, args.datamodels) if args.cache else None
+    converters.export_flows(
         args.input,
-        None,
+        args.output,
         args.format,
         data_models=args.datamodels,
         tags=args.tags,
+        jobs=args.jobs,
+        build_cache=build_cache,
+        sheet_cache=GoogleSheetCache(args.sheet_cache) if args.sheet_cache else None,
+        uuid_namespace=args.uuid_namespace,
     )
 
-    with open(args.output, "w", encoding="utf-8") as export:
-        json.dump(flows, export, indent=4)
+    if args.explain:
+        for name, reason in build_cache.explanations:
+            print(f"{name}: {reason}")
 
 
 def convert_to_json(args):
+    if args.to == "snapshot":
+        converters.convert_to_snapshot(args.input, args.format, args.output)
+        return
+
     content = converters.convert_to_json(args.input, args.format)
 
     with open(args.output, "wb") as export:
@@ -33,20 +54,33 @@ def convert_to_json(args):
 
 def flows_to_sheets(args):
     converters.flows_to_sheets(
-        args.input, args.output, args.format, args.strip_uuids, args.numbered
+        args.input,
+        args.output,
+        args.format or "csv",
+        args.strip_uuids,
+        args.numbered,
+        jobs=args.jobs,
+        workbook=args.workbook,
     )
 
 
+def diff(args):
+    changes = converters.diff_exports(args.old, args.new)
+
+    for line in format_diff(changes):
+        print(line)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(changes, f, indent=2, ensure_ascii=False)
+
+
 def uni_to_sheets(args):
-    with open(args.output, "wb") as handle:
-        handle.write(converters.uni_to_sheets(args.input))
+    converters.uni_to_sheets(args.input, args.output)
 
 
 def sheets_to_uni(args):
-    data = converters.sheets_to_uni(args.input)
-
-    with open(args.output, "w", encoding="utf-8") as f:
-        json.dump(data, f, indent=2)
+    converters.sheets_to_uni(args.input, args.output)
 
 
 def create_parser():
@@ -62,6 +96,7 @@ def create_parser():
     _add_create_command(sub)
     _add_convert_command(sub)
     _add_flows_to_sheets_command(sub)
+    _add_diff_command(sub)
     _add_uni_to_sheets_command(sub)
     _add_sheets_to_uni_command(sub)
 
@@ -113,10 +148,44 @@ def _add_create_command(sub):
     parser.add_argument(
         "-f",
         "--format",
-        choices=["csv", "google_sheets", "json", "uni", "xlsx"],
+        choices=["csv", "google_sheets", "json", "snapshot", "uni", "xlsx"],
         help="input sheet format",
         required=True,
     )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=1,
+        help="number of worker processes used to generate flows (default: 1)",
+    )
+    parser.add_argument(
+        "--cache",
+        help=(
+            "path to a build cache file; flows whose inputs have not changed since the"
+            " previous build are taken from the cache instead of being regenerated"
+        ),
+    )
+    parser.add_argument(
+        "--explain",
+        action="store_true",
+        help="list the flows that were not taken from the build cache, and why",
+    )
+    parser.add_argument(
+        "--sheet-cache",
+        help=(
+            "directory in which to cache Google Sheets inputs; spreadsheets that have"
+            " not been modified since they were cached are not downloaded again"
+        ),
+    )
+    parser.add_argument(
+        "--uuid-namespace",
+        help=(
+            "UUID or any string from which to derive the UUIDs of the generated flows,"
+            " so that identical inputs produce identical output; by default, UUIDs are"
+            " random"
+        ),
+    )
 
 
 def _add_convert_command(sub):
@@ -126,10 +195,19 @@ def _add_convert_command(sub):
     parser.add_argument(
         "-f",
         "--format",
-        choices=["csv", "google_sheets", "json", "xlsx"],
+        choices=["csv", "google_sheets", "json", "snapshot", "xlsx"],
         help="input sheet format",
         required=True,
     )
+    parser.add_argument(
+        "--to",
+        choices=["json", "snapshot"],
+        default="json",
+        help=(
+            "output format; a snapshot is a compact binary file that loads much"
+            " faster than JSON or XLSX (default: json)"
+        ),
+    )
     parser.add_argument(
         "input",
         help=(
@@ -139,7 +217,7 @@ def _add_convert_command(sub):
     )
     parser.add_argument(
         "output",
-        help=("path to output JSON file"),
+        help=("path to output JSON or snapshot file"),
     )
 
 
@@ -163,8 +241,23 @@ def _add_flows_to_sheets_command(sub):
         "-f",
         "--format",
         choices=["csv", "xlsx"],
-        help="desired sheet format (default: csv)",
-        default="csv",
+        help="desired sheet format (default: csv, or xlsx if --workbook is given)",
+    )
+    parser.add_argument(
+        "--workbook",
+        action="store_true",
+        help=(
+            "write all flows to a single XLSX workbook, one sheet per flow, and a"
+            " '_flows' sheet listing the flow of each sheet; the output is then the"
+            " path of the workbook"
+        ),
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=1,
+        help="number of worker processes used to convert flows (default: 1)",
     )
     parser.add_argument(
         "input",
@@ -172,7 +265,29 @@ def _add_flows_to_sheets_command(sub):
     )
     parser.add_argument(
         "output",
-        help=("output folder"),
+        help=("output folder, or output XLSX file if --workbook is given"),
+    )
+
+
+def _add_diff_command(sub):
+    parser = sub.add_parser(
+        "diff",
+        help="list the changes between two RapidPro JSON exports",
+    )
+
+    parser.set_defaults(func=diff)
+    parser.add_argument(
+        "old",
+        help=("path to the old RapidPro JSON file"),
+    )
+    parser.add_argument(
+        "new",
+        help=("path to the new RapidPro JSON file"),
+    )
+    parser.add_argument(
+        "-o",
+        "--output",
+        help="path of a JSON file to which to write the changes in full",
     )
 
 
@@ -188,7 +303,10 @@ def _add_uni_to_sheets_command(sub):
     )
     parser.add_argument(
         "output",
-        help=("location where sheets will be saved"),
+        help=(
+            "location where sheets will be saved, in XLSX format if it ends in"
+            " '.xlsx', or ODS format otherwise"
+        ),
     )
 
 
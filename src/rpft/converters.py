@@ -1,14 +1,27 @@
 import json
 import logging
 import os
+import re
 import shutil
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
+from openpyxl import Workbook
 from tablib import Databook, Dataset
 
-from rpft.parsers.universal import UniJSONReader, bookify, parse_tables
+from rpft.parsers.common.cellparser import template_cache_info
+from rpft.parsers.common.model_inference import model_cache_info
+from rpft.parsers.universal import (
+    SHEET_TITLES,
+    UniJSONReader,
+    dump_entries,
+    parse_tables,
+    stream_book,
+    stream_tables,
+)
 from rpft.parsers.creation.contentindexparser import ContentIndexParser
 from rpft.parsers.creation.tagmatcher import TagMatcher
+from rpft.parsers.snapshot import SnapshotSheetReader, write_snapshot
 from rpft.parsers.sheets import (
     AbstractSheetReader,
     CSVSheetReader,
@@ -16,23 +29,40 @@ from rpft.parsers.sheets import (
     JSONSheetReader,
     ODSSheetReader,
     XLSXSheetReader,
+    create_google_sheet_readers,
 )
-from rpft.rapidpro.models.containers import RapidProContainer
+from rpft.rapidpro import diff as rapidpro_diff
+from rpft.rapidpro.models.containers import FlowContainer
 from rpft.sources import JSONDataSource, SheetDataSource
 
 
 LOGGER = logging.getLogger(__name__)
+XLSX_INVALID_TITLE = re.compile(r"[\\*?:/\[\]]")
+XLSX_TITLE_LENGTH = 31
+# Sheet of a workbook written by flows_to_sheets listing the flow of each sheet
+FLOW_INDEX = "_flows"
 FMT_READER_MAP = {
     "csv": CSVSheetReader,
     "google_sheets": GoogleSheetReader,
     "json": JSONSheetReader,
     "ods": ODSSheetReader,
+    "snapshot": SnapshotSheetReader,
     "uni": UniJSONReader,
     "xlsx": XLSXSheetReader,
 }
 
 
-def create_flows(input_files, output_file, sheet_format, data_models=None, tags=[]):
+def create_flows(
+    input_files,
+    output_file,
+    sheet_format,
+    data_models=None,
+    tags=[],
+    jobs=1,
+    build_cache=None,
+    sheet_cache=None,
+    uuid_namespace=None,
+):
     """
     Convert source spreadsheet(s) into RapidPro flows.
 
@@ -41,19 +71,34 @@ def create_flows(input_files, output_file, sheet_format, data_models=None, tags=
     :param sheet_format: format of the spreadsheets
     :param data_models: name of module containing supporting Python data classes
     :param tags: names of tags to be used to filter the source spreadsheets
+    :param jobs: number of worker processes used to generate flows
+    :param build_cache: BuildCache from which to reuse flows whose inputs have not
+        changed; it is updated with the flows of this build
+    :param sheet_cache: GoogleSheetCache from which to take Google spreadsheets that
+        have not been modified since they were last fetched
+    :param uuid_namespace: UUID or string from which to derive the UUIDs of the
+        generated flows, so that identical inputs produce identical output; by
+        default, UUIDs are random
     :returns: dict representing the RapidPro import/export format.
     """
 
     try:
-        flows = (
-            get_content_index_parser(input_files, sheet_format, data_models, tags)
-            .parse_all()
-            .render()
-        )
+        flows = _create_container(
+            input_files,
+            sheet_format,
+            data_models,
+            tags,
+            jobs,
+            build_cache,
+            sheet_cache,
+            uuid_namespace,
+        ).render()
     except Exception as e:
         LOGGER.critical(e.args[0] if e.args else e.__class__.__name__)
         raise
 
+    _log_template_cache_info()
+
     if output_file:
         with open(output_file, "w", encoding="utf8") as export:
             json.dump(flows, export, indent=4)
@@ -61,31 +106,220 @@ def create_flows(input_files, output_file, sheet_format, data_models=None, tags=
     return flows
 
 
-def uni_to_sheets(infile) -> bytes:
-    with open(infile, "r") as handle:
-        data = json.load(handle)
+def export_flows(
+    input_files,
+    output_file,
+    sheet_format,
+    data_models=None,
+    tags=[],
+    jobs=1,
+    build_cache=None,
+    sheet_cache=None,
+    uuid_namespace=None,
+):
+    """
+    Convert source spreadsheet(s) into RapidPro flows and write them to a JSON file.
 
-    sheets = bookify(data)
-    book = Databook(
-        [Dataset(*table[1:], headers=table[0], title=name) for name, table in sheets]
+    Unlike create_flows, flows are rendered and written one at a time, so the full
+    RapidPro import/export dict is never held in memory.
+
+    :param input_files: list of source spreadsheets to convert
+    :param output_file: path of file to export flows to as JSON
+    :param sheet_format: format of the spreadsheets
+    :param data_models: name of module containing supporting Python data classes
+    :param tags: names of tags to be used to filter the source spreadsheets
+    :param jobs: number of worker processes used to generate flows
+    :param build_cache: BuildCache from which to reuse flows whose inputs have not
+        changed; it is updated with the flows of this build
+    :param sheet_cache: GoogleSheetCache from which to take Google spreadsheets that
+        have not been modified since they were last fetched
+    :param uuid_namespace: UUID or string from which to derive the UUIDs of the
+        generated flows, so that identical inputs produce identical output; by
+        default, UUIDs are random
+    :returns: None.
+    """
+
+    try:
+        container = _create_container(
+            input_files,
+            sheet_format,
+            data_models,
+            tags,
+            jobs,
+            build_cache,
+            sheet_cache,
+            uuid_namespace,
+        )
+
+        with open(output_file, "w", encoding="utf-8") as export:
+            container.render_to_stream(export, indent=4)
+    except Exception as e:
+        LOGGER.critical(e.args[0] if e.args else e.__class__.__name__)
+        raise
+
+    _log_template_cache_info()
+
+
+def _create_container(
+    input_files,
+    sheet_format,
+    data_models,
+    tags,
+    jobs,
+    build_cache,
+    sheet_cache,
+    uuid_namespace,
+):
+    parser = get_content_index_parser(
+        input_files, sheet_format, data_models, tags, sheet_cache
     )
 
-    return book.export("ods")
+    try:
+        container = parser.parse_all(
+            jobs=jobs, build_cache=build_cache, uuid_namespace=uuid_namespace
+        )
+    finally:
+        parser.data_source.close()
+
+    if build_cache:
+        build_cache.save()
+
+    return container
+
+
+def _log_template_cache_info():
+    LOGGER.debug(f"Compiled template cache: {template_cache_info()}")
+    LOGGER.debug(f"Inferred model cache: {model_cache_info()}")
+
+
+def uni_to_sheets(infile, outfile=None):
+    """
+    Convert JSON in the universal format to sheets, decoding and tabulating one
+    table at a time.
+
+    Args:
+        infile: location of the JSON file
+        outfile: location of the workbook to write, in XLSX format if it ends in
+            '.xlsx', and in ODS format otherwise
+
+    Returns:
+        The workbook in ODS format, as bytes, if outfile is not given.
+    """
+    with open(infile, "r") as handle:
+        text = handle.read()
+
+    sheets = stream_book(text)
+
+    if outfile and Path(outfile).suffix.lower() == ".xlsx":
+        write_xlsx(sheets, outfile)
+
+        return None
+
+    # odfpy builds the whole document in memory, so ODS cannot be written
+    # progressively
+    book = Databook()
+
+    for name, table in sheets:
+        book.add_sheet(Dataset(*table[1:], headers=table[0], title=name))
+
+    data = book.export("ods")
+
+    if not outfile:
+        return data
+
+    with open(outfile, "wb") as handle:
+        handle.write(data)
+
+
+def write_xlsx(sheets, outfile, index=None):
+    """
+    Write named tables to an XLSX file, one row at a time.
+
+    Names that are not valid sheet titles are changed, see xlsx_sheet_title, and a
+    warning is logged for each of them.
+
+    Args:
+        sheets: pairs of names and tables, each a list of rows
+        outfile: location of the workbook to write
+        index: title and headers of a last sheet, listing the title of each sheet
+            with its name; by default, the SHEET_TITLES sheet is only added if any
+            name was changed, so that sheets_to_uni can restore the names
+    """
+    workbook = Workbook(write_only=True)
+    taken = {(index[0] if index else SHEET_TITLES).lower()}
+    entries = []
+
+    for name, table in sheets:
+        title = xlsx_sheet_title(name, taken)
+        entries.append((title, name))
+
+        if title != name:
+            LOGGER.warning(f"Sheet '{name}' is written with the title '{title}'")
 
+        worksheet = workbook.create_sheet(title)
 
-def sheets_to_uni(infile) -> list:
-    return parse_tables(create_sheet_reader(None, infile))
+        for row in table:
+            worksheet.append(row)
 
+    if index is None and any(title != name for title, name in entries):
+        index = (SHEET_TITLES, ["sheet", "title"])
 
-def get_content_index_parser(input_files, sheet_format, data_models, tags):
+    if index:
+        title, headers = index
+        worksheet = workbook.create_sheet(title)
+        worksheet.append(headers)
+
+        for entry in entries:
+            worksheet.append(entry)
+
+    workbook.save(outfile)
+
+
+def xlsx_sheet_title(name, taken):
+    """
+    Valid XLSX sheet title for a name: characters that are not allowed are replaced
+    by '-', and the title is cut to 31 characters. Titles are made unique, ignoring
+    case, among those in taken, by a numbered suffix, and added to taken.
+    """
+    base = XLSX_INVALID_TITLE.sub("-", name)[:XLSX_TITLE_LENGTH] or "Sheet"
+    title = base
+    n = 1
+
+    while title.lower() in taken:
+        suffix = f"-{n}"
+        title = base[: XLSX_TITLE_LENGTH - len(suffix)] + suffix
+        n += 1
+
+    taken.add(title.lower())
+
+    return title
+
+
+def sheets_to_uni(infile, outfile=None):
+    """
+    Convert sheets to JSON in the universal format.
+
+    If outfile is given, the JSON is written to it one top-level entry at a time,
+    and nothing is returned. Otherwise, the nested structure is returned.
+    """
+    reader = create_sheet_reader(None, infile)
+
+    if not outfile:
+        return parse_tables(reader)
+
+    with open(outfile, "w", encoding="utf-8") as handle:
+        dump_entries(stream_tables(reader), handle, indent=2)
+
+
+def get_content_index_parser(
+    input_files, sheet_format, data_models, tags, sheet_cache=None
+):
     if not sheet_format and not data_models:
         return ContentIndexParser(
             JSONDataSource(input_files), data_models, TagMatcher(tags)
         )
 
-    readers = [
-        create_sheet_reader(sheet_format, input_file) for input_file in input_files
-    ]
+    readers = create_sheet_readers(sheet_format, input_files, sheet_cache)
 
     return ContentIndexParser(SheetDataSource(readers), data_models, TagMatcher(tags))
 
@@ -102,36 +336,152 @@ def convert_to_json(input_file, sheet_format):
     return to_json(create_sheet_reader(sheet_format, input_file))
 
 
+def convert_to_snapshot(input_file, sheet_format, output_file):
+    """
+    Convert source spreadsheet(s) into a binary workbook snapshot.
+
+    :param input_file: source spreadsheet to convert
+    :param sheet_format: format of the input spreadsheet
+    :param output_file: path of the snapshot file to write
+    :returns: None.
+    """
+
+    reader = create_sheet_reader(sheet_format, input_file)
+
+    with open(output_file, "wb") as f:
+        write_snapshot(reader, f)
+
+
 def flows_to_sheets(
-    input_file, output_folder, format="csv", strip_uuids=False, numbered=False
+    input_file,
+    output_folder,
+    format="csv",
+    strip_uuids=False,
+    numbered=False,
+    jobs=1,
+    workbook=False,
 ):
     """
     Convert source RapidPro JSON to spreadsheet(s).
 
-    Each flow in the JSON will become a separate output file.
+    Each flow in the JSON will become a separate output file, or a separate sheet of
+    a single XLSX workbook if workbook is set. Flow names are made valid sheet
+    titles as in write_xlsx, and a last sheet, FLOW_INDEX, lists the title of each
+    sheet with the name of its flow.
 
     :param input_file: source JSON file to convert
-    :param output_folder: destination folder for output files
-    :param format: Output file format.
+    :param output_folder: destination folder for output files, or path of the output
+        workbook if workbook is set
+    :param format: Output file format, not used if workbook is set.
     :param strip_uuids: Strip all UUIDs from output to allow for comparing outputs.
     :param numbered: Use sequential numbers instead of short reps for row IDs.
+    :param jobs: number of worker processes used to convert flows
+    :param workbook: Write all flows to a single XLSX workbook, one sheet per flow.
     :returns: None.
     """
     with open(input_file, "r", encoding="utf-8") as f:
-        data = json.load(f)
-    container = RapidProContainer.from_dict(data)
-    for flow in container.flows:
-        rds = flow.to_row_data_sheet(strip_uuids, numbered)
-        rds.export(os.path.join(output_folder, f"{flow.name}.{format}"), format)
+        flows = json.load(f)["flows"]
+
+    if workbook:
+        tasks = [(flow, strip_uuids, numbered) for flow in flows]
+        write_xlsx(
+            (
+                (dataset.title, [dataset.headers or [], *dataset])
+                for dataset in _map_flows(_flow_to_dataset, tasks, jobs)
+            ),
+            output_folder,
+            index=(FLOW_INDEX, ["sheet", "flow"]),
+        )
+    else:
+        tasks = [
+            (
+                flow,
+                os.path.join(output_folder, f"{flow['name']}.{format}"),
+                format,
+                strip_uuids,
+                numbered,
+            )
+            for flow in flows
+        ]
+
+        for _ in _map_flows(_export_flow, tasks, jobs):
+            pass
+
+
+def _map_flows(func, tasks, jobs):
+    # Workers are only sent the dict of the flow they convert.
+    if jobs > 1 and len(tasks) > 1:
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            yield from executor.map(func, *zip(*tasks))
+    else:
+        for task in tasks:
+            yield func(*task)
+
+
+def _flow_to_dataset(flow, strip_uuids, numbered):
+    # Each flow is converted only once, so its dict is handed over without copying.
+    title = flow["name"]
+    dataset = (
+        FlowContainer.from_dict(flow, owned=True)
+        .to_row_data_sheet(strip_uuids, numbered)
+        .convert_to_tablib()
+    )
+    dataset.title = title
+
+    return dataset
+
+
+def _export_flow(flow, path, format, strip_uuids, numbered):
+    FlowContainer.from_dict(flow, owned=True).to_row_data_sheet(
+        strip_uuids, numbered
+    ).export(path, format)
+
+
+def diff_exports(old_file, new_file):
+    """
+    Compare two RapidPro JSON exports, see rpft.rapidpro.diff.diff_exports.
+
+    :param old_file: path of the old RapidPro JSON export
+    :param new_file: path of the new RapidPro JSON export
+    :returns: dict describing the changes from the old to the new export.
+    """
+    with open(old_file, "r", encoding="utf-8") as f:
+        old = json.load(f)
+
+    with open(new_file, "r", encoding="utf-8") as f:
+        new = json.load(f)
+
+    return rapidpro_diff.diff_exports(old, new, owned=True)
 
 
 def create_sheet_reader(sheet_format, input_file):
+    return get_reader_class(sheet_format, input_file)(input_file)
+
+
+def create_sheet_readers(sheet_format, input_files, sheet_cache=None):
+    """
+    Create a reader for each of the input files. Google spreadsheets are fetched
+    concurrently, and taken from sheet_cache if they have not been modified.
+    """
+    classes = [get_reader_class(sheet_format, f) for f in input_files]
+    google_ids = [f for f, cls in zip(input_files, classes) if cls is GoogleSheetReader]
+    google_readers = dict(
+        zip(google_ids, create_google_sheet_readers(google_ids, sheet_cache))
+    )
+
+    return [
+        google_readers[f] if cls is GoogleSheetReader else cls(f)
+        for f, cls in zip(input_files, classes)
+    ]
+
+
+def get_reader_class(sheet_format, input_file):
     cls = FMT_READER_MAP.get(sheet_format) or next(
         reader for reader in FMT_READER_MAP.values() if reader.can_process(input_file)
     )
 
     if cls:
-        return cls(input_file)
+        return cls
 
     raise Exception(f"Format not supported, file={input_file}")
 
@@ -139,13 +489,16 @@ def create_sheet_reader(sheet_format, input_file):
 def sheets_to_csv(path, sheet_ids):
     prepare_dir(path)
 
-    for sid in sheet_ids:
-        sheet_to_csv(path, sid)
+    for reader in create_google_sheet_readers(sheet_ids):
+        write_sheets_to_csv(path, reader)
 
 
 def sheet_to_csv(path, sheet_id):
-    workbook_dir = prepare_dir(Path(path) / sheet_id)
-    reader = GoogleSheetReader(sheet_id)
+    write_sheets_to_csv(path, GoogleSheetReader(sheet_id))
+
+
+def write_sheets_to_csv(path, reader):
+    workbook_dir = prepare_dir(Path(path) / reader.name)
 
     for name, sheet in reader.sheets.items():
         with open(
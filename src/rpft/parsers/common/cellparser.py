@@ -1,13 +1,26 @@
 import logging
 import re
+from collections import ChainMap
+from functools import lru_cache
 
 from jinja2 import ChainableUndefined, Environment, contextfilter
-from jinja2.nativetypes import NativeEnvironment
+from jinja2.nativetypes import NativeEnvironment, native_concat
 
 
 LOGGER = logging.getLogger(__name__)
 
 
+TEMPLATE_CACHE_SIZE = 4096
+
+# Characters that make a cell more than plain text, as far as splitting goes
+SPECIAL_CHARACTERS = re.compile(r"[|;\\]")
+
+# Runs of text, including escaped characters, and unescaped separators
+TOKENS = re.compile(r"(?:[^|;\\]+|\\.?)+|[|;]", re.DOTALL)
+
+ESCAPED_CHARACTER = re.compile(r"\\(.{1})")
+
+
 class CellParserError(Exception):
     pass
 
@@ -32,24 +45,50 @@ class CellParser:
         return eval(string, {}, context)
 
     def __init__(self):
-        self.env = Environment(undefined=ChainableUndefined)
-        self.env.filters["escape"] = CellParser.escape_string
-        self.env.filters["eval"] = CellParser.evaluate_string
-        self.native_env = NativeEnvironment(
-            variable_start_string="{@",
-            variable_end_string="@}",
-            undefined=ChainableUndefined,
-        )
-        self.native_env.filters["escape"] = CellParser.escape_string
-        self.native_env.filters["eval"] = CellParser.evaluate_string
+        self.env = ENVIRONMENTS["default"]
+        self.native_env = ENVIRONMENTS["native"]
 
     def split_into_lists(self, string):
-        l1 = self.split_by_separator(string, CellParser.SEPARATORS[0])
-        if type(l1) is str:
-            output = self.split_by_separator(string, CellParser.SEPARATORS[1])
-        else:
-            output = [self.split_by_separator(s, CellParser.SEPARATORS[1]) for s in l1]
-        return unescape(output)
+        """
+        Split a cell into a string, a list of strings or a list whose elements are
+        strings or lists of strings, according to the (unescaped) separators it
+        contains. Elements are stripped and unescaped.
+
+        Equivalent to splitting by the first separator and then each of the parts by
+        the second separator using split_by_separator, followed by unescape, but
+        done in a single scan of the cell.
+        """
+        if not SPECIAL_CHARACTERS.search(string):
+            return string.strip()
+
+        outer_sep, inner_sep = CellParser.SEPARATORS
+        segments = []
+        fields = []
+        field = ""
+        previous = None
+        is_split = False
+
+        for token in TOKENS.findall(string):
+            if token == outer_sep:
+                fields.append(field)
+                segments.append(close_segment(fields, previous == inner_sep))
+                fields = []
+                field = ""
+                is_split = True
+            elif token == inner_sep:
+                fields.append(field)
+                field = ""
+            else:
+                field = token
+
+            previous = token
+
+        # A trailing separator does not start a new (empty) element
+        if previous != outer_sep:
+            fields.append(field)
+            segments.append(close_segment(fields, previous == inner_sep))
+
+        return segments if is_split else segments[0]
 
     def split_by_separator(self, string, sep):
         pos = 0
@@ -97,13 +136,17 @@ class CellParser:
 
         stripped = str(value).strip()
 
-        if context is None or (not context and "{" not in stripped):
+        # Cells without braces contain no template. Rendering them would only
+        # normalise line endings, which has never been done without a context.
+        if context is None or (
+            "{" not in stripped and (not context or "\r" not in stripped)
+        ):
             return stripped, is_object
 
-        env = self.env
+        env_kind = "default"
 
         if stripped.startswith("{@") and stripped.endswith("@}"):
-            env = self.native_env
+            env_kind = "native"
             is_object = True
 
             # Ensure this is a single template, not e.g. '{@ x @} {@ y @}'
@@ -114,7 +157,7 @@ class CellParser:
                 )
 
         try:
-            return env.from_string(stripped).render(context), is_object
+            return render_template(env_kind, stripped, context), is_object
         except Exception as e:
             raise Exception(
                 f'Error while parsing cell "{stripped}" with context "{context}":'
@@ -148,6 +191,82 @@ class CellParser:
             )
 
 
+def create_environment(kind):
+    if kind == "native":
+        env = NativeEnvironment(
+            variable_start_string="{@",
+            variable_end_string="@}",
+            undefined=ChainableUndefined,
+        )
+    else:
+        env = Environment(undefined=ChainableUndefined)
+
+    env.filters["escape"] = CellParser.escape_string
+    env.filters["eval"] = CellParser.evaluate_string
+
+    return env
+
+
+ENVIRONMENTS = {kind: create_environment(kind) for kind in ["default", "native"]}
+
+
+@lru_cache(maxsize=TEMPLATE_CACHE_SIZE)
+def get_template(env_kind, source):
+    """
+    Compile a template once and share it between all CellParser instances.
+
+    Args:
+        env_kind: "default" for string templates, "native" for {@ ... @} templates
+        source: template source, i.e. the stripped cell content
+    """
+    return ENVIRONMENTS[env_kind].from_string(source)
+
+
+CONCAT = {"default": "".join, "native": native_concat}
+
+
+def render_template(env_kind, source, context):
+    """
+    Render a template with the given context, which may be any mapping, such as a
+    ChainMap of scopes.
+
+    Unlike Template.render, the context is not copied into a new dict, which would
+    happen for every cell that is rendered.
+    """
+    template = get_template(env_kind, source)
+    jinja_context = template.new_context(ChainMap(context, template.globals), True)
+
+    try:
+        return CONCAT[env_kind](template.root_render_func(jinja_context))
+    except Exception:
+        return template.environment.handle_exception()
+
+
+def template_cache_info():
+    """Hit/miss counters of the compiled template cache."""
+    return get_template.cache_info()
+
+
+def clear_template_cache():
+    get_template.cache_clear()
+
+
+def close_segment(fields, trailing_separator):
+    if len(fields) == 1:
+        return unescape_string(fields[0])
+
+    if trailing_separator:
+        fields = fields[:-1]
+
+    return [unescape_string(field) for field in fields]
+
+
+def unescape_string(string):
+    string = string.strip()
+
+    return ESCAPED_CHARACTER.sub(r"\g<1>", string) if "\\" in string else string
+
+
 def unescape(nested_list):
     """Unescape escaped characters"""
     return (
@@ -1,4 +1,5 @@
 from collections import defaultdict
+from functools import lru_cache
 from typing import List, ForwardRef, _eval_type
 from pydoc import locate
 from pydantic import create_model
@@ -14,6 +15,7 @@ from rpft.parsers.common.rowparser import (
 )
 
 
+@lru_cache(maxsize=None)
 def type_from_string(string):
     if not string:
         # By default, assume str
@@ -79,9 +81,32 @@ def dict_to_list(dict):
 
 
 def model_from_headers(name, headers):
+    """
+    Create a model for the rows of a sheet from its headers.
+
+    Models are cached, so that sheets with the same name and headers share a model,
+    which is only created once. Headers are stripped of surrounding whitespace, as
+    the row parser does, so headers that only differ by it share a model. Their
+    case is kept, as field names are case-sensitive.
+    """
+    return _cached_model_from_headers(name, tuple(header.strip() for header in headers))
+
+
+@lru_cache(maxsize=None)
+def _cached_model_from_headers(name, headers):
     return model_from_headers_rec(name, headers)[0]
 
 
+def model_cache_info():
+    """Hit/miss counters of the inferred model cache."""
+    return _cached_model_from_headers.cache_info()
+
+
+def clear_model_cache():
+    _cached_model_from_headers.cache_clear()
+    type_from_string.cache_clear()
+
+
 def model_from_headers_rec(name, headers):
     # Returns a model and a default value
     fields = {}
@@ -1,4 +1,3 @@
-import networkx as nx
 import tablib
 
 
@@ -54,47 +53,75 @@ class RowDataSheet:
           A tablib.Dataset representation of the data.
         """
 
+        row_dicts = self._unparse_rows()
         data = tablib.Dataset()
-        data.headers = self._get_headers()
-        for row in self.rows:
-            row_dict = self.row_parser.unparse_row(
-                row, self.target_headers, self.excluded_headers
-            )
+        data.headers = get_headers(row_dicts)
+        for row_dict in row_dicts:
             data.append([row_dict.get(header, "") for header in data.headers])
         return data
 
+    def _unparse_rows(self):
+        return [
+            self.row_parser.unparse_row(row, self.target_headers, self.excluded_headers)
+            for row in self.rows
+        ]
+
     def _get_headers(self):
         """
         Get an ordered list of column headers.
-        Each row contains a subset of the final set of column headers.
-        These subsets need to be merged while respecting the relative order
-        within each row. Note: The resulting set of headers is unique,
-        however, their order is not guaranteed to be unique.
-        TODO: A better approach would be to use the DataModel of the rows
-        to uniquely infer the order of the headers.
+
         Return:
             A list of strings representing the column headers of the sheet.
         """
+        return get_headers(self._unparse_rows())
+
+
+def get_headers(row_dicts):
+    """
+    Get an ordered list of column headers from rows converted to flat dicts.
+
+    Each row contains a subset of the final set of column headers.
+    These subsets need to be merged while respecting the relative order
+    within each row. Note: The resulting set of headers is unique,
+    however, their order is not guaranteed to be unique.
+    TODO: A better approach would be to use the DataModel of the rows
+    to uniquely infer the order of the headers.
+    Return:
+        A list of strings representing the column headers of the sheet.
+    """
+
+    # Create a graph (representing a poset) whose nodes are the column headers,
+    # and whose edges A -> B represent that column header A should come before
+    # column header B. Nodes and the children of each node are kept in order of
+    # insertion, so that the resulting order is deterministic.
+    children = {}
+    in_degree = {}
+    for row_dict in row_dicts:
+        k_prev = None
+        # For each pair of consecutive headers in this row, add an edge.
+        for k in row_dict:
+            if k_prev:
+                children.setdefault(k_prev, {})
+                children.setdefault(k, {})
+                in_degree.setdefault(k_prev, 0)
+                in_degree.setdefault(k, 0)
+                if k not in children[k_prev]:
+                    children[k_prev][k] = None
+                    in_degree[k] += 1
+            k_prev = k
+
+    # We now get a linear order of our headers from this poset graph
+    # by doing a topological sort (Kahn's algorithm, using a stack).
+    ordering = []
+    zero_in_degree = [k for k, degree in in_degree.items() if degree == 0]
+    while zero_in_degree:
+        k = zero_in_degree.pop()
+        for child in children[k]:
+            in_degree[child] -= 1
+            if in_degree[child] == 0:
+                zero_in_degree.append(child)
+        ordering.append(k)
 
-        # Create a graph (representing a poset) whose nodes are the column headers,
-        # and whose edges A -> B represent that column header A should come before
-        # column header B.
-        header_graph = nx.DiGraph()
-        for row in self.rows:
-            row_dict = self.row_parser.unparse_row(
-                row, self.target_headers, self.excluded_headers
-            )
-            k_prev = None
-            # For each pair of consecutive headers in this row, add an edge.
-            for k, _ in row_dict.items():
-                if k_prev:
-                    header_graph.add_edge(k_prev, k)
-                k_prev = k
-
-        # We now get a linear order of our headers from this poset graph
-        # by doing a topological sort.
-        try:
-            ordering = list(nx.topological_sort(header_graph))
-        except nx.exception.NetworkXUnfeasible:
-            raise ValueError("Inconsistent ordering of headers in provided rows.")
-        return ordering
+    if len(ordering) < len(in_degree):
+        raise ValueError("Inconsistent ordering of headers in provided rows.")
+    return ordering
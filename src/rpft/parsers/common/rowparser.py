@@ -1,6 +1,7 @@
 import re
 from collections import defaultdict
 from collections.abc import Iterable, Sequence
+from functools import lru_cache
 
 from typing import List
 
@@ -9,6 +10,9 @@ from pydantic import BaseModel, ConfigDict, field_validator, model_validator
 from rpft.parsers.common.cellparser import CellParser
 
 
+PARSE_PLAN_CACHE_SIZE = 1024
+
+
 def is_pairs(value):
     return all(
         isinstance(item, Sequence) and not isinstance(item, str) and len(item) == 2
@@ -162,6 +166,214 @@ def get_field_name(string):
     )
 
 
+@lru_cache(maxsize=PARSE_PLAN_CACHE_SIZE)
+def compile_header_patterns(headers):
+    """
+    Compile a set of headers, which may contain asterisks as wildcards for a single
+    field, into one regex matching the field paths that start with any of them.
+    """
+    if not headers:
+        # Matches nothing
+        return re.compile("(?!)")
+    return re.compile(
+        "^(?:"
+        + "|".join(
+            "(?:" + header.replace(".", "\\.").replace("*", "[^.]+") + ")"
+            for header in sorted(headers)
+        )
+        + ")"
+    )
+
+
+def resolve_field_type(model, field_path):
+    """
+    Determine the type of the field that field_path refers to within model.
+
+    This follows the same rules as RowParser.find_entry, without creating any entries.
+    """
+    return FieldAccessor(model, field_path).model
+
+
+LIST_FIELD = "list"
+BASIC_LIST_FIELD = "basic_list"
+DICT_FIELD = "dict"
+MODEL_FIELD = "model"
+BASIC_FIELD = "basic"
+
+
+@lru_cache(maxsize=None)
+def get_type_kind(model):
+    """
+    Classify a field type according to how RowParser.assign_value treats it.
+    """
+    if is_parser_model_type(model):
+        return MODEL_FIELD
+    if is_basic_dict_type(model):
+        return DICT_FIELD
+    if is_basic_list_type(model):
+        return BASIC_LIST_FIELD
+    if is_list_type(model):
+        return LIST_FIELD
+    return BASIC_FIELD
+
+
+class FieldAccessor:
+    """
+    Path to a (possibly nested) field within the output of a RowParser, resolved
+    against a model once so that it can be followed cheaply for every row.
+    """
+
+    def __init__(self, model, field_path):
+        self.steps = []
+        for field_name in field_path:
+            if is_list_type(model):
+                kind = LIST_FIELD
+                key = int(field_name) - 1
+                child_model = get_list_child_model(model)
+            elif is_basic_dict_type(model):
+                kind = DICT_FIELD
+                key = field_name
+                child_model = str
+            else:
+                assert is_parser_model_type(model)
+                kind = MODEL_FIELD
+                key = model.header_name_to_field_name(field_name)
+                if key not in model.model_fields:
+                    raise ValueError(
+                        f"Field {key} doesn't exist in target type {model}."
+                    )
+                child_model = model.model_fields[key].annotation
+            self.steps.append((kind, key, get_container_type(child_model)))
+            model = child_model
+        self.model = model
+
+    def find(self, output_field):
+        """
+        Traverse output_field along the path, creating entries where needed, and
+        return the field to assign to as a parent object and a key.
+        """
+        last = len(self.steps) - 1
+        for i, (kind, key, container_type) in enumerate(self.steps):
+            if kind is LIST_FIELD:
+                if len(output_field) <= key:
+                    # We assume the columns are always in order 1, 2, 3, ... for now
+                    assert len(output_field) == key
+                    # None will later be overwritten by assign_value
+                    output_field.append(None)
+            elif kind is DICT_FIELD:
+                output_field[key] = None
+            elif key not in output_field:
+                output_field[key] = None
+
+            if i == last:
+                return output_field, key
+
+            if container_type is not None and output_field[key] is None:
+                output_field[key] = container_type()
+            output_field = output_field[key]
+
+
+def get_container_type(model):
+    if is_list_type(model):
+        return list
+    if is_basic_dict_type(model) or is_parser_model_type(model):
+        return dict
+    return None
+
+
+class ColumnPlan:
+    """
+    How to parse a column, given its (mapped) header: the field it is assigned to,
+    the type of that field and whether its cells are parsed into nested lists.
+    """
+
+    def __init__(self, model, header):
+        self.field_path = get_field_name(header).split(RowParser.HEADER_FIELD_SEPARATOR)
+        if "*" in header:
+            # The values of prefix:*:suffix columns are always parsed as lists
+            self.asterisk_prefix = header.split("*")[0]
+            self.model = None
+            self.accessor = None
+            self.parse_as_list = True
+        else:
+            self.asterisk_prefix = None
+            self.accessor = FieldAccessor(model, self.field_path)
+            self.model = self.accessor.model
+            self.parse_as_list = is_nested_type(self.model)
+        self.row_model = model
+        self.item_accessors = {}
+
+    def get_item_accessor(self, index):
+        """Accessor of the index-th (1-based) field of a prefix:*:suffix column."""
+        accessor = self.item_accessors.get(index)
+        if accessor is None:
+            accessor = FieldAccessor(
+                self.row_model,
+                [part.replace("*", str(index)) for part in self.field_path],
+            )
+            self.item_accessors[index] = accessor
+        return accessor
+
+
+@lru_cache(maxsize=PARSE_PLAN_CACHE_SIZE)
+def get_parse_plan(model, headers):
+    """
+    Compile the plan for parsing rows of model with the given (mapped) headers.
+
+    Plans are shared between all RowParser instances.
+
+    Returns:
+        tuple of ColumnPlan, one per header
+    """
+    return tuple(ColumnPlan(model, header) for header in headers)
+
+
+def parse_plan_cache_info():
+    """Hit/miss counters of the parse plan cache."""
+    return get_parse_plan.cache_info()
+
+
+def is_nested_type(model):
+    return (
+        is_list_type(model) or is_basic_dict_type(model) or is_parser_model_type(model)
+    )
+
+
+class ColumnTemplate:
+    """
+    Column of a RowTemplate.
+
+    If the cell contains no template, value holds the parsed cell content, otherwise
+    the cell has to be rendered every time the row is parsed.
+    """
+
+    def __init__(self, plan, source):
+        self.plan = plan
+        self.field_path = plan.field_path
+        self.model = plan.model
+        self.asterisk_prefix = plan.asterisk_prefix
+        self.source = source
+        self.is_static = source is None or "{" not in str(source)
+        self.value = None
+
+
+class RowTemplate:
+    """
+    Sheet row that may be parsed repeatedly, e.g. once for every data row that a
+    template sheet is instantiated with.
+
+    The row is compiled on first use by a RowParser. If none of its cells contain
+    templates, the resulting model instance is reused for all subsequent parses, so
+    it should be treated as read-only.
+    """
+
+    def __init__(self, data):
+        self.data = data
+        self.model = None
+        self.columns = None
+        self.instance = None
+
+
 class RowParser:
     # Takes a dictionary of cell entries, whose keys are the column names
     # and the values are the cell content converted into nested lists.
@@ -202,7 +414,8 @@ class RowParser:
 
         # Using both key and field here because if we passed field[key],
         # we can't do call by reference with basic types.
-        if is_parser_model_type(model):
+        kind = get_type_kind(model)
+        if kind is MODEL_FIELD:
             # The value should be a dict/object
             field[key] = {}
             # Get the list of keys that are available for the target model
@@ -239,7 +452,7 @@ class RowParser:
                         entry,
                         model.model_fields[entry_key].annotation,
                     )
-        elif is_basic_dict_type(model):
+        elif kind is DICT_FIELD:
             field[key] = {}
             if not value:
                 return
@@ -253,13 +466,13 @@ class RowParser:
                 for entry in value:
                     assert len(entry) == 2
                     field[key][entry[0]] = entry[1]
-        elif is_basic_list_type(model):
+        elif kind is BASIC_LIST_FIELD:
             # We cannot iterate deeper if we don't know what to expect.
             if is_iterable_instance(value):
                 field[key] = list(value)
             else:
                 field[key] = [value]
-        elif is_list_type(model):
+        elif kind is LIST_FIELD:
             child_model = get_list_child_model(model)
             # The created entry should be a list. Value should also be a list
             field[key] = []
@@ -303,52 +516,9 @@ class RowParser:
         # (though objects are modeled as dicts in the output). It helps us
         # traverse the path in output_field and if necessary create non-existent
         # entries.
-
-        # We're creating the output object's fields as we're going through it.
-        # It'd be nicer to already have a template.
-        field_name = field_path[0]
-        if is_list_type(model):
-            child_model = get_list_child_model(model)
-            index = int(field_name) - 1
-            if len(output_field) <= index:
-                # Create a new list entry for this, if necessary
-                # We assume the columns are always in order 1, 2, 3, ... for now
-                assert len(output_field) == index
-                # None will later be overwritten by assign_value
-                output_field.append(None)
-
-            key = index
-        elif is_basic_dict_type(model):
-            key = field_name
-            output_field[key] = None
-            child_model = str
-        else:
-            assert is_parser_model_type(model)
-            key = model.header_name_to_field_name(field_name)
-            if key not in model.model_fields:
-                raise ValueError(f"Field {key} doesn't exist in target type {model}.")
-            child_model = model.model_fields[key].annotation
-
-            if key not in output_field:
-                # Create a new entry for this, if necessary
-                # None will later be overwritten by assign_value
-                output_field[key] = None
-
-        if len(field_path) == 1:
-            # We've reached the end of the field_path
-            # Therefore we've found where we need to assign
-            return output_field, key, child_model
-        else:
-            # The field has subfields, keep going and recurse.
-            # If field doesn't exist yet in our output object, create it.
-            if is_list_type(child_model) and output_field[key] is None:
-                output_field[key] = []
-            elif is_basic_dict_type(child_model) and output_field[key] is None:
-                output_field[key] = {}
-            elif is_parser_model_type(child_model) and output_field[key] is None:
-                output_field[key] = {}
-            # recurse
-            return self.find_entry(child_model, output_field[key], field_path[1:])
+        accessor = FieldAccessor(model, field_path)
+        field, key = accessor.find(output_field)
+        return field, key, accessor.model
 
     def parse_entry(
         self, column_name, value, value_is_parsed=False, template_context={}
@@ -357,8 +527,24 @@ class RowParser:
         # The field is determined by column_name, its value by value
         column_name = get_field_name(column_name)
         field_path = column_name.split(RowParser.HEADER_FIELD_SEPARATOR)
-        # Find the destination subfield in self.output that corresponds to field_path
-        field, key, model = self.find_entry(self.model, self.output, field_path)
+        self.assign_entry(field_path, value, value_is_parsed, template_context)
+
+    def assign_entry(
+        self, field_path, value, value_is_parsed=False, template_context={}
+    ):
+        self.assign_to_field(
+            FieldAccessor(self.model, field_path),
+            value,
+            value_is_parsed,
+            template_context,
+        )
+
+    def assign_to_field(
+        self, accessor, value, value_is_parsed=False, template_context={}
+    ):
+        # Find the destination subfield in self.output that accessor refers to
+        field, key = accessor.find(self.output)
+        model = accessor.model
         # The destination field in self.output is field[key], its type is model.
         # Therefore the value should be assigned to field[key].
         # (Note: This is a bit awkward; if we returned field[key] itself, we could
@@ -367,82 +553,132 @@ class RowParser:
         # The model of field[key] is model, and thus value should also be interpreted
         # as being of type model.
         if not value_is_parsed:
-            if (
-                is_list_type(model)
-                or is_basic_dict_type(model)
-                or is_parser_model_type(model)
-            ):
-                # If the expected type of the value is list/object,
-                # parse the cell content as such.
-                # Otherwise leave it as a string
-                value = self.cell_parser.parse(value, context=template_context)
-            else:
-                value, _ = self.cell_parser.parse_as_string(
-                    value, context=template_context
-                )
+            value = self.parse_cell(value, model, template_context)
         self.assign_value(field, key, value, model)
 
+    def parse_cell(self, value, model, template_context={}):
+        return self.parse_cell_as(value, is_nested_type(model), template_context)
+
+    def parse_cell_as(self, value, as_list, template_context={}):
+        if as_list:
+            # If the expected type of the value is list/object,
+            # parse the cell content as such.
+            # Otherwise leave it as a string
+            return self.cell_parser.parse(value, context=template_context)
+        else:
+            value, _ = self.cell_parser.parse_as_string(value, context=template_context)
+            return value
+
+    def compile_row(self, data):
+        """
+        Pre-process a row as far as possible without a template context.
+
+        Headers are mapped to field paths and the target type of each column is
+        resolved, using a plan that is shared by all rows with the same (mapped)
+        headers. Cells without templates are parsed straight away; only the
+        remaining cells need to be rendered whenever the row is parsed.
+
+        Args:
+            data: dict mapping column header names to (unparsed) cell values
+
+        Returns:
+            list of ColumnTemplate, in the order in which they are to be assigned
+        """
+        # Apply map from header string to field specification
+        data_rekeyed = {}
+        for k, v in data.items():
+            k = self.model.header_name_to_field_name_with_context(k, data)
+            data_rekeyed[k] = v
+
+        plan = get_parse_plan(self.model, tuple(data_rekeyed))
+        columns = []
+        for column_plan, v in zip(plan, data_rekeyed.values()):
+            column = ColumnTemplate(column_plan, v)
+            if column.is_static:
+                column.value = self.parse_column(column, None)
+            columns.append(column)
+
+        return columns
+
+    def parse_column(self, column, template_context):
+        if column.is_static and column.value is not None:
+            return column.value
+        return self.parse_cell_as(
+            column.source, column.plan.parse_as_list, template_context
+        )
+
     def parse_row(self, data, template_context={}):
         # data is a dict where the keys are column header names,
         # and the values are the corresponding values of the cells
         # in the spreadsheet (i.e. strings).
-        # However, because we don't have the string parser yet,
-        # the values are assumed to be parsed already, i.e. are
-        # nested lists.
+        # Alternatively, data is a RowTemplate that may be parsed repeatedly
+        # with different template contexts.
+        row = data if isinstance(data, RowTemplate) else RowTemplate(data)
+
+        if row.model is not self.model:
+            row.model = self.model
+            row.columns = self.compile_row(row.data)
+            row.instance = None
+
+        if row.instance is not None:
+            return row.instance
 
         # Initialize the output template as a dict
         self.output = {}
 
-        # Apply map from header string to field specification
-        data_rekeyed = {}
-        for k, v in data.items():
-            k = self.model.header_name_to_field_name_with_context(k, data)
-            data_rekeyed[k] = v
-        data = data_rekeyed
+        values = [self.parse_column(column, template_context) for column in row.columns]
 
         # For each column with an asterisk (*) (indicating list of fields),
         # Compute how long the implied list is by taking the maximum
         # over the lengths of all fields that this list refers to.
         # Note: So far, no nested asterisks are supported.
         asterisk_list_lengths = defaultdict(lambda: 1)
-        for k, v in data.items():
-            if "*" in k:
-                prefix = k.split("*")[0]
-                parsed_v = self.cell_parser.parse(v, context=template_context)
-                if isinstance(parsed_v, list):
-                    asterisk_list_lengths[prefix] = max(
-                        asterisk_list_lengths[prefix], len(parsed_v)
-                    )
-                    # No else case needed because then the implied list length is 1,
-                    # i.e. the default value
+        for column, value in zip(row.columns, values):
+            prefix = column.asterisk_prefix
+            if prefix is not None and isinstance(value, list):
+                asterisk_list_lengths[prefix] = max(
+                    asterisk_list_lengths[prefix], len(value)
+                )
+                # No else case needed because then the implied list length is 1,
+                # i.e. the default value
         # Process each entry
-        for k, v in data.items():
-            if "*" in k:
+        for column, value in zip(row.columns, values):
+            prefix = column.asterisk_prefix
+            if prefix is not None:
                 # Process each prefix:*:suffix column entry by assigning the individual
                 # list values to prefix:1:suffix, prefix:2:suffix, etc
-                prefix = k.split("*")[0]
-                parsed_v = self.cell_parser.parse(v, context=template_context)
-                if not isinstance(parsed_v, list):
+                if not isinstance(value, list):
                     # If there was only one entry, we assume it is used for the entire
                     # list
-                    parsed_v = [parsed_v] * asterisk_list_lengths[prefix]
-                for i, elem in enumerate(parsed_v):
-                    self.parse_entry(
-                        k.replace("*", str(i + 1)),
+                    value = [value] * asterisk_list_lengths[prefix]
+                for i, elem in enumerate(value):
+                    self.assign_to_field(
+                        column.plan.get_item_accessor(i + 1),
                         elem,
                         value_is_parsed=True,
                         template_context=template_context,
                     )
             else:
                 # Normal, non-* column entry.
-                self.parse_entry(k, v, template_context=template_context)
+                self.assign_to_field(
+                    column.plan.accessor,
+                    value,
+                    value_is_parsed=True,
+                    template_context=template_context,
+                )
         # Returning an instance of the model rather than the output directly
         # helps us fill in default values where no entries exist.
         # Filtering out None values here is a bit of a hack;
         # the cause of these is the line output_field[key] = None in find_key.
         # Ideally, we should fix the cause rather than clean up here.
         self.output = {k: v for k, v in self.output.items() if v is not None}
-        return self.model(**self.output)
+        instance = self.model(**self.output)
+
+        if all(column.is_static for column in row.columns):
+            # The result does not depend on the template context
+            row.instance = instance
+
+        return instance
 
     def unparse_row(self, model_instance, target_headers=set(), excluded_headers=set()):
         """
@@ -470,7 +706,13 @@ class RowParser:
             represented as a single string.
         """
         self.output_dict = {}
-        self.unparse_row_recurse(model_instance, "", target_headers, excluded_headers)
+        # Compile the header patterns once rather than at every recursion step
+        self.unparse_row_recurse(
+            model_instance,
+            "",
+            compile_header_patterns(frozenset(target_headers)),
+            compile_header_patterns(frozenset(excluded_headers)),
+        )
         return self.output_dict
 
     def trim_prefix(self, prefix):
@@ -549,12 +791,11 @@ class RowParser:
         # will never occur in unparse_row_recurse because once x.field is encountered,
         # the recursion bottoms out (because x.field matches x.field) and does not
         # proceed to process the x.field.subfield prefix.
-        for header in target_headers:
-            header_regex = "^" + header.replace(".", "\\.").replace("*", "[^.]+")
-            pattern = re.compile(header_regex)
-            if pattern.match(prefix):
-                return True
-        return False
+        if isinstance(target_headers, re.Pattern):
+            pattern = target_headers
+        else:
+            pattern = compile_header_patterns(frozenset(target_headers))
+        return pattern.match(prefix) is not None
 
     def to_nested_list(self, value):
         if is_basic_instance(value):
@@ -1,10 +1,27 @@
 import copy
+from collections import ChainMap
 
 from rpft.parsers.common.rowdatasheet import RowDataSheet
-from rpft.parsers.common.rowparser import RowParser
+from rpft.parsers.common.rowparser import RowParser, RowTemplate
 from rpft.logger.logger import logging_context
 
 
+class CompiledSheet:
+    """
+    Rows of a table in a form that can be parsed repeatedly, e.g. a template sheet
+    that is instantiated once for every row of a data sheet.
+
+    Header mapping, field path and type resolution and the parsing of cells without
+    templates happen only once per row, rather than every time the sheet is parsed.
+    """
+
+    def __init__(self, table):
+        self.rows = [
+            (RowTemplate({h: e for h, e in zip(table.headers, row)}), row_idx + 2)
+            for row_idx, row in enumerate(table)
+        ]
+
+
 class SheetParser:
     def parse_sheet(table, row_model):
         """
@@ -24,7 +41,8 @@ class SheetParser:
         Either a row_parser or a row_model need to be provided.
 
         Args:
-            table: Tablib Dataset representing the table to be parsed.
+            table: Tablib Dataset or CompiledSheet representing the table to be
+                parsed.
             row_model: Data model to convert rows of the sheet into.
             row_parser: parser to convert flat dicts to RowModel instances.
             context: context used for template parsing
@@ -34,12 +52,18 @@ class SheetParser:
             raise ValueError("SheetParser: needs either row_parser or row_model")
         self.row_parser = row_parser or RowParser(row_model)
         self.bookmarks = {}
-        self.input_rows = []
-        for row_idx, row in enumerate(table):
-            row_dict = {h: e for h, e in zip(table.headers, row)}
-            self.input_rows.append((row_dict, row_idx + 2))
+        if isinstance(table, CompiledSheet):
+            self.input_rows = table.rows
+        else:
+            self.input_rows = []
+            for row_idx, row in enumerate(table):
+                row_dict = {h: e for h, e in zip(table.headers, row)}
+                self.input_rows.append((row_dict, row_idx + 2))
         self.iterator = iter(self.input_rows)
-        self.context = copy.deepcopy(context)
+        # Copy-on-write view of the context: variables added while parsing, e.g. by
+        # loops, shadow the given context rather than modifying it, so that the
+        # context (which may contain entire data sheets) need not be copied.
+        self.context = ChainMap({}, context)
 
     def add_to_context(self, key, value):
         self.context[key] = value
@@ -47,6 +71,20 @@ class SheetParser:
     def remove_from_context(self, key):
         self.context.pop(key, None)
 
+    def push_scope(self):
+        """
+        Start a new scope, to which variables added to the context are added until
+        the scope is popped.
+        """
+        self.context = self.context.new_child()
+
+    def pop_scope(self):
+        """
+        Discard the variables added to the context in the current scope, revealing
+        any that they shadowed.
+        """
+        self.context = self.context.parents
+
     def create_bookmark(self, name):
         self.bookmarks[name] = copy.copy(self.iterator)
 
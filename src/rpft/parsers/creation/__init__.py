@@ -61,3 +61,17 @@ def map_template_arguments(template: TemplateSheet, args, context, data_sheets)
         context[arg_def.name] = value
 
     return context
+
+
+def get_sheet_arguments(template: TemplateSheet, args) -> list:
+    """
+    Names of the data sheets passed to the template via sheet-type arguments.
+    """
+    arg_defs = template.argument_definitions
+    args = list(args[: len(arg_defs)]) + [""] * (len(arg_defs) - len(args))
+
+    return [
+        arg if arg != "" else arg_def.default_value
+        for arg_def, arg in zip(arg_defs, args)
+        if arg_def.type == "sheet"
+    ]
@@ -0,0 +1,233 @@
+import hashlib
+import importlib.util
+import json
+import logging
+from importlib.metadata import PackageNotFoundError, version
+from pathlib import Path
+
+from rpft.parsers.creation.flowparser import FlowParser
+from rpft.rapidpro.models.containers import FlowContainer, UUIDDict
+from rpft.rapidpro.utils import to_uuid_namespace
+
+
+LOGGER = logging.getLogger(__name__)
+
+# Key of the hash of the global context among the hashes of dependencies
+GLOBALS = ("globals",)
+
+
+class BuildCache:
+    """
+    On-disk cache of generated flows, used to avoid regenerating flows whose inputs
+    have not changed since the previous build.
+
+    Each flow is stored under a hash of its create_flow definition, so that flows
+    with the same name do not replace each other, together with a hash of the
+    global context and hashes of all the templates, data sheets and data rows that
+    were accessed while generating it, including those of blocks inserted via
+    insert_as_block and sheets passed as template arguments. Flows built with
+    deterministic UUIDs are only reused with the same namespace.
+
+    The whole cache is discarded if it was written by another version of rpft, or
+    with a different source of the data models module.
+
+    Hashes are computed once per chatbot definition, and reused for all the flows
+    that depend on the same global context, template, data sheet or data row.
+    """
+
+    VERSION = 2
+
+    def __init__(self, path, data_models=None):
+        """
+        Args:
+            path: location of the cache file
+            data_models: name of the module of user data models
+        """
+        self.path = Path(path)
+        self.key = {
+            "version": BuildCache.VERSION,
+            "rpft": package_version(),
+            "data_models": module_hash(data_models),
+        }
+        self.entries = {}
+        self.new_entries = {}
+        self.explanations = []
+        self._stale_reason = None
+        self._definition = None
+        self._hashes = {}
+
+        if self.path.exists():
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+
+            if data.get("version") != BuildCache.VERSION:
+                self._stale_reason = "build cache format changed"
+            elif data.get("rpft") != self.key["rpft"]:
+                self._stale_reason = "rpft version changed"
+            elif data.get("data_models") != self.key["data_models"]:
+                self._stale_reason = "data models changed"
+            else:
+                self.entries = data["flows"]
+
+        self._names = {entry["name"] for entry in self.entries.values()}
+
+    def get(self, definition, task, uuid_namespace=None):
+        """
+        Return the cached flow and its recorded UUIDs for the given task, or None if
+        the flow needs to be rebuilt. The reason for a rebuild is added to
+        explanations.
+        """
+        name = get_task_flow_name(task)
+        key = content_hash(task[1])
+        entry = self.entries.get(key)
+        reason = self._get_rebuild_reason(definition, name, entry, uuid_namespace)
+
+        if reason:
+            self.explanations.append((name, reason))
+            LOGGER.info(f"Rebuilding flow '{name}': {reason}")
+            return None
+
+        self.new_entries[key] = entry
+        uuid_dict = UUIDDict(
+            dict(entry["uuids"]["flows"]),
+            dict(entry["uuids"]["groups"]),
+        )
+
+        return FlowContainer.from_dict(entry["flow"]), uuid_dict
+
+    def put(self, definition, task, flow, uuid_dict, dependencies, uuid_namespace=None):
+        self.new_entries[content_hash(task[1])] = {
+            "name": get_task_flow_name(task),
+            "uuid_namespace": namespace_key(uuid_namespace),
+            "globals": self._hash(definition, GLOBALS),
+            "dependencies": [
+                [list(dependency), self._hash(definition, dependency)]
+                for dependency in sorted(dependencies)
+            ],
+            "flow": flow.render(),
+            "uuids": {
+                "flows": uuid_dict.flow_dict,
+                "groups": uuid_dict.group_dict,
+            },
+        }
+
+    def save(self):
+        with open(self.path, "w", encoding="utf-8") as f:
+            json.dump({**self.key, "flows": self.new_entries}, f)
+
+    def _get_rebuild_reason(self, definition, name, entry, uuid_namespace):
+        if entry is None:
+            if self._stale_reason:
+                return self._stale_reason
+
+            if name in self._names:
+                return "create_flow definition changed"
+
+            return "not in build cache"
+
+        if entry.get("uuid_namespace") != namespace_key(uuid_namespace):
+            return "UUID namespace changed"
+
+        if entry["globals"] != self._hash(definition, GLOBALS):
+            return "global context changed"
+
+        for dependency, digest in entry["dependencies"]:
+            dependency = tuple(dependency)
+
+            if self._hash(definition, dependency) != digest:
+                return f"{describe_dependency(dependency)} changed"
+
+        return None
+
+    def _hash(self, definition, dependency):
+        if definition is not self._definition:
+            self._definition = definition
+            self._hashes = {}
+
+        if dependency not in self._hashes:
+            self._hashes[dependency] = (
+                content_hash(definition.global_context)
+                if dependency == GLOBALS
+                else dependency_hash(definition, dependency)
+            )
+
+        return self._hashes[dependency]
+
+
+def get_task_flow_name(task):
+    sheet_name, data_sheet, data_row_id, _, new_name, _ = task[1]
+
+    return FlowParser.get_flow_name(sheet_name, data_sheet, data_row_id, new_name)
+
+
+def dependency_hash(definition, dependency):
+    kind, *name = dependency
+
+    if kind == "template":
+        template = definition.templates.get(name[0])
+
+        if template is None:
+            return None
+
+        return content_hash(
+            [
+                template.table.headers,
+                [list(row) for row in template.table],
+                [arg.model_dump() for arg in template.argument_definitions],
+            ]
+        )
+
+    data_sheet = definition.data_sheets.get(name[0])
+
+    if data_sheet is None:
+        return None
+
+    if kind == "data_row":
+        row = data_sheet.rows.get(name[1])
+
+        return content_hash(dump_row(row)) if row is not None else None
+
+    return content_hash([[k, dump_row(row)] for k, row in data_sheet.rows.items()])
+
+
+def package_version():
+    try:
+        return version("rpft")
+    except PackageNotFoundError:
+        return None
+
+
+def module_hash(name):
+    """Hash of the source of the named module, or None if there is none."""
+    spec = importlib.util.find_spec(name) if name else None
+
+    if spec is None or not spec.has_location:
+        return None
+
+    with open(spec.origin, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def namespace_key(uuid_namespace):
+    return str(to_uuid_namespace(uuid_namespace)) if uuid_namespace else None
+
+
+def describe_dependency(dependency):
+    kind, *name = dependency
+
+    if kind == "template":
+        return f"template '{name[0]}'"
+    elif kind == "data_row":
+        return f"data row '{name[1]}' of data sheet '{name[0]}'"
+    else:
+        return f"data sheet '{name[0]}'"
+
+
+def dump_row(row):
+    return row.model_dump() if hasattr(row, "model_dump") else dict(row)
+
+
+def content_hash(obj):
+    content = json.dumps(obj, sort_keys=True, default=str, ensure_ascii=False)
+
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
@@ -1,6 +1,7 @@
 import logging
 
 from rpft.rapidpro.models.campaigns import Campaign, CampaignEvent
+from rpft.rapidpro.utils import stable_uuid, uuid_scope
 from rpft.logger.logger import logging_context
 
 
@@ -13,6 +14,12 @@ class CampaignParser:
         self.rows = rows
 
     def parse(self):
+        # The campaign is created before any deterministic_uuids context is entered.
+        self.campaign.uuid = stable_uuid("campaign", self.campaign.name)
+        with uuid_scope("campaign", self.campaign.name):
+            return self._parse_events()
+
+    def _parse_events(self):
         for row_idx, row in enumerate(self.rows):
             with logging_context(f"row {row_idx+2}"):
                 message = None
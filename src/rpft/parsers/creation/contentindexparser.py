@@ -10,6 +10,7 @@ from rpft.parsers.creation.contentindexrowmodel import (
     ContentIndexRowModel,
     ContentIndexType,
 )
+from rpft.parsers.creation.datasheet import DataSheet
 from rpft.parsers.creation.flowparser import FlowParser
 from rpft.parsers.creation.models import ChatbotDefinition, TemplateSheet
 from rpft.parsers.creation.tagmatcher import TagMatcher
@@ -17,27 +18,12 @@ from rpft.parsers.creation.surveyparser import Survey, SurveyParser, SurveyQuest
 from rpft.parsers.creation.triggerparser import TriggerParser
 from rpft.parsers.creation.triggerrowmodel import TriggerRowModel
 from rpft.rapidpro.models.containers import RapidProContainer
+from rpft.rapidpro.utils import deterministic_uuids
 
 
 LOGGER = logging.getLogger(__name__)
 
 
-class DataSheet:
-    def __init__(self, rows, row_model):
-        """Args:
-        rows: A dict mapping row_ids (str) to row_model instances.
-        row_model: the model underlying the instances of rows.
-        """
-        self.rows = rows
-        self.row_model = row_model
-
-    def to_dict(self):
-        return {
-            "model": self.row_model.__name__,
-            "rows": [content.model_dump() for content in self.rows.values()],
-        }
-
-
 class ParserError(Exception):
     pass
 
@@ -269,12 +255,11 @@ class ContentIndexParser:
 
         with logging_context(sheet_name):
             items, *_ = self.data_source.get(sheet_name, model)
-            model_instances = OrderedDict((item.ID, item) for item in items)
 
-            return DataSheet(model_instances, model)
+            return DataSheet.from_instances(items, model)
 
     def _data_sheets_concat(self, sheet_names, data_model_name):
-        all_data_rows = OrderedDict()
+        data_sheets = []
         user_model = None
 
         for sheet_name in sheet_names:
@@ -288,48 +273,29 @@ class ContentIndexParser:
                     )
 
                 user_model = data_sheet.row_model
-                all_data_rows.update(data_sheet.rows)
+                data_sheets.append(data_sheet)
 
-        return DataSheet(all_data_rows, user_model)
+        return DataSheet.concat(data_sheets, user_model)
 
     def _data_sheets_filter(self, sheet_name, data_model_name, operation):
         data_sheet = self._get_data_sheet(sheet_name, data_model_name)
-        new_row_data = OrderedDict()
-
-        for row_id, row in data_sheet.rows.items():
-            try:
-                if eval(operation.expression, {}, dict(row)) is True:
-                    new_row_data[row_id] = row
-            except NameError as e:
-                raise Exception(f"Invalid filtering expression: {e}")
-            except SyntaxError as e:
-                raise Exception(
-                    f'Invalid filtering expression: "{e.text}". '
-                    f"SyntaxError at line {e.lineno} character {e.offset}"
-                )
+        expression = _compile_expression(operation.expression, "filtering")
 
-        return DataSheet(new_row_data, data_sheet.row_model)
+        try:
+            return data_sheet.filter(expression)
+        except NameError as e:
+            raise Exception(f"Invalid filtering expression: {e}")
 
     def _data_sheets_sort(self, sheet_name, data_model_name, operation):
         data_sheet = self._get_data_sheet(sheet_name, data_model_name)
+        expression = _compile_expression(operation.expression, "sorting")
 
         try:
-            new_row_data = OrderedDict(
-                sorted(
-                    data_sheet.rows.items(),
-                    key=lambda kvpair: eval(operation.expression, {}, dict(kvpair[1])),
-                    reverse=operation.order.lower() == "descending",
-                )
+            return data_sheet.sort(
+                expression, reverse=operation.order.lower() == "descending"
             )
         except NameError as e:
             raise Exception(f"Invalid sorting expression: {e}")
-        except SyntaxError as e:
-            raise Exception(
-                f'Invalid sorting expression: "{e.text}". '
-                f"SyntaxError at line {e.lineno} character {e.offset}"
-            )
-
-        return DataSheet(new_row_data, data_sheet.row_model)
 
     def data_sheets_to_dict(self):
         sheets = {}
@@ -345,12 +311,14 @@ class ContentIndexParser:
             },
         }
 
-    def parse_all(self):
-        rapidpro_container = RapidProContainer()
-        self.parse_all_flows(rapidpro_container)
-        self.parse_all_campaigns(rapidpro_container)
-        self.parse_all_triggers(rapidpro_container)
-        self.parse_all_surveys(rapidpro_container)
+    def parse_all(self, jobs=1, build_cache=None, uuid_namespace=None):
+        rapidpro_container = RapidProContainer(uuid_namespace=uuid_namespace)
+        self.parse_all_flows(rapidpro_container, jobs, build_cache, uuid_namespace)
+
+        with deterministic_uuids(uuid_namespace):
+            self.parse_all_campaigns(rapidpro_container)
+            self.parse_all_triggers(rapidpro_container)
+            self.parse_all_surveys(rapidpro_container)
 
         return rapidpro_container
 
@@ -426,5 +394,23 @@ class ContentIndexParser:
                 for trigger in triggers:
                     rapidpro_container.add_trigger(trigger)
 
-    def parse_all_flows(self, rapidpro_container):
-        FlowParser.parse_all(self.definition, rapidpro_container)
+    def parse_all_flows(
+        self, rapidpro_container, jobs=1, build_cache=None, uuid_namespace=None
+    ):
+        FlowParser.parse_all(
+            self.definition, rapidpro_container, jobs, build_cache, uuid_namespace
+        )
+
+
+def _compile_expression(expression, purpose):
+    """
+    Compile the expression of a data_sheet operation once, to be evaluated for
+    every row with the fields of the row as variables.
+    """
+    try:
+        return compile(expression, "<expression>", "eval")
+    except SyntaxError as e:
+        raise Exception(
+            f'Invalid {purpose} expression: "{e.text}". '
+            f"SyntaxError at line {e.lineno} character {e.offset}"
+        )
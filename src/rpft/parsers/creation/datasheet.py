@@ -0,0 +1,283 @@
+import sys
+from collections import OrderedDict
+from collections.abc import Mapping
+from types import MappingProxyType
+
+from pydantic import BaseModel
+
+
+# Data sheets with at least this many rows are stored by column, see ColumnarRows
+COLUMNAR_MIN_ROWS = 1000
+
+
+class DataSheet:
+    def __init__(self, rows, row_model):
+        """Args:
+        rows: A dict mapping row_ids (str) to row_model instances, or ColumnarRows.
+        row_model: the model underlying the instances of rows.
+        """
+        self.rows = rows
+        self.row_model = row_model
+
+    @classmethod
+    def from_instances(cls, instances, row_model):
+        """
+        Create a data sheet from row model instances, which are indexed by their ID.
+        Large sheets are stored by column.
+        """
+        instances = list(instances)
+        rows = None
+
+        if instances and len(instances) >= COLUMNAR_MIN_ROWS:
+            rows = ColumnarRows.from_instances(instances, row_model)
+
+        if rows is None:
+            rows = OrderedDict((item.ID, item) for item in instances)
+
+        return cls(rows, row_model)
+
+    @classmethod
+    def concat(cls, data_sheets, row_model):
+        parts = [data_sheet.rows for data_sheet in data_sheets]
+
+        if parts and all(isinstance(part, ColumnarRows) for part in parts):
+            rows = ColumnarRows.concat(parts)
+
+            if rows is not None:
+                return cls(rows, row_model)
+
+        rows = OrderedDict()
+
+        for part in parts:
+            rows.update(part.items())
+
+        return cls(rows, row_model)
+
+    def filter(self, expression):
+        """
+        Data sheet of the rows for which the compiled expression, evaluated with the
+        fields of the row as variables, is True.
+        """
+        if isinstance(self.rows, ColumnarRows):
+            return DataSheet(
+                self.rows.take(
+                    i
+                    for i in range(len(self.rows))
+                    if eval(expression, {}, self.rows.view(i)) is True
+                ),
+                self.row_model,
+            )
+
+        return DataSheet(
+            OrderedDict(
+                (row_id, row)
+                for row_id, row in self.rows.items()
+                if eval(expression, {}, row_view(row)) is True
+            ),
+            self.row_model,
+        )
+
+    def sort(self, expression, reverse=False):
+        """
+        Data sheet of the rows ordered by the compiled expression, evaluated with the
+        fields of the row as variables.
+        """
+        if isinstance(self.rows, ColumnarRows):
+            keys = [
+                eval(expression, {}, self.rows.view(i)) for i in range(len(self.rows))
+            ]
+
+            return DataSheet(
+                self.rows.take(
+                    sorted(range(len(keys)), key=keys.__getitem__, reverse=reverse)
+                ),
+                self.row_model,
+            )
+
+        return DataSheet(
+            OrderedDict(
+                sorted(
+                    self.rows.items(),
+                    key=lambda kvpair: eval(expression, {}, row_view(kvpair[1])),
+                    reverse=reverse,
+                )
+            ),
+            self.row_model,
+        )
+
+    def to_dict(self):
+        return {
+            "model": self.row_model.__name__,
+            "rows": [content.model_dump() for content in self.rows.values()],
+        }
+
+
+class ColumnarRows(Mapping):
+    """
+    Rows of a data sheet, mapping row IDs to row model instances like the dict it
+    replaces, but stored as one list of values per field. Strings are interned, so
+    that values repeated across rows are stored once.
+
+    Model instances are only created when a row is looked up, and are not kept.
+    Filtering, sorting and concatenation work on the columns.
+    """
+
+    def __init__(self, row_class, ids, columns):
+        self.row_class = row_class
+        self.ids = ids
+        self.columns = columns
+        self.positions = {row_id: i for i, row_id in enumerate(ids)}
+
+    @classmethod
+    def from_instances(cls, instances, row_class=None):
+        """
+        Store instances of a pydantic model by column, or return None if they are
+        not all instances of that model, or if any has extra fields, which have no
+        column. The model defaults to that of the first instance. Later rows replace
+        earlier ones with the same ID, in place.
+        """
+        row_class = row_class or type(instances[0])
+
+        if not (isinstance(row_class, type) and issubclass(row_class, BaseModel)):
+            return None
+
+        if any(
+            type(instance) is not row_class or instance.__pydantic_extra__
+            for instance in instances
+        ):
+            return None
+
+        ids = []
+        positions = {}
+        columns = {name: [] for name in row_class.model_fields}
+
+        for instance in instances:
+            values = vars(instance)
+            position = positions.get(instance.ID)
+
+            if position is None:
+                positions[instance.ID] = len(ids)
+                ids.append(instance.ID)
+
+                for name, column in columns.items():
+                    column.append(_intern(values[name]))
+            else:
+                for name, column in columns.items():
+                    column[position] = _intern(values[name])
+
+        return cls(row_class, ids, columns)
+
+    @classmethod
+    def concat(cls, parts):
+        """
+        Concatenate the rows of several ColumnarRows of the same model, or return
+        None if their models differ.
+        """
+        row_class = parts[0].row_class
+
+        if any(part.row_class is not row_class for part in parts):
+            return None
+
+        ids = []
+        positions = {}
+        columns = {name: [] for name in parts[0].columns}
+
+        for part in parts:
+            for i, row_id in enumerate(part.ids):
+                position = positions.get(row_id)
+
+                if position is None:
+                    positions[row_id] = len(ids)
+                    ids.append(row_id)
+
+                    for name, column in columns.items():
+                        column.append(part.columns[name][i])
+                else:
+                    for name, column in columns.items():
+                        column[position] = part.columns[name][i]
+
+        return cls(row_class, ids, columns)
+
+    def row(self, i):
+        """Model instance of the row at position i."""
+        return self.row_class.model_construct(
+            **{name: column[i] for name, column in self.columns.items()}
+        )
+
+    def view(self, i):
+        """Read-only mapping of the fields of the row at position i to its values."""
+        return _RowView(self.columns, i)
+
+    def take(self, positions):
+        """Rows at the given positions, in the given order."""
+        positions = list(positions)
+
+        return ColumnarRows(
+            self.row_class,
+            [self.ids[i] for i in positions],
+            {
+                name: [column[i] for i in positions]
+                for name, column in self.columns.items()
+            },
+        )
+
+    def __getitem__(self, row_id):
+        return self.row(self.positions[row_id])
+
+    def __contains__(self, row_id):
+        return row_id in self.positions
+
+    def __iter__(self):
+        return iter(self.ids)
+
+    def __len__(self):
+        return len(self.ids)
+
+
+def row_view(row):
+    """
+    Read-only mapping of the fields of a row, including any extra fields of a
+    pydantic model, to their values, without copying them.
+    """
+    if isinstance(row, Mapping):
+        return MappingProxyType(row)
+
+    return _ModelView(row)
+
+
+class _ModelView(Mapping):
+    def __init__(self, row):
+        self.fields = vars(row)
+        self.extra = getattr(row, "__pydantic_extra__", None) or {}
+
+    def __getitem__(self, name):
+        if name in self.fields:
+            return self.fields[name]
+
+        return self.extra[name]
+
+    def __iter__(self):
+        yield from self.fields
+        yield from (name for name in self.extra if name not in self.fields)
+
+    def __len__(self):
+        return len(self.fields) + sum(name not in self.fields for name in self.extra)
+
+
+class _RowView(Mapping):
+    def __init__(self, columns, i):
+        self.columns = columns
+        self.i = i
+
+    def __getitem__(self, name):
+        return self.columns[name][self.i]
+
+    def __iter__(self):
+        return iter(self.columns)
+
+    def __len__(self):
+        return len(self.columns)
+
+
+def _intern(value):
+    return sys.intern(value) if type(value) is str else value
@@ -1,12 +1,15 @@
-import copy
 import logging
-from collections import defaultdict
+import multiprocessing
+from collections import ChainMap, defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import ExitStack
 
 from rpft.logger.logger import logging_context
 from rpft.parsers.common.cellparser import CellParser
 from rpft.parsers.common.rowparser import RowParser
 from rpft.parsers.common.sheetparser import SheetParser
-from rpft.parsers.creation import map_template_arguments
+from rpft.parsers.creation import get_sheet_arguments, map_template_arguments
+from rpft.parsers.creation.datasheet import row_view
 from rpft.parsers.creation.flowrowmodel import (
     Condition,
     Edge,
@@ -35,6 +38,7 @@ from rpft.rapidpro.models.nodes import (
     TransferAirtimeNode,
 )
 from rpft.rapidpro.models.routers import SwitchRouter
+from rpft.rapidpro.utils import deterministic_uuids, stable_uuid, uuid_scope
 
 
 LOGGER = logging.getLogger(__name__)
@@ -322,7 +326,7 @@ class FlowParser:
         rapidpro_container: The parent RapidProContainer to contain the flow generated
             by this parser.
         flow_name: Name to be given to the flow.
-        table: tablib.Dataset: The sheet rows generating the flow;
+        table: tablib.Dataset or CompiledSheet: The sheet rows generating the flow;
             either table or sheet_parser must be provided
         flow_uuid: UUID to be given to the flow.
         context: Context to be used when instantiating templates in the flow.
@@ -374,8 +378,9 @@ class FlowParser:
         return self.current_node_group()
 
     def parse(self, add_to_container=True):
-        self._parse_block()
-        flow_container = self._compile_flow()
+        with uuid_scope("flow", self.flow_name):
+            self._parse_block()
+            flow_container = self._compile_flow()
         if add_to_container:
             self.rapidpro_container.add_flow(flow_container)
         return flow_container
@@ -415,6 +420,8 @@ class FlowParser:
                     if not row.is_starting_row():
                         self._parse_noop_row(row, store_row_id=False)
 
+                    self.sheet_parser.push_scope()
+
                     for i, entry in enumerate(row.mainarg_iterlist):
                         self.sheet_parser.go_to_bookmark(str(depth))
                         self.sheet_parser.add_to_context(iteration_variable, entry)
@@ -424,11 +431,7 @@ class FlowParser:
 
                     self.node_group_stack.pop()
                     self.append_node_group(new_node_group, row.row_id)
-                    self.sheet_parser.remove_from_context(iteration_variable)
-
-                    if index_variable:
-                        self.sheet_parser.remove_from_context(index_variable)
-
+                    self.sheet_parser.pop_scope()
                     self.sheet_parser.remove_bookmark(str(depth))
                 elif row.type == "begin_block":
                     new_node_group = NodeGroup()
@@ -443,13 +446,19 @@ class FlowParser:
                     self.append_node_group(new_node_group, row.row_id)
                 else:
                     with logging_context(f"row {row_idx}"):
-                        self._parse_row(row)
+                        self._parse_row_in_uuid_scope(row, row_idx)
 
             row, row_idx = self.sheet_parser.parse_next_row(
                 omit_templating=omit_content,
                 return_index=True,
             )
 
+    def _parse_row_in_uuid_scope(self, row, row_idx):
+        # UUIDs are derived from the row ID, if any, so that they do not change when
+        # rows are inserted or removed elsewhere in the sheet.
+        with uuid_scope(*(("row", row.row_id) if row.row_id else ("line", row_idx))):
+            self._parse_row(row)
+
     def _is_end_of_block(self, block_type, row):
         block_end_map = {
             "end_for": "for",
@@ -816,7 +825,9 @@ class FlowParser:
         """
 
         flow_container = FlowContainer(
-            flow_name=self.flow_name, uuid=self.flow_uuid, type=self.flow_type
+            flow_name=self.flow_name,
+            uuid=self.flow_uuid or stable_uuid("flow", self.flow_name),
+            type=self.flow_type,
         )
         if not len(self.node_group_stack) == 1:
             raise Exception("Unexpected end of flow. Did you forget end_for/end_block?")
@@ -849,6 +860,14 @@ class FlowParser:
                 " have to be provided."
             )
 
+    def get_flow_name(sheet_name, data_sheet, data_row_id, new_name=""):
+        base_name = new_name or sheet_name
+
+        if data_sheet and data_row_id:
+            return " - ".join([base_name, data_row_id])
+
+        return base_name
+
     def _parse_flow(
         sheet_name,
         data_sheet,
@@ -861,32 +880,38 @@ class FlowParser:
         definition=None,
         flow_type=None,
     ):
-        base_name = new_name or sheet_name
-        context = copy.copy(context or {})
+        flow_name = FlowParser.get_flow_name(
+            sheet_name, data_sheet, data_row_id, new_name
+        )
+        # Scopes, innermost first: template arguments, the data row and the given
+        # context. Only the (initially empty) innermost one is written to, so that
+        # none of the others need to be copied.
+        scopes = [context or {}]
 
         if data_sheet and data_row_id:
-            flow_name = " - ".join([base_name, data_row_id])
-            context.update(dict(definition.get_data_sheet_row(data_sheet, data_row_id)))
-        else:
-            if data_sheet or data_row_id:
-                LOGGER.warn(
-                    "For create_flow, if no data_sheet is provided, "
-                    "data_row_id should be blank as well."
-                )
-
-            flow_name = base_name
+            data_row = definition.get_data_sheet_row(data_sheet, data_row_id)
+            scopes.insert(0, row_view(data_row))
+        elif data_sheet or data_row_id:
+            LOGGER.warn(
+                "For create_flow, if no data_sheet is provided, "
+                "data_row_id should be blank as well."
+            )
 
         template_sheet = definition.get_template(sheet_name)
+
+        for name in get_sheet_arguments(template_sheet, template_arguments):
+            definition.record_dependency("data_sheet", name)
+
         context = map_template_arguments(
             template_sheet,
             template_arguments,
-            context,
+            ChainMap({}, *scopes),
             definition.data_sheets,
         )
         flow_parser = FlowParser(
             rapidpro_container,
             flow_name,
-            template_sheet.table,
+            template_sheet.compiled_table,
             context=context,
             definition=definition,
             flow_type=flow_type,
@@ -898,61 +923,209 @@ class FlowParser:
             return flow_parser.parse(add_to_container=False)
 
     @classmethod
-    def parse_all(cls, definition, rapidpro_container):
+    def parse_all(
+        cls,
+        definition,
+        rapidpro_container,
+        jobs=1,
+        build_cache=None,
+        uuid_namespace=None,
+    ):
+        """
+        Parse all flows of the chatbot definition and add them to rapidpro_container.
+
+        If jobs is greater than 1, flows are parsed in a pool of that many worker
+        processes. Group and flow UUIDs recorded while parsing are merged into
+        rapidpro_container, and flows are added in the same order as in serial mode.
+
+        If a build_cache is given, flows whose inputs have not changed since they were
+        stored in the cache are taken from it rather than parsed again.
+
+        If a uuid_namespace is given, the UUIDs of each flow are derived from it, the
+        flow name and the rows generating them, rather than generated randomly.
+        """
+        tasks = cls._get_flow_tasks(definition)
+        results = [None] * len(tasks)
+
+        if build_cache:
+            for i, task in enumerate(tasks):
+                results[i] = build_cache.get(definition, task, uuid_namespace)
+
+        pending = [i for i, result in enumerate(results) if result is None]
+
+        if jobs > 1 and len(pending) > 1:
+            builds = cls._parse_flows_in_pool(
+                definition, [tasks[i] for i in pending], jobs, uuid_namespace
+            )
+        else:
+            builds = (
+                cls._parse_flow_task(definition, tasks[i], uuid_namespace)
+                for i in pending
+            )
+
+        for i, (flow, uuid_dict, dependencies) in zip(pending, builds):
+            if build_cache:
+                build_cache.put(
+                    definition, tasks[i], flow, uuid_dict, dependencies, uuid_namespace
+                )
+
+            results[i] = (flow, uuid_dict)
+
         flows = {}
 
+        for (logging_prefixes, _), (flow, uuid_dict) in zip(tasks, results):
+            with ExitStack() as stack:
+                for logging_prefix in logging_prefixes:
+                    stack.enter_context(logging_context(logging_prefix))
+
+                for name, uuid in uuid_dict.flow_dict.items():
+                    rapidpro_container.record_flow_uuid(name, uuid)
+
+                for name, uuid in uuid_dict.group_dict.items():
+                    rapidpro_container.record_group_uuid(name, uuid)
+
+                if flow.name in flows:
+                    LOGGER.warning(
+                        f"Multiple definitions of flow '{flow.name}'. Overwriting."
+                    )
+
+            flows[flow.name] = flow
+
+        for flow in flows.values():
+            rapidpro_container.add_flow(flow)
+
+    @classmethod
+    def _get_flow_tasks(cls, definition):
+        """
+        List the flows to be generated as (logging_prefixes, arguments) pairs, where
+        arguments are positional arguments for _parse_flow (excluding the container).
+        """
+        tasks = []
+
         for logging_prefix, row in definition.flow_definitions:
-            with logging_context(f"{logging_prefix} | {row.sheet_name[0]}"):
-                flow_type = row.options.get("flow_type") or "messaging"
-                if row.data_sheet and not row.data_row_id:
-                    data_rows = definition.get_data_sheet_rows(row.data_sheet)
-
-                    for data_row_id in data_rows.keys():
-                        with logging_context(f'with data_row_id "{data_row_id}"'):
-                            flow = cls._parse_flow(
+            logging_prefix = f"{logging_prefix} | {row.sheet_name[0]}"
+            flow_type = row.options.get("flow_type") or "messaging"
+
+            if row.data_sheet and not row.data_row_id:
+                data_rows = definition.get_data_sheet_rows(row.data_sheet)
+
+                for data_row_id in data_rows.keys():
+                    tasks.append(
+                        (
+                            [logging_prefix, f'with data_row_id "{data_row_id}"'],
+                            (
                                 row.sheet_name[0],
                                 row.data_sheet,
                                 data_row_id,
                                 row.template_arguments,
-                                rapidpro_container,
                                 row.new_name,
-                                context=definition.global_context,
-                                definition=definition,
-                                flow_type=flow_type,
-                            )
-
-                            if flow.name in flows:
-                                LOGGER.warning(
-                                    f"Multiple definitions of flow '{flow.name}'. "
-                                    "Overwriting."
-                                )
-
-                            flows[flow.name] = flow
-                elif not row.data_sheet and row.data_row_id:
+                                flow_type,
+                            ),
+                        )
+                    )
+            elif not row.data_sheet and row.data_row_id:
+                with logging_context(logging_prefix):
                     raise Exception(
                         "For create_flow, if data_row_id is provided, data_sheet must"
                         " also be provided."
                     )
-                else:
-                    flow = cls._parse_flow(
-                        row.sheet_name[0],
-                        row.data_sheet,
-                        row.data_row_id,
-                        row.template_arguments,
-                        rapidpro_container,
-                        row.new_name,
-                        context=definition.global_context,
-                        definition=definition,
-                        flow_type=flow_type,
+            else:
+                tasks.append(
+                    (
+                        [logging_prefix],
+                        (
+                            row.sheet_name[0],
+                            row.data_sheet,
+                            row.data_row_id,
+                            row.template_arguments,
+                            row.new_name,
+                            flow_type,
+                        ),
                     )
+                )
 
-                    if flow.name in flows:
-                        LOGGER.warning(
-                            f"Multiple definitions of flow '{flow.name}'. "
-                            "Overwriting."
-                        )
+        return tasks
 
-                    flows[flow.name] = flow
+    @classmethod
+    def _parse_flow_task(cls, definition, task, uuid_namespace=None):
+        """
+        Parse a single flow into a container of its own.
 
-        for flow in flows.values():
-            rapidpro_container.add_flow(flow)
+        Returns:
+            The flow, the group/flow UUIDs recorded while parsing it and the
+            dependencies (templates, data sheets and data rows) it was generated from.
+        """
+        logging_prefixes, (
+            sheet_name,
+            data_sheet,
+            data_row_id,
+            template_arguments,
+            new_name,
+            flow_type,
+        ) = task
+        rapidpro_container = RapidProContainer()
+
+        with ExitStack() as stack:
+            for logging_prefix in logging_prefixes:
+                stack.enter_context(logging_context(logging_prefix))
+
+            dependencies = stack.enter_context(definition.track_dependencies())
+            stack.enter_context(deterministic_uuids(uuid_namespace))
+            flow = cls._parse_flow(
+                sheet_name,
+                data_sheet,
+                data_row_id,
+                template_arguments,
+                rapidpro_container,
+                new_name,
+                context=definition.global_context,
+                definition=definition,
+                flow_type=flow_type,
+            )
+
+        return flow, rapidpro_container.uuid_dict, dependencies
+
+    @classmethod
+    def _parse_flows_in_pool(cls, definition, tasks, jobs, uuid_namespace=None):
+        # The definition is passed to each worker once, rather than with every task.
+        with ProcessPoolExecutor(
+            max_workers=jobs,
+            mp_context=_get_mp_context(),
+            initializer=_init_worker,
+            initargs=(definition, uuid_namespace),
+        ) as executor:
+            futures = [executor.submit(_parse_flow_in_worker, task) for task in tasks]
+
+            for task, future in zip(tasks, futures):
+                with ExitStack() as stack:
+                    for logging_prefix in task[0]:
+                        stack.enter_context(logging_context(logging_prefix))
+
+                    result = future.result()
+
+                yield result
+
+
+_worker_definition = None
+_worker_uuid_namespace = None
+
+
+def _get_mp_context():
+    # Data sheets may be instances of models created on the fly (see
+    # model_from_headers), which cannot be pickled; forked workers inherit them
+    # instead.
+    if "fork" in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context("fork")
+
+    return None
+
+
+def _init_worker(definition, uuid_namespace):
+    global _worker_definition, _worker_uuid_namespace
+
+    _worker_definition = definition
+    _worker_uuid_namespace = uuid_namespace
+
+
+def _parse_flow_in_worker(task):
+    return FlowParser._parse_flow_task(_worker_definition, task, _worker_uuid_namespace)
@@ -1,4 +1,7 @@
+from contextlib import contextmanager
+
 from rpft.parsers.common.rowparser import ParserModel
+from rpft.parsers.common.sheetparser import CompiledSheet
 
 
 class Condition(ParserModel):
@@ -73,6 +76,7 @@ class TemplateSheet:
         self.name = name
         self.table = table
         self.argument_definitions = argument_definitions
+        self.compiled_table = CompiledSheet(table)
 
 
 class ChatbotDefinition:
@@ -91,16 +95,37 @@ class ChatbotDefinition:
         self.surveys = surveys
         self.survey_questions = survey_questions
         self.global_context = global_context or {}
+        self.dependencies = None
 
     def get_data_sheet_rows(self, sheet_name):
+        self.record_dependency("data_sheet", sheet_name)
         return self.data_sheets[sheet_name].rows
 
     def get_data_sheet_row(self, sheet_name, row_id):
+        self.record_dependency("data_row", sheet_name, row_id)
         return self.data_sheets[sheet_name].rows[row_id]
 
     def get_template(self, name) -> TemplateSheet:
+        self.record_dependency("template", name)
         return self.templates[name]
 
+    def record_dependency(self, kind, *name):
+        if self.dependencies is not None:
+            self.dependencies.add((kind, *name))
+
+    @contextmanager
+    def track_dependencies(self):
+        """
+        Collect the templates, data sheets and data rows accessed within the context.
+        """
+        previous = self.dependencies
+        self.dependencies = set()
+
+        try:
+            yield self.dependencies
+        finally:
+            self.dependencies = previous
+
 
 class SurveyConfig(ParserModel):
     variable_prefix: str = ""
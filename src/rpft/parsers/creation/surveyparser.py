@@ -1,10 +1,12 @@
 import copy
 import logging
 import re
+from collections import ChainMap
 
 from rpft.logger.logger import logging_context
 from rpft.parsers.common.rowparser import ParserModel
 from rpft.parsers.creation import map_template_arguments
+from rpft.parsers.creation.datasheet import row_view
 from rpft.parsers.creation.models import ChatbotDefinition
 from rpft.parsers.creation.flowparser import FlowParser
 from rpft.rapidpro.models.containers import RapidProContainer
@@ -219,13 +221,13 @@ class SurveyParser:
         context = map_template_arguments(
             self.question_template,
             question.template_arguments,
-            dict(question.data_row),
+            ChainMap({}, row_view(question.data_row)),
             self.definition.data_sheets,
         )
         flow_parser = FlowParser(
             container,
             f"survey - {question.survey_name} - question - {question.ID}",
-            self.question_template.table,
+            self.question_template.compiled_table,
             context=context,
             definition=self.definition,
         )
@@ -254,7 +256,7 @@ class SurveyParser:
         flow_parser = FlowParser(
             container,
             f"survey - {survey.name}",
-            self.survey_template.table,
+            self.survey_template.compiled_table,
             context=context,
             definition=self.definition,
         )
@@ -1,13 +1,24 @@
 import json
 import re
+import threading
 from abc import ABC
 from collections.abc import Mapping
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
 from pathlib import Path
 
 import tablib
 from googleapiclient.discovery import build
+from odf import opendocument
+from openpyxl import load_workbook
+from tablib.formats._ods import ODSFormat
+from tablib.formats._xlsx import XLSXFormat
 
-from rpft.google import get_credentials
+from rpft.google import Drive, get_credentials
+
+
+_thread_local = threading.local()
+_credentials_lock = threading.Lock()
 
 
 class SheetReaderError(Exception):
@@ -24,6 +35,45 @@ class Sheet:
         return f"Sheet(name: '{self.name}')"
 
 
+class LazySheets(Mapping):
+    """
+    Mapping of sheet names to sheets, where the table of each sheet is only loaded
+    the first time the sheet is accessed.
+    """
+
+    def __init__(self, reader, names, load):
+        """
+        Args:
+            reader: the reader the sheets belong to
+            names: names of all the sheets available to the reader
+            load: function taking a sheet name and returning its table
+        """
+        self.reader = reader
+        self._load = load
+        self._sheets = dict.fromkeys(names)
+
+    def __getitem__(self, name):
+        sheet = self._sheets[name]
+
+        if sheet is None:
+            sheet = Sheet(reader=self.reader, name=name, table=self._load(name))
+            self._sheets[name] = sheet
+
+        return sheet
+
+    def __contains__(self, name):
+        return name in self._sheets
+
+    def __iter__(self):
+        return iter(self._sheets)
+
+    def __len__(self):
+        return len(self._sheets)
+
+    def is_loaded(self, name):
+        return self._sheets.get(name) is not None
+
+
 class AbstractSheetReader(ABC):
     @property
     def sheets(self) -> Mapping[str, Sheet]:
@@ -36,6 +86,16 @@ class AbstractSheetReader(ABC):
     def can_process(cls, path):
         return False
 
+    def close(self):
+        """Release any resources held by the reader, e.g. open files."""
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, exc_tb):
+        self.close()
+
     def __repr__(self):
         return f"{type(self).__name__}(name: '{self.name}')"
 
@@ -43,10 +103,12 @@ class AbstractSheetReader(ABC):
 class CSVSheetReader(AbstractSheetReader):
     def __init__(self, path):
         self.name = path
-        self._sheets = {
-            f.stem: Sheet(reader=self, name=f.stem, table=load_csv(f))
-            for f in Path(path).glob("*.csv")
-        }
+        self._paths = {f.stem: f for f in Path(path).glob("*.csv")}
+        self._sheets = LazySheets(
+            self,
+            self._paths.keys(),
+            lambda name: load_csv(self._paths[name]),
+        )
 
     @classmethod
     def can_process(cls, location):
@@ -75,14 +137,22 @@ class XLSXSheetReader(AbstractSheetReader):
     def __init__(self, filename):
         self.name = filename
         with open(filename, "rb") as table_data:
-            data = tablib.Databook().load(table_data.read(), "xlsx")
-        self._sheets = {}
-        for sheet in data.sheets():
-            self.sheets[sheet.title] = Sheet(
-                reader=self,
-                name=sheet.title,
-                table=sanitize(sheet),
+            self._workbook = load_workbook(
+                BytesIO(table_data.read()),
+                read_only=True,
+                data_only=True,
             )
+        self._sheets = LazySheets(
+            self,
+            [worksheet.title for worksheet in self._workbook.worksheets],
+            self._load_table,
+        )
+
+    def _load_table(self, name):
+        data = tablib.Dataset()
+        XLSXFormat.import_sheet(data, self._workbook[name])
+
+        return sanitize(data)
 
     @classmethod
     def can_process(cls, location):
@@ -91,46 +161,32 @@ class XLSXSheetReader(AbstractSheetReader):
 
 class GoogleSheetReader(AbstractSheetReader):
 
-    def __init__(self, spreadsheet_id):
+    def __init__(self, spreadsheet_id, cache=None, modified_time=None):
         """
         Args:
             spreadsheet_id: You can extract it from the spreadsheed URL, like this
             https://docs.google.com/spreadsheets/d/[spreadsheet_id]/edit
+            cache: GoogleSheetCache to take the content of the spreadsheet from, if
+            it has not been modified since it was cached
+            modified_time: time the spreadsheet was last modified in Google Drive;
+            the cache is only used if this is given
         """
 
         self.name = spreadsheet_id
+        use_cache = cache is not None and modified_time is not None
+        content = cache.get(spreadsheet_id, modified_time) if use_cache else None
 
-        service = build("sheets", "v4", credentials=get_credentials())
-        sheet_metadata = (
-            service.spreadsheets().get(spreadsheetId=spreadsheet_id).execute()
-        )
-        sheets = sheet_metadata.get("sheets", "")
-        titles = []
-        for sheet in sheets:
-            title = sheet.get("properties", {}).get("title", "Sheet1")
-            titles.append(title)
-
-        result = (
-            service.spreadsheets()
-            .values()
-            .batchGet(spreadsheetId=spreadsheet_id, ranges=titles)
-            .execute()
-        )
+        if content is None:
+            content = fetch_spreadsheet(spreadsheet_id)
 
-        self._sheets = {}
-        for sheet in result.get("valueRanges", []):
-            name = sheet.get("range", "").split("!")[0]
-            if name.startswith("'") and name.endswith("'"):
-                name = name[1:-1]
-            content = sheet.get("values", [])
-            if name in self._sheets:
-                raise ValueError(f"Warning: Duplicate sheet name: {name}")
-            else:
-                self._sheets[name] = Sheet(
-                    reader=self,
-                    name=name,
-                    table=self._table_from_content(content),
-                )
+            if use_cache:
+                cache.put(spreadsheet_id, modified_time, content)
+
+        self._content = content
+        self._sheets = LazySheets(self, list(content.keys()), self._load_table)
+
+    def _load_table(self, name):
+        return self._table_from_content(self._content.pop(name))
 
     def _table_from_content(self, content):
         table = tablib.Dataset()
@@ -154,6 +210,125 @@ class GoogleSheetReader(AbstractSheetReader):
         return bool(re.fullmatch(r"[a-z0-9_-]{44}", location, re.IGNORECASE))
 
 
+class GoogleSheetCache:
+    """
+    On-disk cache of the content of Google spreadsheets, keyed by spreadsheet ID and
+    the time at which the spreadsheet was last modified in Google Drive.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.path.mkdir(parents=True, exist_ok=True)
+
+    def get(self, spreadsheet_id, modified_time):
+        path = self._entry_path(spreadsheet_id)
+
+        if not path.exists():
+            return None
+
+        entry = load_json(path)
+
+        if entry.get("modified_time") != modified_time.isoformat():
+            return None
+
+        return entry["sheets"]
+
+    def put(self, spreadsheet_id, modified_time, content):
+        path = self._entry_path(spreadsheet_id)
+        temp_path = path.with_suffix(".tmp")
+
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(
+                {"modified_time": modified_time.isoformat(), "sheets": content},
+                f,
+                ensure_ascii=False,
+            )
+
+        temp_path.replace(path)
+
+    def _entry_path(self, spreadsheet_id):
+        return self.path / f"{spreadsheet_id}.json"
+
+
+def create_google_sheet_readers(spreadsheet_ids, cache=None, jobs=8):
+    """
+    Create readers for multiple Google spreadsheets, fetching them concurrently.
+
+    Args:
+        spreadsheet_ids: IDs of the spreadsheets to read
+        cache: optional GoogleSheetCache; the modified times of all spreadsheets are
+        requested in a single batch to decide which ones can be taken from it
+        jobs: maximum number of spreadsheets to fetch at the same time
+    Returns:
+        list of GoogleSheetReader, in the same order as spreadsheet_ids
+    """
+
+    if not spreadsheet_ids:
+        return []
+
+    modified_times = Drive.get_modified_time(list(spreadsheet_ids)) if cache else {}
+
+    def create_reader(spreadsheet_id):
+        return GoogleSheetReader(
+            spreadsheet_id,
+            cache=cache,
+            modified_time=modified_times.get(spreadsheet_id),
+        )
+
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        return list(executor.map(create_reader, spreadsheet_ids))
+
+
+def fetch_spreadsheet(spreadsheet_id):
+    """
+    Fetch the values of all sheets in a Google spreadsheet, as a dict of sheet
+    titles to lists of rows.
+    """
+    service = get_sheets_service()
+    sheet_metadata = service.spreadsheets().get(spreadsheetId=spreadsheet_id).execute()
+    sheets = sheet_metadata.get("sheets", "")
+    titles = []
+    for sheet in sheets:
+        title = sheet.get("properties", {}).get("title", "Sheet1")
+        titles.append(title)
+
+    result = (
+        service.spreadsheets()
+        .values()
+        .batchGet(spreadsheetId=spreadsheet_id, ranges=titles)
+        .execute()
+    )
+
+    content = {}
+    for sheet in result.get("valueRanges", []):
+        name = sheet.get("range", "").split("!")[0]
+        if name.startswith("'") and name.endswith("'"):
+            name = name[1:-1]
+        if name in content:
+            raise ValueError(f"Warning: Duplicate sheet name: {name}")
+        content[name] = sheet.get("values", [])
+
+    return content
+
+
+def get_sheets_service():
+    """
+    Return the Google Sheets API client of the current thread.
+
+    API clients are not thread-safe, so each thread builds its own client once and
+    reuses it for all subsequent requests.
+    """
+    service = getattr(_thread_local, "sheets_service", None)
+
+    if service is None:
+        with _credentials_lock:
+            credentials = get_credentials()
+        service = build("sheets", "v4", credentials=credentials)
+        _thread_local.sheets_service = service
+
+    return service
+
+
 class DatasetSheetReader(AbstractSheetReader):
     def __init__(self, datasets, name):
         self._sheets = {d.title: Sheet(self, d.title, d) for d in datasets}
@@ -162,17 +337,23 @@ class DatasetSheetReader(AbstractSheetReader):
 
 class ODSSheetReader(AbstractSheetReader):
     def __init__(self, path):
-        book = tablib.Databook()
-
         with open(path, "rb") as f:
-            book.load(f, format="ods")
+            document = opendocument.load(f)
+
+        self._tables = {}
+        for node in document.spreadsheet.childNodes:
+            if node.qname[1] == "table":
+                self._tables[node.getAttribute("name")] = node
 
-        self._sheets = {
-            sheet.title: Sheet(self, sheet.title, sanitize(sheet))
-            for sheet in book.sheets()
-        }
+        self._sheets = LazySheets(self, self._tables.keys(), self._load_table)
         self.name = str(path)
 
+    def _load_table(self, name):
+        data = tablib.Dataset()
+        ODSFormat.import_sheet(data, self._tables[name])
+
+        return sanitize(data)
+
     @classmethod
     def can_process(cls, location):
         return Path(location).suffix.lower() == ".ods"
@@ -0,0 +1,215 @@
+"""
+Binary snapshot format for workbooks.
+
+A snapshot holds the headers and rows of every sheet of a workbook, with each
+distinct cell value stored only once. All integers are little-endian. The layout
+is:
+
+- header: magic bytes, format version, number of sheets, number of strings, offset
+  of the string table and offset of the sheet index
+- string table: (number of strings + 1) uint32 offsets into the UTF-8 blob that
+  follows them
+- cell data: for each sheet, one uint32 string ID per cell, row by row, starting
+  with the headers
+- sheet index: for each sheet, the string ID of its name, flags, number of columns,
+  number of rows and offset of its cell data
+
+Snapshots are memory-mapped when read. Strings are decoded the first time they are
+needed and the cells of a sheet are only decoded when the sheet is accessed. The
+map is released once every sheet has been decoded, or when the reader is closed.
+"""
+
+import mmap
+import struct
+import sys
+from array import array
+from pathlib import Path
+
+import tablib
+
+from rpft.parsers.sheets import AbstractSheetReader, LazySheets
+
+
+MAGIC = b"RPFTSNAP"
+VERSION = 1
+HEADER = struct.Struct("<8sIIIQQ")
+SHEET_ENTRY = struct.Struct("<IIIIQ")
+HAS_HEADERS = 1
+NONE_ID = 0xFFFFFFFF
+
+
+class SnapshotError(Exception):
+    pass
+
+
+class SnapshotSheetReader(AbstractSheetReader):
+    def __init__(self, path):
+        self.name = str(path)
+
+        with open(path, "rb") as f:
+            self._buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        try:
+            self._read_index(path)
+        except Exception:
+            self.close()
+            raise
+
+        self._sheets = LazySheets(self, list(self._entries), self._load_table)
+
+        if not self._unloaded:
+            self.close()
+
+    def _read_index(self, path):
+        (
+            magic,
+            version,
+            sheet_count,
+            string_count,
+            strings_offset,
+            index_offset,
+        ) = HEADER.unpack_from(self._buffer, 0)
+
+        if magic != MAGIC:
+            raise SnapshotError(f"Not a workbook snapshot, file={path}")
+
+        if version != VERSION:
+            raise SnapshotError(
+                f"Unsupported snapshot version {version}, expected {VERSION}"
+            )
+
+        self._string_offsets = read_ids(self._buffer, strings_offset, string_count + 1)
+        self._blob_offset = strings_offset + 4 * (string_count + 1)
+        self._strings = {NONE_ID: None}
+        self._entries = {}
+
+        for i in range(sheet_count):
+            name_id, *entry = SHEET_ENTRY.unpack_from(
+                self._buffer, index_offset + i * SHEET_ENTRY.size
+            )
+            self._decode_strings([name_id])
+            self._entries[self._strings[name_id]] = entry
+
+        self._unloaded = set(self._entries)
+
+    def close(self):
+        """Release the memory map of the snapshot."""
+        if self._buffer is not None:
+            self._buffer.close()
+            self._buffer = None
+
+    def _load_table(self, name):
+        if self._buffer is None:
+            raise SnapshotError(f"Snapshot is closed, file={self.name}")
+
+        flags, column_count, row_count, offset = self._entries[name]
+        ids = read_ids(self._buffer, offset, column_count * row_count)
+        self._decode_strings(ids)
+        self._unloaded.discard(name)
+
+        if not self._unloaded:
+            self.close()
+
+        values = map(self._strings.__getitem__, ids)
+        rows = list(zip(*[values] * column_count)) if column_count else []
+        headers = list(rows.pop(0)) if rows and flags & HAS_HEADERS else None
+
+        return tablib.Dataset(*rows, headers=headers, title=name)
+
+    def _decode_strings(self, ids):
+        buffer = self._buffer
+        offsets = self._string_offsets
+        base = self._blob_offset
+
+        for i in set(ids).difference(self._strings):
+            self._strings[i] = str(
+                buffer[base + offsets[i] : base + offsets[i + 1]], "utf-8"
+            )
+
+    @classmethod
+    def can_process(cls, location):
+        path = Path(location)
+
+        if not path.is_file():
+            return False
+
+        with open(path, "rb") as f:
+            return f.read(len(MAGIC)) == MAGIC
+
+
+def write_snapshot(reader: AbstractSheetReader, fp):
+    """
+    Write all sheets of a reader to a binary file object as a snapshot.
+    """
+    strings = {}
+    sheets = []
+
+    def intern(value):
+        if value is None:
+            return NONE_ID
+
+        return strings.setdefault(str(value), len(strings))
+
+    for name, sheet in reader.sheets.items():
+        table = sheet.table
+        rows = ([table.headers] if table.headers is not None else []) + list(table)
+        ids = array("I", [intern(value) for row in rows for value in row])
+        sheets.append(
+            (
+                intern(name),
+                HAS_HEADERS if table.headers is not None else 0,
+                table.width,
+                len(rows),
+                ids,
+            )
+        )
+
+    encoded = [s.encode("utf-8") for s in strings]
+    offsets = array("I", [0])
+
+    for s in encoded:
+        offsets.append(offsets[-1] + len(s))
+
+    blob = b"".join(encoded)
+    padding = b"\0" * (-len(blob) % 4)
+    strings_offset = HEADER.size
+    data_offset = strings_offset + 4 * len(offsets) + len(blob) + len(padding)
+    index = []
+
+    for name_id, flags, column_count, row_count, ids in sheets:
+        index.append(
+            SHEET_ENTRY.pack(name_id, flags, column_count, row_count, data_offset)
+        )
+        data_offset += 4 * len(ids)
+
+    fp.write(
+        HEADER.pack(
+            MAGIC, VERSION, len(sheets), len(strings), strings_offset, data_offset
+        )
+    )
+    fp.write(to_little_endian(offsets))
+    fp.write(blob)
+    fp.write(padding)
+
+    for *_, ids in sheets:
+        fp.write(to_little_endian(ids))
+
+    fp.write(b"".join(index))
+
+
+def read_ids(buffer, offset, count):
+    ids = array("I")
+    ids.frombytes(buffer[offset : offset + 4 * count])
+
+    if sys.byteorder == "big":
+        ids.byteswap()
+
+    return ids
+
+
+def to_little_endian(ids):
+    if sys.byteorder == "big":
+        ids = array("I", ids)
+        ids.byteswap()
+
+    return ids.tobytes()
@@ -2,7 +2,7 @@ import json
 import logging
 import re
 from collections import defaultdict
-from functools import singledispatch
+from functools import lru_cache, singledispatch
 from pathlib import Path
 from typing import Any
 
@@ -18,8 +18,18 @@ PROP_ACCESSOR = "."
 META_KEY = "_idems"
 TABULATE_KEY = "tabulate"
 HEADERS_KEY = "headers"
+# Sheet listing the original titles of sheets whose titles had to be changed when
+# they were written, e.g. to fit the limits of XLSX
+SHEET_TITLES = "_idems_titles"
 Table = list[list[str]]
 Book = list[tuple[str, Table]]
+# Whitespace and separators between the entries of a JSON object, see iter_entries
+JSON_WHITESPACE = re.compile(r"[ \t\n\r]*")
+# Anything up to the next bracket that is not inside a string, see skip_value
+JSON_SKIP = re.compile(r'[^"\[\]{}]*(?:"[^"\\]*(?:\\.[^"\\]*)*"[^"\[\]{}]*)*')
+TEMPLATE_PATTERN = re.compile(r"{{.*?}}|{@.*?@}|{%.*?%}|@\(.*?\)")
+# Index suffix of a key, as in 'key[0]', see expand_keys
+KEY_INDEX_PATTERN = re.compile(r"(?:\[[\'\"]*(\-?[\d]+)[\'\"]*\]){1}$")
 
 
 def bookify(data: dict) -> Book:
@@ -31,6 +41,103 @@ def bookify(data: dict) -> Book:
     return [(k, tabulate(v, meta.get(k, {}))) for k, v in data.items() if k != META_KEY]
 
 
+def stream_book(text: str):
+    """
+    Named tables of a dict in JSON format, like bookify, but decoding and
+    tabulating one top-level entry at a time, so that only one table is held in
+    memory. Tables that come before the metadata are decoded again once it is found.
+    """
+    meta = None
+    deferred = []
+
+    for key, value, start, end in iter_entries(text):
+        if key == META_KEY:
+            meta = value.get(TABULATE_KEY, {})
+
+            for name, (name_start, name_end) in deferred:
+                yield name, tabulate(
+                    json.loads(text[name_start:name_end]), meta.get(name, {})
+                )
+
+            deferred = []
+        elif meta is None:
+            deferred.append((key, (start, end)))
+        else:
+            yield key, tabulate(value, meta.get(key, {}))
+
+    for name, (start, end) in deferred:
+        yield name, tabulate(json.loads(text[start:end]))
+
+
+def iter_entries(text: str, decode=True):
+    """
+    Keys and values of the JSON object in text, decoded one entry at a time, with
+    the start and end offsets of each value in text. If decode is False, values are
+    skipped over rather than decoded, and None is given instead.
+    """
+    decoder = json.JSONDecoder()
+    i = JSON_WHITESPACE.match(text).end()
+
+    if text[i : i + 1] != "{":
+        raise ValueError(f"Expected JSON object at offset {i}")
+
+    i = JSON_WHITESPACE.match(text, i + 1).end()
+
+    if text[i : i + 1] == "}":
+        return
+
+    while True:
+        key, i = decoder.raw_decode(text, i)
+        i = JSON_WHITESPACE.match(text, i).end()
+
+        if type(key) is not str or text[i : i + 1] != ":":
+            raise ValueError(f"Expected JSON object key at offset {i}")
+
+        start = JSON_WHITESPACE.match(text, i + 1).end()
+
+        if decode:
+            value, end = decoder.raw_decode(text, start)
+        else:
+            value, end = None, skip_value(text, start, decoder)
+
+        yield key, value, start, end
+
+        i = JSON_WHITESPACE.match(text, end).end()
+
+        if text[i : i + 1] == "}":
+            return
+
+        if text[i : i + 1] != ",":
+            raise ValueError(f"Expected ',' or '}}' at offset {i}")
+
+        i = JSON_WHITESPACE.match(text, i + 1).end()
+
+
+def skip_value(text: str, i: int, decoder=None) -> int:
+    """
+    Offset of the end of the JSON value that starts at offset i of text. Arrays
+    and objects are skipped over without being decoded.
+    """
+    if text[i : i + 1] not in ("[", "{"):
+        return (decoder or json.JSONDecoder()).raw_decode(text, i)[1]
+
+    depth = 0
+
+    while True:
+        bracket = text[i : i + 1]
+
+        if not bracket or bracket not in "[]{}":
+            raise ValueError(f"Unterminated JSON value at offset {i}")
+
+        depth += 1 if bracket in "[{" else -1
+        i += 1
+
+        if depth == 0:
+            return i
+
+        i = JSON_SKIP.match(text, i).end()
+
+
 def tabulate(data, meta: dict = {}) -> Table:
     """
     Convert a nested data structure to a tabular form
@@ -38,12 +145,8 @@ def tabulate(data, meta: dict = {}) -> Table:
     headers = meta.get(HEADERS_KEY, []) or list(
         {k: None for item in data for k, _ in item.items()}.keys()
     )
-    paths = keypaths(headers)
-    rows = []
-
-    for item in data:
-        obj = benedict(item)
-        rows += [[stringify(obj[kp]) for kp in paths]]
+    paths = [expand_keys(kp) for kp in keypaths(headers)]
+    rows = [[stringify(get_path(item, kp)) for kp in paths] for item in data]
 
     return [headers] + rows
 
@@ -52,7 +155,7 @@ def tabulate(data, meta: dict = {}) -> Table:
 def stringify(value, delimiters=DELIMS, **_) -> str:
     s = str(value)
 
-    return s if is_template(s) else re.sub(rf"([{delimiters}])", r"\\\1", s)
+    return s if is_template(s) else escape_pattern(delimiters).sub(r"\\\1", s)
 
 
 @stringify.register
@@ -106,12 +209,83 @@ def parse_tables(reader: AbstractSheetReader) -> dict:
     """
     Parse a workbook into a nested structure
     """
-    obj = benedict()
+    return benedict(dict(stream_tables(reader)), check_keys=False)
+
+
+def stream_tables(reader: AbstractSheetReader):
+    """
+    Top-level keys and values of the nested structure that parse_tables creates
+    from a workbook, in the same order. The sheets that make up each value are
+    only parsed when it is reached, so that one value is held in memory at a time.
+    """
+    meta = {}
+    groups = {}
+    titles = sheet_titles(reader)
 
     for title, sheet in reader.sheets.items():
-        obj.merge(parse_table(title, sheet.table.headers, sheet.table[:]))
+        if title == SHEET_TITLES:
+            continue
 
-    return obj
+        title = titles.get(title, title) or "table"
+        keys = expand_keys([title])
+        headers = sheet.table.headers
+
+        if headers and len(sheet.table):
+            groups.setdefault(META_KEY, [])
+            set_path(meta, [META_KEY, TABULATE_KEY] + keys + [HEADERS_KEY], headers)
+
+        groups.setdefault(keys[0], []).append((title, sheet))
+
+    for key, sheets in groups.items():
+        if key == META_KEY and meta:
+            yield key, meta[key]
+            continue
+
+        obj = {}
+
+        for title, sheet in sheets:
+            assign_table(obj, title, sheet.table.headers, sheet.table[:])
+
+        yield key, obj[key]
+
+
+def sheet_titles(reader: AbstractSheetReader) -> dict:
+    """
+    Original titles of the sheets of a workbook, by the titles they were written
+    with, as listed in its SHEET_TITLES sheet, if any.
+    """
+    index = reader.sheets.get(SHEET_TITLES)
+
+    return {row[0]: row[1] for row in index.table} if index else {}
+
+
+def assign_table(obj: dict, title: str, headers, rows):
+    """
+    Parse a table, without its metadata, directly into obj under its title.
+    """
+    set_path(obj, expand_keys([title]), [])
+
+    if not headers or not rows:
+        return
+
+    for kp, v in stream(title, headers, rows):
+        if kp[0] != META_KEY:
+            set_path(obj, kp, v)
+
+
+def dump_entries(entries, handle, indent=2):
+    """
+    Write the keys and values of a dict to handle in JSON format, one entry at a
+    time, exactly as json.dump would write the dict.
+    """
+    empty = True
+
+    for key, value in entries:
+        entry = json.dumps({key: value}, indent=indent)
+        handle.write(("{\n" if empty else ",\n") + entry[2:-2])
+        empty = False
+
+    handle.write("{}" if empty else "\n}")
 
 
 def parse_table(title: str = None, headers=tuple(), rows=tuple()):
@@ -127,11 +301,20 @@ def parse_table(title: str = None, headers=tuple(), rows=tuple()):
 
 
 def stream(title: str = None, headers=tuple(), rows=tuple()):
-    yield [META_KEY, TABULATE_KEY, title, HEADERS_KEY], headers
+    """
+    Key paths and values of the nested structure represented by a table. Key paths
+    are expanded (see expand_keys), and computed once for all rows.
+    """
+    prefix = expand_keys([title])
+    paths = [expand_keys(kp) for kp in keypaths(headers)]
+
+    yield [META_KEY, TABULATE_KEY] + prefix + [HEADERS_KEY], headers
 
     for i, row in enumerate(rows):
-        for h, v in zip(keypaths(headers), row):
-            yield [title, i] + h, parse_cell(v)
+        row_prefix = prefix + [i]
+
+        for path, v in zip(paths, row):
+            yield row_prefix + path, parse_cell(v)
 
 
 def keypaths(headers):
@@ -159,13 +342,101 @@ def normalise_key(key):
         return key
 
 
+def expand_keys(keypath):
+    """
+    Split the string keys of a key path, as benedict does, into keys separated by
+    the property accessor and list indices, e.g. ['a.b[0]', 1] -> ['a', 'b', 0, 1].
+    """
+    keys = []
+
+    for key in keypath:
+        if type(key) is str:
+            for part in key.split(PROP_ACCESSOR):
+                keys += split_key_indices(part)
+        else:
+            keys.append(key)
+
+    return keys
+
+
+def split_key_indices(key):
+    if "[" not in key or not key.endswith("]"):
+        return [key]
+
+    indices = []
+
+    while True:
+        match = KEY_INDEX_PATTERN.search(key)
+
+        if not match:
+            return [key] + indices
+
+        key = key[: match.start()]
+        indices.insert(0, int(match.group(1)))
+
+
+def get_path(obj, keys):
+    """
+    Value at an expanded key path, as looked up by benedict.
+    """
+    for key in keys:
+        if type(obj) in (list, tuple) and type(key) is int:
+            try:
+                obj = obj[key]
+            except IndexError:
+                raise KeyError(f"Invalid keys: {keys!r}")
+        elif isinstance(obj, dict) and key in obj:
+            obj = obj[key]
+        else:
+            raise KeyError(f"Invalid keys: {keys!r}")
+
+    return obj
+
+
+def set_path(obj, keys, value):
+    """
+    Set the value at an expanded key path, creating missing dicts and lists (padded
+    with None) along the way, as benedict does.
+    """
+    for key, subkey in zip(keys, keys[1:]):
+        try:
+            child = get_path(obj, [key])
+        except KeyError:
+            child = None
+
+        if type(child) not in (dict, list, tuple):
+            child = [] if type(subkey) is int else {}
+            set_key(obj, key, child)
+
+        obj = child
+
+    set_key(obj, keys[-1], value)
+
+
+def set_key(obj, key, value):
+    if type(key) is int:
+        try:
+            obj[key] = value
+        except IndexError:
+            obj += [None] * (key - len(obj))
+            obj.insert(key, value)
+    else:
+        obj[key] = value
+
+
 def create_obj(pairs):
-    obj = benedict()
+    """
+    Build a nested structure from pairs of expanded key paths and values, using
+    plain dicts and lists, which is converted to a benedict when complete.
+    """
+    obj = {}
 
     for kp, v in pairs:
-        obj[kp] = v
+        set_path(obj, kp, v)
 
-    return obj
+    # Expanded keys cannot contain the keypath separator, so there is no need for
+    # benedict to check every key again.
+    return benedict(obj, check_keys=False)
 
 
 def parse_cell(s: str, delimiters=DELIMS, depth=0) -> Any:
@@ -190,27 +461,47 @@ def parse_cell(s: str, delimiters=DELIMS, depth=0) -> Any:
     if is_template(clean):
         return clean
 
-    d = delimiters[depth] if depth < len(delimiters) else ""
-    pattern = rf"(?<!\\)\{d}"
+    separator, trailing, deeper, unescape = cell_patterns(delimiters, depth)
 
-    if d and re.search(pattern, clean):
+    if separator and separator.search(clean):
         seq = [
             parse_cell(item, delimiters=delimiters, depth=depth + 1)
-            for item in re.split(pattern, clean)
+            for item in separator.split(clean)
         ]
 
-        return seq[:-1] if re.search(rf"(?<!\\)\{d}$", clean) else seq
+        return seq[:-1] if trailing.search(clean) else seq
+
+    if deeper and deeper.search(clean):
+        return parse_cell(clean, delimiters=delimiters, depth=depth + 1)
+
+    return unescape.sub(r"\g<1>", clean)
+
 
+@lru_cache(maxsize=None)
+def cell_patterns(delimiters, depth):
+    """
+    Compiled patterns used by parse_cell at the given depth: the unescaped
+    delimiter of the depth and its occurrence at the end of a cell, any unescaped
+    delimiter of a greater depth, and any escaped delimiter.
+    """
+    d = delimiters[depth] if depth < len(delimiters) else ""
     delims = delimiters[depth + 1 :]
 
-    if delims and re.search(rf"(?<!\\)[{''.join(delims)}]", clean):
-        return parse_cell(clean, delimiters=delimiters, depth=depth + 1)
+    return (
+        re.compile(rf"(?<!\\)\{d}") if d else None,
+        re.compile(rf"(?<!\\)\{d}$") if d else None,
+        re.compile(rf"(?<!\\)[{''.join(delims)}]") if delims else None,
+        re.compile(rf"\\([{delimiters}])"),
+    )
+
 
-    return re.sub(rf"\\([{delimiters}])", r"\g<1>", clean)
+@lru_cache(maxsize=None)
+def escape_pattern(delimiters):
+    return re.compile(rf"([{delimiters}])")
 
 
 def is_template(s: str) -> bool:
-    return bool(re.search(r"{{.*?}}|{@.*?@}|{%.*?%}|@\(.*?\)", s))
+    return bool(TEMPLATE_PATTERN.search(s))
 
 
 class UniJSONReader(AbstractSheetReader):
@@ -0,0 +1,446 @@
+"""
+Semantic comparison of two RapidPro exports.
+
+Flows and campaigns are matched by name, or by UUID if they were renamed. Nodes,
+actions, campaign events and triggers are compared by their content with all UUIDs
+removed, so that regenerating an export with new UUIDs does not show up as a
+change. The exits of matched nodes are compared by the nodes they lead to, so that
+rewiring a flow does.
+"""
+
+import json
+
+from rpft.rapidpro.models.campaigns import Campaign
+from rpft.rapidpro.models.containers import FlowContainer
+from rpft.rapidpro.models.triggers import Trigger
+
+
+def diff_exports(old, new, owned=False):
+    """
+    Compare two RapidPro exports.
+
+    Flows are converted to models and compared one pair at a time, so that only
+    the flows being compared are held as models in memory.
+
+    Args:
+        old: RapidPro import/export format, as a dict
+        new: RapidPro import/export format, as a dict
+        owned: if True, the flows, campaigns and triggers of old and new are used
+            to build models without being copied, so they must not be used by the
+            caller afterwards.
+
+    Returns:
+        A JSON serializable dict describing the changes from old to new, with the
+        keys 'flows', 'campaigns' and 'triggers'.
+    """
+    return {
+        "flows": _diff_named(
+            old.get("flows", []),
+            new.get("flows", []),
+            lambda flow: flow["name"],
+            lambda old_flow, new_flow: _diff_flows(old_flow, new_flow, owned),
+        ),
+        "campaigns": _diff_named(
+            old.get("campaigns", []),
+            new.get("campaigns", []),
+            lambda campaign: campaign["name"],
+            lambda old_campaign, new_campaign: _diff_campaigns(
+                old_campaign, new_campaign, owned
+            ),
+        ),
+        "triggers": _diff_fingerprinted(
+            [Trigger.from_dict(t, owned).render() for t in old.get("triggers", [])],
+            [Trigger.from_dict(t, owned).render() for t in new.get("triggers", [])],
+        ),
+    }
+
+
+def is_empty(diff):
+    """Whether a diff, or any part of it, contains no changes."""
+    if isinstance(diff, dict):
+        return all(is_empty(value) for value in diff.values())
+
+    return not diff
+
+
+def format_diff(diff):
+    """
+    Summarise a diff returned by diff_exports as lines of text, one for each
+    added, removed or changed flow, campaign and trigger.
+    """
+    lines = []
+
+    for kind in ["flows", "campaigns"]:
+        singular = kind[:-1]
+
+        for name in diff[kind]["added"]:
+            lines.append(f"+ {singular} '{name}'")
+
+        for name in diff[kind]["removed"]:
+            lines.append(f"- {singular} '{name}'")
+
+        for change in diff[kind]["changed"]:
+            name = change["name"]
+
+            if change["old_name"] != name:
+                name = f"{change['old_name']}' -> '{name}"
+
+            parts = []
+
+            for key, value in change.items():
+                if not isinstance(value, dict) or is_empty(value):
+                    continue
+
+                counts = [
+                    f"{len(value[verb])} {verb}"
+                    for verb in ["added", "removed", "changed"]
+                    if value.get(verb)
+                ]
+                parts.append(f"{key} {', '.join(counts) if counts else 'changed'}")
+
+            lines.append(f"~ {singular} '{name}': {', '.join(parts) or 'renamed'}")
+
+    for trigger in diff["triggers"]["added"]:
+        lines.append(f"+ trigger {_describe_trigger(trigger)}")
+
+    for trigger in diff["triggers"]["removed"]:
+        lines.append(f"- trigger {_describe_trigger(trigger)}")
+
+    return lines
+
+
+def _describe_trigger(trigger):
+    return f"{trigger['trigger_type']} '{trigger['flow']['name']}'"
+
+
+def _diff_named(old_items, new_items, get_name, diff_pair):
+    # Match items by name, then the remaining ones by UUID. Names are read first,
+    # as diff_pair may take the items apart.
+    old_names = [get_name(item) for item in old_items]
+    old_by_name = {name: j for j, name in enumerate(old_names)}
+    old_by_uuid = {
+        item.get("uuid"): j for j, item in enumerate(old_items) if item.get("uuid")
+    }
+    matched = set()
+    pairs = []
+    added = []
+
+    for item in new_items:
+        name = get_name(item)
+        j = old_by_name.get(name)
+
+        if j is None or j in matched:
+            j = old_by_uuid.get(item.get("uuid"))
+
+        if j is None or j in matched:
+            added.append(name)
+        else:
+            matched.add(j)
+            pairs.append((j, item, name))
+
+    changed = []
+
+    for j, item, name in pairs:
+        change = diff_pair(old_items[j], item)
+
+        if old_names[j] != name or not is_empty(change):
+            changed.append({"name": name, "old_name": old_names[j], **change})
+
+    return {
+        "added": added,
+        "removed": [name for j, name in enumerate(old_names) if j not in matched],
+        "changed": changed,
+    }
+
+
+def _diff_flows(old, new, owned=False):
+    old_flow = FlowContainer.from_dict(old, owned=owned)
+    new_flow = FlowContainer.from_dict(new, owned=owned)
+    properties = {
+        key: {"old": getattr(old_flow, key), "new": getattr(new_flow, key)}
+        for key in ["type", "language", "expire_after_minutes", "localization"]
+        if getattr(old_flow, key) != getattr(new_flow, key)
+    }
+    old_nodes = [node.render() for node in old_flow.nodes]
+    new_nodes = [node.render() for node in new_flow.nodes]
+    matched, pairs, unmatched_old, unmatched_new = _match_nodes(old_nodes, new_nodes)
+
+    return {
+        "properties": properties,
+        "nodes": {
+            "added": [_normalize_node(new_nodes[i]) for i in unmatched_new],
+            "removed": [_normalize_node(old_nodes[j]) for j in unmatched_old],
+            "changed": [
+                {
+                    "old_uuid": old_nodes[j]["uuid"],
+                    "uuid": new_nodes[i]["uuid"],
+                    **_diff_node(old_nodes[j], new_nodes[i]),
+                }
+                for j, i in pairs
+            ],
+        },
+        "edges": _diff_edges(old_nodes, new_nodes, matched),
+    }
+
+
+def _match_nodes(old_nodes, new_nodes):
+    """
+    Match the nodes of two versions of a flow.
+
+    Returns:
+        A dict mapping the indices of all matched old nodes to the indices of the
+        new nodes they are matched with, the pairs of indices of matched nodes
+        whose content differs, ordered by new node, and the indices of the
+        unmatched old and new nodes.
+    """
+    # Nodes with the same content are matched in order.
+    available = {}
+
+    for j, node in reversed(list(enumerate(old_nodes))):
+        available.setdefault(fingerprint(_normalize_node(node)), []).append(j)
+
+    matched = {}
+    unmatched_new = []
+
+    for i, node in enumerate(new_nodes):
+        candidates = available.get(fingerprint(_normalize_node(node)))
+
+        if candidates:
+            matched[candidates.pop()] = i
+        else:
+            unmatched_new.append(i)
+
+    unmatched_old = {j for j in range(len(old_nodes)) if j not in matched}
+
+    # Nodes whose content differs are paired up by UUID, or else by their kind
+    # (action types and router operand), in order.
+    pairs = []
+    old_by_uuid = {old_nodes[j]["uuid"]: j for j in unmatched_old}
+    remaining_new = []
+
+    for i in unmatched_new:
+        j = old_by_uuid.get(new_nodes[i]["uuid"])
+
+        if j is None:
+            remaining_new.append(i)
+        else:
+            pairs.append((j, i))
+            unmatched_old.remove(j)
+
+    old_by_kind = {}
+
+    for j in sorted(unmatched_old, reverse=True):
+        old_by_kind.setdefault(_node_kind(old_nodes[j]), []).append(j)
+
+    unmatched_new = []
+
+    for i in remaining_new:
+        candidates = old_by_kind.get(_node_kind(new_nodes[i]))
+
+        if candidates:
+            j = candidates.pop()
+            pairs.append((j, i))
+            unmatched_old.remove(j)
+        else:
+            unmatched_new.append(i)
+
+    for j, i in pairs:
+        matched[j] = i
+
+    return (
+        matched,
+        sorted(pairs, key=lambda pair: pair[1]),
+        sorted(unmatched_old),
+        unmatched_new,
+    )
+
+
+def _diff_edges(old_nodes, new_nodes, matched):
+    """
+    Exits of matched nodes that lead to different nodes, i.e. whose destination
+    is not the node matched with the old destination.
+    """
+    old_index = {node["uuid"]: j for j, node in enumerate(old_nodes)}
+    changed = []
+
+    for j, i in sorted(matched.items(), key=lambda item: item[1]):
+        old_exits = _exits(old_nodes[j])
+        new_exits = _exits(new_nodes[i])
+        exits = []
+
+        for label in list(new_exits) + [e for e in old_exits if e not in new_exits]:
+            old_destination = old_exits.get(label)
+            new_destination = new_exits.get(label)
+
+            if old_destination is None:
+                unchanged = new_destination is None
+            else:
+                target = matched.get(old_index.get(old_destination))
+                unchanged = (
+                    target is not None and new_nodes[target]["uuid"] == new_destination
+                )
+
+            if not unchanged:
+                exits.append(
+                    {"exit": label, "old": old_destination, "new": new_destination}
+                )
+
+        if exits:
+            changed.append(
+                {
+                    "old_uuid": old_nodes[j]["uuid"],
+                    "uuid": new_nodes[i]["uuid"],
+                    "exits": exits,
+                }
+            )
+
+    return {"changed": changed}
+
+
+def _exits(node):
+    # Destinations of the exits of a node, by the name of their category, or by
+    # their position if the node has no router.
+    names = {
+        c["exit_uuid"]: c["name"]
+        for c in (node.get("router") or {}).get("categories", [])
+    }
+
+    return {
+        names.get(exit["uuid"], position): exit.get("destination_uuid")
+        for position, exit in enumerate(node.get("exits", []))
+    }
+
+
+def _diff_node(old, new):
+    change = {
+        "actions": _diff_fingerprinted(
+            [strip_uuids(action) for action in old.get("actions", [])],
+            [strip_uuids(action) for action in new.get("actions", [])],
+        )
+    }
+    old_router = old.get("router") or {}
+    new_router = new.get("router") or {}
+    change["cases"] = _diff_fingerprinted(
+        _named_cases(old_router), _named_cases(new_router)
+    )
+    change["categories"] = _diff_fingerprinted(
+        [c["name"] for c in old_router.get("categories", [])],
+        [c["name"] for c in new_router.get("categories", [])],
+    )
+    change["router"] = {
+        key: {"old": old_router.get(key), "new": new_router.get(key)}
+        for key in ["type", "operand", "result_name", "wait"]
+        if strip_uuids(old_router.get(key)) != strip_uuids(new_router.get(key))
+    }
+
+    return change
+
+
+def _normalize_node(node):
+    normalized = strip_uuids(node)
+
+    if "cases" in node.get("router", {}):
+        normalized["router"]["cases"] = _named_cases(node["router"])
+
+    return normalized
+
+
+def _named_cases(router):
+    # Cases refer to categories by UUID; refer to them by name instead. Group cases
+    # have the UUID of the group as first argument, which is dropped.
+    names = {c["uuid"]: c["name"] for c in router.get("categories", [])}
+
+    return [
+        {
+            "type": case["type"],
+            "arguments": (
+                case["arguments"][1:]
+                if case["type"] == "has_group"
+                else case["arguments"]
+            ),
+            "category": names.get(case["category_uuid"]),
+        }
+        for case in router.get("cases", [])
+    ]
+
+
+def _node_kind(node):
+    router = node.get("router") or {}
+
+    return (
+        tuple(action["type"] for action in node.get("actions", [])),
+        router.get("type"),
+        router.get("operand"),
+    )
+
+
+def _diff_campaigns(old, new, owned=False):
+    old_campaign = Campaign.from_dict(old, owned)
+    new_campaign = Campaign.from_dict(new, owned)
+    change = {
+        "events": _diff_fingerprinted(
+            [strip_uuids(event.render()) for event in old_campaign.events],
+            [strip_uuids(event.render()) for event in new_campaign.events],
+        )
+    }
+
+    if old_campaign.group.name != new_campaign.group.name:
+        change["group"] = {
+            "old": old_campaign.group.name,
+            "new": new_campaign.group.name,
+        }
+
+    return change
+
+
+def _diff_fingerprinted(old_items, new_items):
+    old_fingerprints = [fingerprint(item) for item in old_items]
+    new_fingerprints = [fingerprint(item) for item in new_items]
+
+    return {
+        "added": [new_items[i] for i in _unmatched(new_fingerprints, old_fingerprints)],
+        "removed": [
+            old_items[i] for i in _unmatched(old_fingerprints, new_fingerprints)
+        ],
+    }
+
+
+def _unmatched(fingerprints, other_fingerprints):
+    """
+    Indices of the fingerprints that are not matched by one in other_fingerprints,
+    each of which can only be matched once.
+    """
+    available = {}
+
+    for value in other_fingerprints:
+        available[value] = available.get(value, 0) + 1
+
+    unmatched = []
+
+    for i, value in enumerate(fingerprints):
+        if available.get(value):
+            available[value] -= 1
+        else:
+            unmatched.append(i)
+
+    return unmatched
+
+
+def fingerprint(obj):
+    """Canonical representation of obj, ignoring UUIDs."""
+    return json.dumps(strip_uuids(obj), sort_keys=True, ensure_ascii=False)
+
+
+def strip_uuids(obj):
+    """Copy of obj without any 'uuid' or '*_uuid' entries."""
+    if isinstance(obj, dict):
+        return {
+            key: strip_uuids(value)
+            for key, value in obj.items()
+            if key != "uuid" and not key.endswith("_uuid")
+        }
+
+    if isinstance(obj, list):
+        return [strip_uuids(value) for value in obj]
+
+    return obj
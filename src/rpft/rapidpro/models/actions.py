@@ -21,7 +21,13 @@ from rpft.parsers.creation.flowrowmodel import dict_to_list_of_pairs
 
 
 class Action:
-    def from_dict(data):
+    def from_dict(data, owned=False):
+        """
+        Args:
+            data: action in the RapidPro import/export format
+            owned: if True, data is not copied and becomes part of the action, so
+                it must not be used by the caller afterwards
+        """
         # Create a generic Action, and cast it to the specific Action subclass
         # in order to bypass the constructor of the subclass
         if "type" not in data:
@@ -33,11 +39,12 @@ class Action:
         cls = action_map[action_type]
         action.__class__ = cls
         # Fill in the fields of the object
-        action._assign_fields_from_dict(data)
+        action._assign_fields_from_dict(data if owned else copy.deepcopy(data))
         return action
 
     def _assign_fields_from_dict(self, data):
-        self.__dict__ = copy.deepcopy(data)
+        # data is owned by the action, see from_dict
+        self.__dict__ = data
 
     def __init__(self, type, **kwargs):
         self.uuid = generate_new_uuid()
@@ -187,11 +194,11 @@ class SendMessageAction(Action):
         self.templating = templating
 
     def _assign_fields_from_dict(self, data):
-        data_copy = copy.deepcopy(data)
-        if "templating" in data:
-            templating = data_copy.pop("templating")
-        super()._assign_fields_from_dict(data_copy)
-        if "templating" in data:
+        has_templating = "templating" in data
+        if has_templating:
+            templating = data.pop("templating")
+        super()._assign_fields_from_dict(data)
+        if has_templating:
             self.templating = WhatsAppMessageTemplating.from_rapid_pro_templating(
                 templating
             )
@@ -286,9 +293,8 @@ class SetContactFieldAction(Action):
 
     def _assign_fields_from_dict(self, data):
         assert "field" in data
-        data_copy = copy.deepcopy(data)
-        data_copy["field"] = UserContactField(**data_copy["field"])
-        super()._assign_fields_from_dict(data_copy)
+        data["field"] = UserContactField(**data["field"])
+        super()._assign_fields_from_dict(data)
 
     def main_value(self):
         return self.field.key
@@ -332,10 +338,9 @@ class SetContactPropertyAction(Action):
         property = action_type.replace("set_contact_", "")
         assert property in data
         assert property in ["channel", "language", "name", "status", "timezone"]
-        data_copy = copy.deepcopy(data)
-        super()._assign_fields_from_dict(data_copy)
+        super()._assign_fields_from_dict(data)
         self.property = property
-        self.value = data_copy.pop(property)
+        self.value = data.pop(property)
 
     def main_value(self):
         return self.property
@@ -360,7 +365,6 @@ class GenericGroupAction(Action):
         groups = []
         for group in data["groups"]:
             groups.append(Group.from_dict(group))
-        data = copy.deepcopy(data)  # don't mutate the input
         data["groups"] = groups
         super()._assign_fields_from_dict(data)
 
@@ -487,7 +491,6 @@ class EnterFlowAction(Action):
 
     def _assign_fields_from_dict(self, data):
         assert "flow" in data
-        data = copy.deepcopy(data)  # don't mutate the input
         data["flow"] = FlowReference.from_dict(data["flow"])
         super()._assign_fields_from_dict(data)
 
@@ -46,8 +46,8 @@ class CampaignEvent:
         if event_type == "F" and self.flow is None:
             raise ValueError("CampaignEvent must have a flow if the event_type is F")
 
-    def from_dict(data):
-        data_copy = copy.deepcopy(data)
+    def from_dict(data, owned=False):
+        data_copy = data if owned else copy.deepcopy(data)
         data_copy["relative_to"] = SystemContactField(
             data_copy["relative_to"]["label"],
             data_copy["relative_to"]["key"],
@@ -99,7 +99,7 @@ class Campaign:
     def add_event(self, event):
         self.events.append(event)
 
-    def from_dict(data):
+    def from_dict(data, owned=False):
         assert "group" in data
         assert "name" in data
         assert "events" in data
@@ -107,7 +107,7 @@ class Campaign:
             uuid=data.get("uuid"),
             name=data["name"],
             group=Group.from_dict(data["group"]),
-            events=[CampaignEvent.from_dict(event) for event in data["events"]],
+            events=[CampaignEvent.from_dict(event, owned) for event in data["events"]],
         )
 
     def record_global_uuids(self, uuid_dict):
@@ -1,4 +1,6 @@
 import copy
+import json
+from types import GeneratorType
 
 from rpft.parsers.common.cellparser import CellParser
 from rpft.parsers.common.rowdatasheet import RowDataSheet
@@ -8,7 +10,7 @@ from rpft.rapidpro.models.actions import Group
 from rpft.rapidpro.models.campaigns import Campaign
 from rpft.rapidpro.models.nodes import BaseNode
 from rpft.rapidpro.models.triggers import Trigger
-from rpft.rapidpro.utils import generate_new_uuid
+from rpft.rapidpro.utils import deterministic_uuids, generate_new_uuid, stable_uuid
 
 
 class RapidProContainer:
@@ -21,6 +23,7 @@ class RapidProContainer:
         site=None,
         triggers=None,
         version="13",
+        uuid_namespace=None,
     ):
         self.campaigns = campaigns or []
         self.fields = fields or []
@@ -30,18 +33,28 @@ class RapidProContainer:
         self.triggers = triggers or []
         self.version = version
         self.uuid_dict = UUIDDict()
+        # If set, UUIDs of groups and flows referenced but not defined are derived
+        # from this namespace and their names.
+        self.uuid_namespace = uuid_namespace
 
-    def from_dict(data):
-        data_copy = copy.deepcopy(data)
+    def from_dict(data, owned=False):
+        """
+        Args:
+            data: RapidPro import/export format, as a dict
+            owned: if True, data is not copied and becomes part of the container,
+                so it must not be used by the caller afterwards. Otherwise, data is
+                copied once, here.
+        """
+        data_copy = data if owned else copy.deepcopy(data)
         flows = data_copy.pop("flows")
-        flows = [FlowContainer.from_dict(flow) for flow in flows]
+        flows = [FlowContainer.from_dict(flow, owned=True) for flow in flows]
         groups = data_copy.pop("groups")
         groups = [Group.from_dict(group) for group in groups]
         campaigns = data_copy.pop("campaigns")
-        campaigns = [Campaign.from_dict(campaign) for campaign in campaigns]
+        campaigns = [Campaign.from_dict(campaign, owned=True) for campaign in campaigns]
         container = RapidProContainer(**data_copy)
         triggers = data_copy.pop("triggers")
-        triggers = [Trigger.from_dict(trigger) for trigger in triggers]
+        triggers = [Trigger.from_dict(trigger, owned=True) for trigger in triggers]
         container.flows = flows
         container.groups = groups
         container.campaigns = campaigns
@@ -82,7 +95,8 @@ class RapidProContainer:
             campaign.record_global_uuids(self.uuid_dict)
         for trigger in self.triggers:
             trigger.record_global_uuids(self.uuid_dict, require_existing=True)
-        self.uuid_dict.generate_missing_uuids()
+        with deterministic_uuids(self.uuid_namespace):
+            self.uuid_dict.generate_missing_uuids()
         for flow in self.flows:
             flow.assign_global_uuids(self.uuid_dict)
         for campaign in self.campaigns:
@@ -115,6 +129,45 @@ class RapidProContainer:
             "version": self.version,
         }
 
+    def render_to_stream(self, fp, indent=4):
+        """
+        Write the same JSON as json.dump(self.render(), fp, indent=indent), but
+        render and write flows, campaigns and triggers one at a time, so that the full
+        import dict is never held in memory.
+        """
+        self.validate()
+        items = [
+            ("campaigns", (campaign.render() for campaign in self.campaigns)),
+            ("fields", self.fields),
+            ("flows", (flow.render() for flow in self.flows)),
+            ("groups", (group.render() for group in self.groups)),
+            ("site", self.site),
+            ("triggers", (trigger.render() for trigger in self.triggers)),
+            ("version", self.version),
+        ]
+        pad = " " * indent
+
+        fp.write("{")
+
+        for i, (key, value) in enumerate(items):
+            fp.write(f"{',' if i else ''}\n{pad}{json.dumps(key)}: ")
+
+            if not isinstance(value, (list, GeneratorType)):
+                fp.write(json.dumps(value))
+                continue
+
+            empty = True
+
+            for element in value:
+                element = json.dumps(element, indent=indent)
+                fp.write(f"{'[' if empty else ','}\n{pad * 2}")
+                fp.write(element.replace("\n", f"\n{pad * 2}"))
+                empty = False
+
+            fp.write("[]" if empty else f"\n{pad}]")
+
+        fp.write("\n}")
+
 
 class FlowContainer:
     def __init__(
@@ -139,29 +192,40 @@ class FlowContainer:
         self.language = language
         self.type = type
         self.nodes = []
+        # Maps node UUIDs to nodes, for constant time lookup in find_node.
+        self._node_index = {}
         self.spec_version = spec_version
         self.revision = revision
         self.expire_after_minutes = expire_after_minutes
         self.metadata = metadata or {}
         self.localization = localization or {}
 
-    def from_dict(data):
-        data_copy = copy.deepcopy(data)
+    def from_dict(data, owned=False):
+        """
+        Args:
+            data: flow in the RapidPro import/export format
+            owned: if True, data is not copied and becomes part of the flow, so it
+                must not be used by the caller afterwards. Otherwise, data is
+                copied once, here.
+        """
+        data_copy = data if owned else copy.deepcopy(data)
         name = data_copy.pop("name")
         data_copy["flow_name"] = name
         nodes = data_copy.pop("nodes")
-        nodes = [BaseNode.from_dict(node) for node in nodes]
+        nodes = [BaseNode.from_dict(node, owned=True) for node in nodes]
         if "_ui" in data_copy:
             ui = data_copy.pop("_ui")
             if "nodes" in ui:
                 for node in nodes:
                     node.add_ui_from_dict(ui["nodes"])
         flow_container = FlowContainer(**data_copy)
-        flow_container.nodes = nodes
+        for node in nodes:
+            flow_container.add_node(node)
         return flow_container
 
     def add_node(self, node):
         self.nodes.append(node)
+        self._node_index[node.uuid] = node
 
     def record_global_uuids(self, uuid_dict):
         for node in self.nodes:
@@ -194,19 +258,16 @@ class FlowContainer:
         return render_dict
 
     def find_node(self, uuid):
-        for node in self.nodes:
-            if node.uuid == uuid:
-                return node
+        node = self._node_index.get(uuid)
+        if node is None or node.uuid != uuid:
+            # The index is stale if nodes were modified without add_node.
+            self._node_index = {node.uuid: node for node in self.nodes}
+            node = self._node_index.get(uuid)
+        if node is not None:
+            return node
         raise ValueError(f"Destination node {uuid} does not exist within flow.")
 
-    def _to_rows_recurse(self, node, parent_edge):
-        # The version of the graph encoded in a sheet is always a DAG, if we disregard
-        # all go_to edges.
-        # So we effectively do the DFS version of topological sort here, with the one
-        # special case that if we encounter a backward edge (and thus a cycle), we
-        # convert it into a go_to edge.
-        # We use temporary row_ids here (derived from node uuids) that get converted to
-        # sequential ids later.
+    def _to_rows_visit(self, node, parent_edge, stack):
         self.visited_nodes.add(node.uuid)
         temp_row_id = f"{node.uuid}|{node.short_name()}"
         # Initiate the row model(s) for the node with one incoming edge.
@@ -214,47 +275,67 @@ class FlowContainer:
         node.initiate_row_models(temp_row_id, parent_edge)
         # Outgoing edges from the nodes (as pairs of exits with edge objects).
         # Each edge will be added as an incoming edge to the node
-        # pointed to by the corresponding exit
-        exits_edges = node.get_exit_edge_pairs()
+        # pointed to by the corresponding exit.
         # We go backwards through the outgoing edges:
         # This way, the nodes in the right-most branch will be completed first,
         # and thus appear last in the sheet.
-        for exit, edge in exits_edges[::-1]:
-            if not exit.destination_uuid:
-                # If the edge leads nowhere, there's no way of encoding it in the sheet
-                # format.
-                # In practice, this means that cases/categories from routers may be
-                # dropped if they are not connected to anything.
-                continue
-            child_node = self.find_node(exit.destination_uuid)
-            if child_node.uuid in self.completed_nodes:
-                # Edge to a later node.
-                # We prepend, so that in the end,
-                # the edges are in the correct order again, as in this for
-                # loop we go through the edges in reverse order.
-                child_node.prepend_edge_to_row_models(edge)
-            elif child_node.uuid in self.visited_nodes:
-                # This is a backward edge to an ancestor of this node.
-                child_row_id = child_node.get_row_models()[0].row_id
-                child_short_id = child_row_id.split("|")[1]
-                self.rows.insert(
-                    0,
-                    FlowRowModel(
-                        row_id=f"{generate_new_uuid()}|goto.{child_short_id}",
-                        type="go_to",
-                        edges=[edge],
-                        mainarg_destination_row_ids=[child_row_id],
-                    ),
-                )
+        stack.append((node, iter(node.get_exit_edge_pairs()[::-1])))
+
+    def _to_rows_traverse(self, root):
+        # The version of the graph encoded in a sheet is always a DAG, if we disregard
+        # all go_to edges.
+        # So we effectively do the DFS version of topological sort here, with the one
+        # special case that if we encounter a backward edge (and thus a cycle), we
+        # convert it into a go_to edge.
+        # We use temporary row_ids here (derived from node uuids) that get converted to
+        # sequential ids later.
+        # The DFS uses an explicit stack of (node, remaining exits) pairs, so that
+        # long chains of nodes do not exceed the recursion limit.
+        # Rows are appended in reverse order, and the list is reversed at the end.
+        stack = []
+        self._to_rows_visit(root, Edge(from_="start"), stack)
+        while stack:
+            node, exits_edges = stack[-1]
+            for exit, edge in exits_edges:
+                if not exit.destination_uuid:
+                    # If the edge leads nowhere, there's no way of encoding it in the
+                    # sheet format.
+                    # In practice, this means that cases/categories from routers may
+                    # be dropped if they are not connected to anything.
+                    continue
+                child_node = self.find_node(exit.destination_uuid)
+                if child_node.uuid in self.completed_nodes:
+                    # Edge to a later node.
+                    # We prepend, so that in the end,
+                    # the edges are in the correct order again, as we go through
+                    # the edges in reverse order.
+                    child_node.prepend_edge_to_row_models(edge)
+                elif child_node.uuid in self.visited_nodes:
+                    # This is a backward edge to an ancestor of this node.
+                    child_row_id = child_node.get_row_models()[0].row_id
+                    child_short_id = child_row_id.split("|")[1]
+                    self.rows.append(
+                        FlowRowModel(
+                            row_id=f"{generate_new_uuid()}|goto.{child_short_id}",
+                            type="go_to",
+                            edges=[edge],
+                            mainarg_destination_row_ids=[child_row_id],
+                        ),
+                    )
+                else:
+                    # A new node we haven't encountered yet; the remaining exits of
+                    # this node are processed once the new node is completed.
+                    self._to_rows_visit(child_node, edge, stack)
+                    break
             else:
-                # A new node we haven't encountered yet
-                self._to_rows_recurse(child_node, edge)
-        self.completed_nodes.add(node.uuid)
-        # Completed row get prepended to our list, in accordance
-        # with the topological sort algorithm.
-        # Note: These row_models may still be modified in the
-        # next steps via other incoming edges.
-        self.rows = node.get_row_models() + self.rows
+                stack.pop()
+                self.completed_nodes.add(node.uuid)
+                # Completed rows come before all rows emitted so far, in accordance
+                # with the topological sort algorithm.
+                # Note: These row_models may still be modified in the
+                # next steps via other incoming edges.
+                self.rows.extend(reversed(node.get_row_models()))
+        self.rows.reverse()
 
     def to_rows(self, numbered=False):
         if not self.nodes:
@@ -269,10 +350,14 @@ class FlowContainer:
         for node in self.nodes:
             node.clear_row_model()
         # Generate the list of rows (with temp row_ids)
-        self._to_rows_recurse(self.nodes[0], Edge(from_="start"))
+        self._to_rows_traverse(self.nodes[0])
         # We now have to remap the temp row_ids to a sequence of numbers
         # Compile the remapping dict
         temp_row_id_to_row_id = {"start": "start"}
+        used_ids = {"start"}
+        # Next suffix to try for each base id; ids are never released, so suffixes
+        # below it are known to be taken.
+        next_suffix = {}
         for idx, row in enumerate(self.rows):
             if numbered:
                 new_id = str(idx + 1)
@@ -281,11 +366,14 @@ class FlowContainer:
                 new_base_id = row.row_id.split("|")[1]
                 # Append a number (if necessary) to ensure uniqueness
                 new_id = new_base_id
-                counter = 1
-                while new_id in temp_row_id_to_row_id.values():
+                if new_id in used_ids:
+                    counter = next_suffix.get(new_base_id, 1)
+                    while f"{new_base_id}.{counter}" in used_ids:
+                        counter += 1
                     new_id = f"{new_base_id}.{counter}"
-                    counter += 1
+                    next_suffix[new_base_id] = counter + 1
             temp_row_id_to_row_id[row.row_id] = new_id
+            used_ids.add(new_id)
         # Do the remapping
         for row in self.rows:
             row.row_id = temp_row_id_to_row_id[row.row_id]
@@ -315,10 +403,10 @@ class UUIDDict:
     def generate_missing_uuids(self):
         for k, v in self.flow_dict.items():
             if not v:
-                self.flow_dict[k] = generate_new_uuid()
+                self.flow_dict[k] = stable_uuid("flow", k)
         for k, v in self.group_dict.items():
             if not v:
-                self.group_dict[k] = generate_new_uuid()
+                self.group_dict[k] = stable_uuid("group", k)
 
     def record_group_uuid(self, name, uuid):
         self._record_uuid(self.group_dict, name, uuid)
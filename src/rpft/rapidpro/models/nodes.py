@@ -52,26 +52,26 @@ class BaseNode(ABC):
         self.exits = [self.default_exit]
         self.ui_pos = ui_pos
 
-    def from_dict(data, ui_data=None):
+    def from_dict(data, ui_data=None, owned=False):
         if "router" in data:
             if data["router"]["type"] == "random":
-                return RandomRouterNode.from_dict(data, ui_data)
+                return RandomRouterNode.from_dict(data, ui_data, owned)
             elif data["router"]["type"] == "switch":
                 if data["actions"]:
                     if data["actions"][0]["type"] == "enter_flow":
-                        return EnterFlowNode.from_dict(data, ui_data)
+                        return EnterFlowNode.from_dict(data, ui_data, owned)
                     elif data["actions"][0]["type"] == "call_webhook":
-                        return CallWebhookNode.from_dict(data, ui_data)
+                        return CallWebhookNode.from_dict(data, ui_data, owned)
                     elif data["actions"][0]["type"] == "transfer_airtime":
-                        return TransferAirtimeNode.from_dict(data, ui_data)
+                        return TransferAirtimeNode.from_dict(data, ui_data, owned)
                     else:
                         raise ValueError("Node contains action of invalid type")
                 else:
-                    return SwitchRouterNode.from_dict(data, ui_data)
+                    return SwitchRouterNode.from_dict(data, ui_data, owned)
             else:
                 raise ValueError("Node contains router of invalid type")
         else:
-            return BasicNode.from_dict(data, ui_data)
+            return BasicNode.from_dict(data, ui_data, owned)
 
     def add_ui_from_dict(self, ui_dict):
         if self.uuid in ui_dict:
@@ -191,11 +191,11 @@ class BaseNode(ABC):
 class BasicNode(BaseNode):
     # A basic node can accomodate actions and a single (default) exit
 
-    def from_dict(data, ui_data=None):
+    def from_dict(data, ui_data=None, owned=False):
         exits = [Exit.from_dict(exit_data) for exit_data in data["exits"]]
         if len(exits) != 1:
             raise ValueError("Basic node must have exactly one exit")
-        actions = [Action.from_dict(action) for action in data["actions"]]
+        actions = [Action.from_dict(action, owned) for action in data["actions"]]
         return BasicNode(uuid=data["uuid"], default_exit=exits[0], actions=actions)
 
     def _add_exit(self, exit):
@@ -263,7 +263,7 @@ class SwitchRouterNode(RouterNode):
             self.router = SwitchRouter(operand, result_name, wait_timeout)
         self.has_basic_exit = False
 
-    def from_dict(data, ui_data=None):
+    def from_dict(data, ui_data=None, owned=False):
         exits = [Exit.from_dict(exit_data) for exit_data in data["exits"]]
         router = SwitchRouter.from_dict(data["router"], exits)
         return SwitchRouterNode(uuid=data["uuid"], router=router)
@@ -402,7 +402,7 @@ class RandomRouterNode(RouterNode):
             self.router = RandomRouter(result_name)
         self.has_basic_exit = False
 
-    def from_dict(data, ui_data=None):
+    def from_dict(data, ui_data=None, owned=False):
         exits = [Exit.from_dict(exit_data) for exit_data in data["exits"]]
         router = RandomRouter.from_dict(data["router"], exits)
         return RandomRouterNode(uuid=data["uuid"], router=router)
@@ -491,10 +491,10 @@ class EnterFlowNode(RouterNode):
             # Suppress the warning about overwriting default category
             self.router.has_explicit_default_category = False
 
-    def from_dict(data, ui_data=None):
+    def from_dict(data, ui_data=None, owned=False):
         exits = [Exit.from_dict(exit_data) for exit_data in data["exits"]]
         router = SwitchRouter.from_dict(data["router"], exits)
-        actions = [Action.from_dict(action) for action in data["actions"]]
+        actions = [Action.from_dict(action, owned) for action in data["actions"]]
         if len(actions) != 1:
             raise ValueError("EnterFlowNode node must have exactly one action")
         return EnterFlowNode(uuid=data["uuid"], router=router, action=actions[0])
@@ -596,10 +596,10 @@ class CallWebhookNode(RouterNode):
             # Suppress the warning about overwriting default category
             self.router.has_explicit_default_category = False
 
-    def from_dict(data, ui_data=None):
+    def from_dict(data, ui_data=None, owned=False):
         exits = [Exit.from_dict(exit_data) for exit_data in data["exits"]]
         router = SwitchRouter.from_dict(data["router"], exits)
-        actions = [Action.from_dict(action) for action in data["actions"]]
+        actions = [Action.from_dict(action, owned) for action in data["actions"]]
         if len(actions) != 1:
             raise ValueError("WebhookNode node must have exactly one action")
         return CallWebhookNode(uuid=data["uuid"], router=router, action=actions[0])
@@ -685,10 +685,10 @@ class TransferAirtimeNode(RouterNode):
             # Suppress the warning about overwriting default category
             self.router.has_explicit_default_category = False
 
-    def from_dict(data, ui_data=None):
+    def from_dict(data, ui_data=None, owned=False):
         exits = [Exit.from_dict(exit_data) for exit_data in data["exits"]]
         router = SwitchRouter.from_dict(data["router"], exits)
-        actions = [Action.from_dict(action) for action in data["actions"]]
+        actions = [Action.from_dict(action, owned) for action in data["actions"]]
         if len(actions) != 1:
             raise ValueError("TransferAirtimeNode node must have exactly one action")
         return TransferAirtimeNode(uuid=data["uuid"], router=router, action=actions[0])
@@ -60,8 +60,8 @@ class Trigger:
             group = Group(group_name, group_uuid or None)
             groups_field.append(group)
 
-    def from_dict(data):
-        data_copy = copy.deepcopy(data)
+    def from_dict(data, owned=False):
+        data_copy = data if owned else copy.deepcopy(data)
         if "flow" in data_copy:
             data_copy["flow"] = FlowReference(**data_copy["flow"])
         groups = []
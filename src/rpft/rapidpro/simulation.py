@@ -245,10 +245,8 @@ def process_actions(node, context):
             for group in action["groups"]:
                 context.group_names.append(group["name"])
         elif action_type == "enter_flow":
-            # TODO: recurse, append outputs
-            # We need to have all flows for that.
-            # action["flow"]["name"]
-            # action["flow"]["uuid"]
+            # Entering other flows is simulated by CompiledContainer, which has
+            # all flows.
             pass
     return outputs
 
@@ -300,3 +298,672 @@ def find_final_destination(flow, node, context):
         destination_uuid = find_destination_uuid(node, context)
         node = find_node_by_uuid(flow, destination_uuid)
     return destination_uuid
+
+
+class CompiledFlow:
+    """
+    A flow preprocessed for fast, repeated simulation.
+
+    Nodes are indexed by uuid, the destination of every router category is
+    resolved, and case arguments are turned into matcher functions once, so that
+    many Context scenarios can be run against the same flow cheaply.
+
+    Unlike traverse_flow, running a scenario does not modify its Context, so the
+    same Context may be run again.
+    """
+
+    def __init__(self, flow, max_steps=10000):
+        """
+        Args:
+            flow: flow in RapidPro JSON format, as a dict
+            max_steps: maximum number of nodes visited in a single run, to stop
+                traversals that are caught in a cycle
+        """
+        self.uuid = flow.get("uuid")
+        self.name = flow.get("name")
+        self.max_steps = max_steps
+        self.nodes = {node["uuid"]: _CompiledNode(node) for node in flow["nodes"]}
+        self.start = self.nodes[flow["nodes"][0]["uuid"]] if flow["nodes"] else None
+
+    def traverse(self, context):
+        """
+        Traverse the flow from its first node, see traverse_flow.
+
+        Returns:
+            A list of (action type, action value) pairs, one for each action
+            encountered while traversing the flow.
+        """
+        outputs = []
+        run = _Run(context)
+        node = self.start
+        steps = 0
+        while node is not None:
+            steps = _count_step(steps, self.max_steps)
+            outputs += node.outputs
+            run.groups.update(node.added_groups)
+            destination_uuid = node.resolve(run.operand(node))
+            if destination_uuid is None or destination_uuid is _WAITING:
+                break
+            node = self.get_node(destination_uuid)
+        return outputs
+
+    def traverse_all(self, contexts):
+        """Traverse the flow once for each of the contexts."""
+        return [self.traverse(context) for context in contexts]
+
+    def find_final_destination(self, node_uuid, context):
+        """
+        Starting at the node with the given uuid, traverse the flow until we reach a
+        destination that is not contained inside the flow, see find_final_destination.
+
+        Returns:
+            uuid of the destination outside the flow
+        """
+        run = _Run(context)
+        destination_uuid = node_uuid
+        node = self.nodes.get(node_uuid)
+        steps = 0
+        while node is not None:
+            steps = _count_step(steps, self.max_steps)
+            run.groups.update(node.added_groups)
+            destination_uuid = node.resolve(run.operand(node))
+            if destination_uuid is _WAITING:
+                destination_uuid = None
+            node = self.nodes.get(destination_uuid)
+        return destination_uuid
+
+    def get_node(self, uuid):
+        node = self.nodes.get(uuid)
+        if node is None:
+            raise ValueError(f"Destination_uuid {uuid} is invalid.")
+        return node
+
+
+class CompiledContainer:
+    """
+    All flows of a RapidPro export, preprocessed for simulating contacts through the
+    whole chatbot.
+
+    When a node enters a flow of the container, the child flow is traversed and the
+    parent flow resumes through the exit for the status of the child run:
+    'completed' if the child flow reached its end, 'expired' if it stopped at a wait
+    without response. Flows not contained in the container are handled as in
+    CompiledFlow, taking the status of the child run from the inputs.
+    """
+
+    def __init__(self, container, max_steps=10000):
+        """
+        Args:
+            container: RapidPro import/export format, as a dict
+            max_steps: maximum number of nodes visited in a single run, across all
+                flows, to stop traversals that are caught in a cycle
+        """
+        self.max_steps = max_steps
+        self.flows = {}
+        self.flows_by_name = {}
+        for flow in container["flows"]:
+            compiled_flow = CompiledFlow(flow, max_steps)
+            self.flows[compiled_flow.uuid] = compiled_flow
+            self.flows_by_name[compiled_flow.name] = compiled_flow
+
+    def get_flow(self, flow):
+        """Get a compiled flow by its uuid or name."""
+        compiled_flow = self.flows.get(flow) or self.flows_by_name.get(flow)
+        if compiled_flow is None:
+            raise ValueError(f"Flow {flow} does not exist within container.")
+        return compiled_flow
+
+    def traverse(self, flow, context):
+        """
+        Traverse the given flow, following the flows it enters.
+
+        Args:
+            flow: uuid or name of the flow to start in
+            context: Context of the contact
+
+        Returns:
+            A list of (action type, action value) pairs, one for each action
+            encountered in any of the flows.
+        """
+        return self.traverse_all(flow, [context])[0]
+
+    def traverse_all(self, flow, contexts):
+        """
+        Traverse the given flow once for each of the contexts.
+
+        Contacts that take the same path are simulated together, and are only split
+        up where their inputs, random choices or variables lead them to different
+        exits.
+
+        Returns:
+            A list of traces as returned by traverse, one for each context.
+        """
+        contexts = list(contexts)
+        traces = [None] * len(contexts)
+        start = self.get_flow(flow)
+        cohorts = {}
+        for index, context in enumerate(contexts):
+            cohorts.setdefault(frozenset(context.group_names), []).append(
+                (index, context)
+            )
+        pending = [
+            _Cohort(members, start, start.start, set(groups))
+            for groups, members in cohorts.items()
+        ]
+        while pending:
+            cohort = pending.pop()
+            pending += self._run_cohort(cohort)
+            for index, _ in cohort.members:
+                traces[index] = list(cohort.trace)
+        return traces
+
+    def _run_cohort(self, cohort):
+        # Traverse until the cohort finishes. Where its members need to take
+        # different exits, the cohort continues with the first group of members, and
+        # new cohorts are split off for the others, to be run later.
+        splits = []
+        while cohort.node is not None:
+            cohort.steps = _count_step(cohort.steps, self.max_steps)
+            node = cohort.node
+            cohort.trace += node.outputs
+            cohort.groups.update(node.added_groups)
+            child = self._get_child_flow(node)
+            if child is not None:
+                cohort.stack.append((cohort.flow, node))
+                cohort.flow = child
+                cohort.node = child.start
+                if child.start is None:
+                    self._advance(cohort, None)
+                continue
+
+            partition = cohort.partition(node)
+            for destination_uuid, members in partition[1:]:
+                split = cohort.copy(members)
+                split.consume(node)
+                self._advance(split, destination_uuid)
+                splits.append(split)
+            destination_uuid, cohort.members = partition[0]
+            cohort.consume(node)
+            self._advance(cohort, destination_uuid)
+        return splits
+
+    def _advance(self, cohort, destination_uuid):
+        # Move the cohort to the given destination, returning to parent flows when
+        # the current flow has ended.
+        while destination_uuid is None or destination_uuid is _WAITING:
+            if not cohort.stack:
+                cohort.node = None
+                return
+            status = "completed" if destination_uuid is None else "expired"
+            cohort.flow, parent = cohort.stack.pop()
+            destination_uuid = parent.resolve(status)
+        cohort.node = cohort.flow.get_node(destination_uuid)
+
+    def _get_child_flow(self, node):
+        if node.child_flow is None:
+            return None
+        uuid, name = node.child_flow
+        return self.flows.get(uuid) or self.flows_by_name.get(name)
+
+
+class _Cohort:
+    """Contacts that have taken the same path through a CompiledContainer."""
+
+    def __init__(
+        self,
+        members,
+        flow,
+        node,
+        groups,
+        stack=None,
+        trace=None,
+        inputs_used=0,
+        random_choices_used=0,
+        steps=0,
+    ):
+        self.members = members
+        self.flow = flow
+        self.node = node
+        self.groups = groups
+        self.stack = stack or []
+        self.trace = trace or []
+        self.inputs_used = inputs_used
+        self.random_choices_used = random_choices_used
+        self.steps = steps
+
+    def copy(self, members):
+        return _Cohort(
+            members,
+            self.flow,
+            self.node,
+            set(self.groups),
+            list(self.stack),
+            list(self.trace),
+            self.inputs_used,
+            self.random_choices_used,
+            self.steps,
+        )
+
+    def partition(self, node):
+        """
+        Group the members by the node they go to after the given node, in order of
+        first appearance, as a list of (destination uuid, members) pairs. The
+        destination is resolved as in _CompiledNode.resolve, once for each member,
+        as operands may be any values, including unhashable ones.
+        """
+        source = node.operand_source
+        if source is None:
+            return [(node.resolve(None), self.members)]
+        if source == "groups":
+            return [(node.resolve(self.groups), self.members)]
+
+        groups = {}
+        for member in self.members:
+            context = member[1]
+            if source == "input":
+                operand = _get_or_missing(context.inputs, self.inputs_used, "inputs")
+            elif source == "random":
+                operand = _get_or_missing(
+                    context.random_choices, self.random_choices_used, "random choices"
+                )
+            else:
+                operand = context.variables.get(node.operand)
+            groups.setdefault(node.resolve(operand), []).append(member)
+        return list(groups.items())
+
+    def consume(self, node):
+        if node.operand_source == "input":
+            self.inputs_used += 1
+        elif node.operand_source == "random":
+            self.random_choices_used += 1
+
+
+def _get_or_missing(values, index, name):
+    if index < len(values):
+        return values[index]
+    return _Missing(name)
+
+
+class _Missing:
+    """Operand of contacts that have run out of inputs or random choices."""
+
+    def __init__(self, name):
+        self.name = name
+
+    def __eq__(self, other):
+        return isinstance(other, _Missing) and other.name == self.name
+
+    def __hash__(self):
+        return hash(self.name)
+
+
+class _Run:
+    """State of a single traversal of a CompiledFlow."""
+
+    def __init__(self, context):
+        self.groups = set(context.group_names)
+        self.inputs = iter(context.inputs)
+        self.random_choices = iter(context.random_choices)
+        self.variables = context.variables
+
+    def operand(self, node):
+        source = node.operand_source
+        if source is None:
+            return None
+        if source == "groups":
+            return self.groups
+        if source == "input":
+            return _next_or_raise(self.inputs, "inputs")
+        if source == "random":
+            return _next_or_raise(self.random_choices, "random choices")
+        return self.variables.get(node.operand)
+
+
+def _next_or_raise(iterator, name):
+    try:
+        return next(iterator)
+    except StopIteration:
+        raise IndexError(f"Context has run out of {name}.") from None
+
+
+def _count_step(steps, max_steps):
+    if max_steps is not None and steps >= max_steps:
+        raise ValueError(f"Flow traversal exceeded {max_steps} steps.")
+    return steps + 1
+
+
+# Destination of a router that waits for a response that never comes.
+_WAITING = object()
+
+
+class _CompiledNode:
+    def __init__(self, node):
+        self.uuid = node["uuid"]
+        self.outputs = [
+            (action["type"], action_value_fields[action["type"]](action))
+            for action in node["actions"]
+        ]
+        self.added_groups = [
+            group["name"]
+            for action in node["actions"]
+            if action["type"] == "add_contact_groups"
+            for group in action["groups"]
+        ]
+        self.child_flow = next(
+            (
+                (action["flow"].get("uuid"), action["flow"].get("name"))
+                for action in node["actions"]
+                if action["type"] == "enter_flow"
+            ),
+            None,
+        )
+        exits = {exit["uuid"]: exit.get("destination_uuid") for exit in node["exits"]}
+        self.default_exit = node["exits"][0]["uuid"]
+        self.default_destination = node["exits"][0].get("destination_uuid")
+        # Where the operand of the router comes from: None if there is no router,
+        # otherwise 'groups', 'input', 'random' or 'variable'.
+        self.operand_source = None
+        self.router = node.get("router")
+        if self.router is None:
+            return
+
+        self.category_exits = {
+            category["uuid"]: category["exit_uuid"]
+            for category in self.router["categories"]
+        }
+        # Destination of each category, or the error to raise if it has none.
+        self.destinations = {}
+        for category in self.router["categories"]:
+            if category["exit_uuid"] in exits:
+                destination = exits[category["exit_uuid"]]
+            else:
+                destination = ValueError(
+                    "No valid destination_uuid in router of node with uuid " + self.uuid
+                )
+            self.destinations[category["uuid"]] = destination
+
+        if self.router["type"] != "switch":
+            self.operand_source = "random"
+            self.random_categories = [c["uuid"] for c in self.router["categories"]]
+            return
+
+        self.operand = self.router["operand"]
+        if self.operand == "@contact.groups":
+            self.operand_source = "groups"
+        elif self.operand == "@input.text" or node["actions"]:
+            # Actions implies CallWebhook, TransferAirtime or EnterFlow
+            self.operand_source = "input"
+        else:
+            self.operand_source = "variable"
+        self.cases = [
+            (_compile_case(case), case["category_uuid"])
+            for case in self.router["cases"]
+        ]
+        self.case_groups = [
+            case["arguments"][1] if case["type"] == "has_group" else None
+            for case in self.router["cases"]
+        ]
+        self.default_category = self.router["default_category_uuid"]
+        wait = self.router.get("wait")
+        self.has_wait = wait is not None
+        self.timeout_category = (
+            wait["timeout"]["category_uuid"]
+            if wait and "timeout" in wait and wait["timeout"]["seconds"] > 0
+            else None
+        )
+
+    def resolve(self, operand):
+        """
+        Get the uuid of the node visited after this node, given the operand of its
+        router. It is None at the end of the flow, and _WAITING if the router waits
+        for a response that never comes.
+        """
+        if self.operand_source is None:
+            return self.default_destination
+        if isinstance(operand, _Missing):
+            raise IndexError(f"Context has run out of {operand.name}.")
+        if self.operand_source == "random":
+            return self._category_destination(self.random_categories[operand])
+
+        category_uuid = self.default_category
+        if operand is None:
+            # Input "None" indicates No Response if the router has a wait.
+            if self.has_wait:
+                if self.timeout_category is None:
+                    return _WAITING  # We're stuck here forever --> exit here.
+                category_uuid = self.timeout_category
+        else:
+            for matches, case_category_uuid in self.cases:
+                if matches(operand):
+                    category_uuid = case_category_uuid
+                    break
+        return self._category_destination(category_uuid)
+
+    def branches(self, groups):
+        """
+        Get the exits that may be taken from this node, whatever the response of
+        the contact, as (exit uuid, destination) pairs. The destination is an
+        error for categories without a valid exit, and _WAITING for a router that
+        waits for a response that never comes.
+
+        Args:
+            groups: groups the contact is known to be in
+        """
+        if self.operand_source is None:
+            return [(self.default_exit, self.default_destination)]
+        if self.operand_source == "random":
+            return [self._branch(category) for category in self.random_categories]
+
+        categories = []
+        for (_, category_uuid), group in zip(self.cases, self.case_groups):
+            categories.append(category_uuid)
+            if self.operand_source == "groups" and group in groups:
+                # Cases after this one can never match.
+                break
+        else:
+            categories.append(self.default_category)
+            if self.timeout_category is not None:
+                categories.append(self.timeout_category)
+        branches = [self._branch(category) for category in dict.fromkeys(categories)]
+        if self.has_wait and self.timeout_category is None:
+            branches.append((None, _WAITING))
+        return branches
+
+    def _branch(self, category_uuid):
+        try:
+            destination = self._category_destination(category_uuid)
+        except ValueError as error:
+            destination = error
+        return self.category_exits.get(category_uuid), destination
+
+    def _category_destination(self, category_uuid):
+        if category_uuid not in self.destinations:
+            raise ValueError(
+                "No valid exit_uuid in router of node with uuid " + self.uuid
+            )
+        destination = self.destinations[category_uuid]
+        if isinstance(destination, ValueError):
+            raise destination
+        return destination
+
+
+class FlowCoverage:
+    """
+    Result of exploring all paths through a flow, see explore_flow.
+
+    Attributes:
+        visit_counts: number of paths through each node, by node uuid; paths end
+            where they leave the flow, or where they return to a node in a state in
+            which it has already been visited on the path
+        unreachable_nodes: uuids of nodes that no path visits, in flow order
+        dead_end_exits: (node uuid, exit uuid) pairs of exits of routers that are
+            taken on some path and have no destination, i.e. end the flow
+        invalid_destinations: (node uuid, destination) pairs of exits that are taken
+            on some path and lead to a node that does not exist, or router
+            categories without a valid exit
+        path_count: number of paths that reach the end of the flow
+    """
+
+    def __init__(self):
+        self.visit_counts = {}
+        self.unreachable_nodes = []
+        self.dead_end_exits = []
+        self.invalid_destinations = []
+        self.path_count = 0
+
+
+def explore_flow(flow):
+    """
+    Explore all paths through a flow, regardless of the responses of the contact.
+
+    Switch routers branch into each of their cases and the default and no response
+    categories, random routers into each of their categories. The only context
+    kept along a path is the set of groups the contact has been added to that are
+    tested by the flow, so each node is visited once for each such set.
+
+    Args:
+        flow: flow in RapidPro JSON format, as a dict
+
+    Returns:
+        FlowCoverage of the flow.
+    """
+    compiled = CompiledFlow(flow)
+    nodes = compiled.nodes
+    coverage = FlowCoverage()
+    coverage.visit_counts = {uuid: 0 for uuid in nodes}
+    if compiled.start is None:
+        return coverage
+
+    tested_groups = {
+        group
+        for node in nodes.values()
+        if node.operand_source == "groups"
+        for group in node.case_groups
+    }
+    dead_ends = {}
+    invalid = {}
+    # Edges between states (node uuid, groups), excluding those that close a cycle.
+    edges = {}
+    ends = {}
+    order = []
+    start = (compiled.start.uuid, frozenset())
+    on_path = {start}
+    stack = [(start, None, None)]
+    while stack:
+        state, groups, branches = stack[-1]
+        if branches is None:
+            node = nodes[state[0]]
+            groups = state[1] | tested_groups.intersection(node.added_groups)
+            branches = iter(node.branches(groups))
+            stack[-1] = (state, groups, branches)
+            edges[state] = []
+            ends[state] = 0
+        for exit_uuid, destination in branches:
+            if destination is None or destination is _WAITING:
+                if destination is None and nodes[state[0]].router is not None:
+                    dead_ends[(state[0], exit_uuid)] = None
+                ends[state] += 1
+            elif isinstance(destination, ValueError) or destination not in nodes:
+                invalid[(state[0], str(destination))] = None
+                ends[state] += 1
+            elif (destination, groups) not in on_path:
+                child = (destination, groups)
+                edges[state].append(child)
+                if child not in edges:
+                    on_path.add(child)
+                    stack.append((child, None, None))
+                    break
+        else:
+            stack.pop()
+            on_path.discard(state)
+            order.append(state)
+
+    # Count paths in topological order of the (acyclic) state graph.
+    paths = {start: 1}
+    for state in reversed(order):
+        count = paths.get(state, 0)
+        coverage.visit_counts[state[0]] += count
+        coverage.path_count += count * ends[state]
+        for child in edges[state]:
+            paths[child] = paths.get(child, 0) + count
+
+    coverage.unreachable_nodes = [
+        uuid for uuid, count in coverage.visit_counts.items() if not count
+    ]
+    coverage.dead_end_exits = list(dead_ends)
+    coverage.invalid_destinations = list(invalid)
+    return coverage
+
+
+def explore_flows(container):
+    """
+    Explore all flows of a RapidPro export, see explore_flow.
+
+    Args:
+        container: RapidPro import/export format, as a dict
+
+    Returns:
+        dict mapping flow names to their FlowCoverage.
+    """
+    return {flow["name"]: explore_flow(flow) for flow in container["flows"]}
+
+
+EMAIL_PATTERN = re.compile(r"[\w]+@[\w]+\.[\w]+")
+
+
+def _compile_case(case):
+    """
+    Turn a router case into a function that tells whether an operand matches it,
+    with the same semantics as find_destination_uuid. Errors in the case are only
+    raised once the case is evaluated.
+    """
+    case_type = case["type"]
+    arguments = case["arguments"]
+    try:
+        if case_type == "has_group":
+            group_name = arguments[1]
+            return lambda operand: group_name in operand
+        if case_type == "has_phrase":
+            phrase = arguments[0].lower()
+            return lambda operand: phrase in operand.lower()
+        if case_type in ("has_only_text", "has_category"):
+            # These are case sensitive
+            text = arguments[0]
+            return lambda operand: text == operand
+        if case_type == "has_any_word":
+            words = {word.lower() for word in arguments[0].split()}
+            return lambda operand: not words.isdisjoint(operand.lower().split())
+        if case_type in ("has_text", "has_email"):
+            if arguments != []:
+                raise ValueError(f"{case_type} case type must not have arguments")
+            if case_type == "has_text":
+                return lambda operand: operand.strip() != ""
+            return lambda operand: EMAIL_PATTERN.search(operand) is not None
+        if case_type == "has_number_between":
+            if len(arguments) != 2:
+                raise ValueError("has_number_between must have 2 arguments")
+            low, high = float(arguments[0]), float(arguments[1])
+            return lambda operand: _matches_number(operand, lambda n: low <= n <= high)
+        if case_type == "has_number_lt":
+            limit = float(arguments[0])
+            return lambda operand: _matches_number(operand, lambda n: n < limit)
+        if case_type == "has_number_gt":
+            limit = float(arguments[0])
+            return lambda operand: _matches_number(operand, lambda n: n > limit)
+    except ValueError as error:
+        return lambda operand, error=error: _raise(error)
+
+    return lambda operand: False
+
+
+def _matches_number(operand, predicate):
+    # This might differ from the RapidPro implementation.
+    try:
+        number = float(operand)
+    except ValueError:
+        return False
+    return predicate(number)
+
+
+def _raise(error):
+    raise error
@@ -1,5 +1,111 @@
 import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+
+class _UUIDScope:
+    def __init__(self, namespace, path, counters):
+        self.namespace = namespace
+        self.path = path
+        # Shared by all scopes under the same deterministic_uuids context, so that
+        # scopes entered more than once with the same path do not repeat UUIDs.
+        self.counters = counters
+
+    def child(self, names):
+        return _UUIDScope(
+            self.namespace,
+            self.path + tuple(str(name) for name in names),
+            self.counters,
+        )
+
+    def next_uuid(self):
+        index = self.counters.get(self.path, 0)
+        self.counters[self.path] = index + 1
+
+        return derive_uuid(self.namespace, *self.path, index)
+
+
+_uuid_scope = ContextVar("uuid_scope", default=None)
 
 
 def generate_new_uuid():
-    return str(uuid.uuid4())
+    """
+    Generate a random UUID, or, within a deterministic_uuids context, the next UUID
+    of the current scope.
+    """
+    scope = _uuid_scope.get()
+
+    if scope is None:
+        return str(uuid.uuid4())
+
+    return scope.next_uuid()
+
+
+def stable_uuid(*names):
+    """
+    Within a deterministic_uuids context, get the UUID identified by names, which is
+    the same wherever it is requested. Outside of such a context, generate a random
+    UUID.
+    """
+    scope = _uuid_scope.get()
+
+    if scope is None:
+        return str(uuid.uuid4())
+
+    return derive_uuid(scope.namespace, *names)
+
+
+def derive_uuid(namespace, *names):
+    return str(uuid.uuid5(namespace, "/".join(str(name) for name in names)))
+
+
+def to_uuid_namespace(value):
+    """
+    Convert a UUID, or any string, into a namespace for deterministic_uuids.
+    """
+    if isinstance(value, uuid.UUID):
+        return value
+
+    try:
+        return uuid.UUID(value)
+    except ValueError:
+        return uuid.uuid5(uuid.NAMESPACE_URL, value)
+
+
+@contextmanager
+def deterministic_uuids(namespace):
+    """
+    Derive the UUIDs generated within this context from namespace and the path of
+    the current uuid_scope, instead of generating random ones. If namespace is None,
+    UUIDs remain random.
+    """
+    if namespace is None:
+        yield
+        return
+
+    token = _uuid_scope.set(_UUIDScope(to_uuid_namespace(namespace), (), {}))
+
+    try:
+        yield
+    finally:
+        _uuid_scope.reset(token)
+
+
+@contextmanager
+def uuid_scope(*names):
+    """
+    Extend the path from which UUIDs are derived by names, within a
+    deterministic_uuids context; otherwise, do nothing.
+    """
+    scope = _uuid_scope.get()
+
+    if scope is None:
+        yield
+        return
+
+    token = _uuid_scope.set(scope.child(names))
+
+    try:
+        yield
+    finally:
+        _uuid_scope.reset(token)
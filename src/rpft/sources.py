@@ -1,11 +1,12 @@
 import json
 import logging
+from collections.abc import Mapping
 from pathlib import Path
 
 from benedict import benedict
 from tablib import Dataset
 
-from rpft.parsers.universal import tabulate
+from rpft.parsers.universal import iter_entries, tabulate
 from rpft.parsers.common.model_inference import model_from_headers
 from rpft.parsers.common.sheetparser import SheetParser
 from rpft.parsers.sheets import Sheet
@@ -18,17 +19,18 @@ class JSONDataSource:
 
     def __init__(self, paths):
         self.objs = []
+        self._instances = {}
+        self._sheets = {}
 
         for path in paths:
-            with open(path, "r") as file_:
-                self.objs += [(json.load(file_), Path(path).name)]
+            self.objs += [(IndexedJSONObject.from_file(path), Path(path).name)]
 
     def get(self, key, model=None):
         candidates = []
 
-        for obj, name in self.objs:
+        for i, (obj, name) in enumerate(self.objs):
             if key in obj:
-                candidates += [(obj[key], name)]
+                candidates += [(i, name)]
 
         if not candidates:
             raise Exception("Data for key not found", {"key": key})
@@ -47,26 +49,44 @@ class JSONDataSource:
                 ),
             )
 
-        model = model or benedict
-
-        return [model(**item) for item in active], name, key
+        return self._get_instances(active, key, model), name, key
 
     def get_all(self, key, model=None):
+        return [
+            (self._get_instances(i, key, model), name, key)
+            for i, (obj, name) in enumerate(self.objs)
+            if key in obj
+        ]
+
+    def close(self):
+        pass
+
+    def _get_instances(self, index, key, model=None):
+        # The same sheet is requested repeatedly, e.g. for templates, data sheets
+        # and surveys, so instances are created once for each key and model, and
+        # shared by all callers, as the rows of a data sheet are shared by all the
+        # flows using it. Callers must not modify them: flow contexts layer their
+        # own variables over a row, and SurveyQuestion copies its row before
+        # renaming its variables.
         model = model or benedict
-        items = []
+        cache_key = (index, key, model)
 
-        for obj, name in self.objs:
-            if key in obj:
-                items += [([model(**item) for item in obj[key]], name, key)]
+        if cache_key not in self._instances:
+            obj, _ = self.objs[index]
+            self._instances[cache_key] = [model(**item) for item in obj[key]]
 
-        return items
+        return list(self._instances[cache_key])
 
     def _get_sheet_or_die(self, sheet_name):
-        data, meta, name, key = self._get(sheet_name)
-        table = tabulate(data, meta)
-        sheet = Sheet(None, name, Dataset(*table[1:], headers=table[0], title=key))
+        # Sheets are decoded and tabulated once, like those loaded by sheet readers.
+        if sheet_name not in self._sheets:
+            data, meta, name, key = self._get(sheet_name)
+            table = tabulate(data, meta)
+            self._sheets[sheet_name] = Sheet(
+                None, name, Dataset(*table[1:], headers=table[0], title=key)
+            )
 
-        return sheet
+        return self._sheets[sheet_name]
 
     def _get(self, key):
         candidates = []
@@ -101,6 +121,38 @@ class JSONDataSource:
         return active, meta, name, key
 
 
+class IndexedJSONObject(Mapping):
+    """
+    Read-only mapping of the keys of a JSON object to their values. The values are
+    located when the object is created, but only decoded when they are looked up.
+    """
+
+    def __init__(self, text):
+        self.text = text
+        self.offsets = {
+            key: (start, end) for key, _, start, end in iter_entries(text, decode=False)
+        }
+
+    @classmethod
+    def from_file(cls, path):
+        with open(path, "r") as file_:
+            return cls(file_.read())
+
+    def __getitem__(self, key):
+        start, end = self.offsets[key]
+
+        return json.loads(self.text[start:end])
+
+    def __contains__(self, key):
+        return key in self.offsets
+
+    def __iter__(self):
+        return iter(self.offsets)
+
+    def __len__(self):
+        return len(self.offsets)
+
+
 class SheetDataSource:
 
     def __init__(self, readers):
@@ -116,6 +168,11 @@ class SheetDataSource:
 
         return SheetParser(sheet.table, model).parse_all(), sheet.reader.name, key
 
+    def close(self):
+        """Close the readers of the sheets."""
+        for reader in self.readers:
+            reader.close()
+
     def get_all(self, key, model=None):
         return [
             (
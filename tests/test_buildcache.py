@@ -0,0 +1,203 @@
+import tempfile
+from contextlib import redirect_stderr
+from io import StringIO
+from pathlib import Path
+from unittest import TestCase
+from unittest.mock import patch
+
+from rpft.cli import main
+from rpft.parsers.creation import buildcache
+from rpft.parsers.creation.buildcache import BuildCache
+from rpft.parsers.creation.contentindexparser import ContentIndexParser
+from rpft.rapidpro.simulation import Context, traverse_flow
+from rpft.sources import SheetDataSource
+from tests.mocks import MockSheetReader
+from tests.utils import csv_join
+
+
+class TestBuildCache(TestCase):
+    def setUp(self):
+        self.cache_dir = tempfile.TemporaryDirectory()
+        self.cache_path = Path(self.cache_dir.name) / "cache.json"
+        self.ci_sheet = csv_join(
+            "type,sheet_name,data_sheet,data_row_id,template_arguments,data_model",
+            "template_definition,my_template,,,lookup;sheet|,",
+            "template_definition,my_block,,,,",
+            "create_flow,my_template,nesteddata,,lookup,",
+            "create_flow,my_basic_flow,,,,",
+            "data_sheet,nesteddata,,,,NestedRowModel",
+            "data_sheet,lookup,,,,NestedRowModel",
+        )
+        self.sheets = {
+            "nesteddata": csv_join(
+                "ID,value1,custom_field.happy,custom_field.sad",
+                "row1,Value1,Happy1,Sad1",
+                "row2,Value2,Happy2,Sad2",
+            ),
+            "lookup": csv_join(
+                "ID,value1,custom_field.happy,custom_field.sad",
+                "row1,Lookup1,,",
+            ),
+            "my_template": csv_join(
+                "row_id,type,from,message_text",
+                ",send_message,start,{{value1}} {{lookup['row1'].value1}}",
+                ",insert_as_block,,my_block",
+            ),
+            "my_block": csv_join(
+                "row_id,type,from,message_text",
+                ",send_message,,Block text",
+            ),
+            "my_basic_flow": csv_join(
+                "row_id,type,from,message_text",
+                ",send_message,start,Some text",
+            ),
+        }
+
+    def tearDown(self):
+        self.cache_dir.cleanup()
+
+    def build(self, data_models="tests.datarowmodels.nestedmodel"):
+        cache = BuildCache(self.cache_path, data_models)
+        output = (
+            ContentIndexParser(
+                SheetDataSource([MockSheetReader(self.ci_sheet, self.sheets)]),
+                data_models,
+            )
+            .parse_all(build_cache=cache)
+            .render()
+        )
+        cache.save()
+
+        return output, dict(cache.explanations)
+
+    def test_unchanged_flows_are_reused(self):
+        first, explanations = self.build()
+
+        self.assertEqual(
+            explanations,
+            {
+                "my_template - row1": "not in build cache",
+                "my_template - row2": "not in build cache",
+                "my_basic_flow": "not in build cache",
+            },
+        )
+
+        second, explanations = self.build()
+
+        self.assertEqual(explanations, {})
+        self.assertEqual(second["flows"], first["flows"])
+        self.assertEqual(
+            traverse_flow(second["flows"][0], Context()),
+            [("send_msg", "Value1 Lookup1"), ("send_msg", "Block text")],
+        )
+
+    def test_changed_data_row_rebuilds_affected_flow(self):
+        self.build()
+        self.sheets["nesteddata"] = self.sheets["nesteddata"].replace(
+            "Value2", "Changed2"
+        )
+
+        output, explanations = self.build()
+
+        self.assertEqual(
+            explanations,
+            {
+                "my_template - row2": (
+                    "data row 'row2' of data sheet 'nesteddata' changed"
+                ),
+            },
+        )
+        self.assertEqual(
+            traverse_flow(output["flows"][1], Context()),
+            [("send_msg", "Changed2 Lookup1"), ("send_msg", "Block text")],
+        )
+
+    def test_changed_inserted_block_rebuilds_flows_using_it(self):
+        self.build()
+        self.sheets["my_block"] = self.sheets["my_block"].replace("Block", "New")
+
+        _, explanations = self.build()
+
+        self.assertEqual(
+            explanations,
+            {
+                "my_template - row1": "template 'my_block' changed",
+                "my_template - row2": "template 'my_block' changed",
+            },
+        )
+
+    def test_changed_sheet_argument_rebuilds_flows_using_it(self):
+        self.build()
+        self.sheets["lookup"] = self.sheets["lookup"].replace("Lookup1", "Other")
+
+        _, explanations = self.build()
+
+        self.assertEqual(
+            explanations,
+            {
+                "my_template - row1": "data sheet 'lookup' changed",
+                "my_template - row2": "data sheet 'lookup' changed",
+            },
+        )
+
+    def test_changed_create_flow_definition_rebuilds_flow(self):
+        self.build()
+        self.ci_sheet = self.ci_sheet.replace(
+            "create_flow,my_basic_flow,,,,", "create_flow,my_basic_flow,,,extra,"
+        )
+
+        _, explanations = self.build()
+
+        self.assertEqual(
+            explanations, {"my_basic_flow": "create_flow definition changed"}
+        )
+
+    def test_flows_with_the_same_name_are_cached_separately(self):
+        self.ci_sheet += "\ncreate_flow,my_template,nesteddata,row1,nesteddata,"
+        first, explanations = self.build()
+
+        self.assertEqual(explanations["my_template - row1"], "not in build cache")
+
+        second, explanations = self.build()
+
+        self.assertEqual(explanations, {})
+        self.assertEqual(second["flows"], first["flows"])
+
+    def test_new_rpft_version_rebuilds_all_flows(self):
+        self.build()
+
+        with patch.object(buildcache, "package_version", return_value="0.0.0"):
+            _, explanations = self.build()
+
+        self.assertEqual(len(explanations), 3)
+        self.assertEqual(set(explanations.values()), {"rpft version changed"})
+
+    def test_changed_data_models_rebuild_all_flows(self):
+        self.build()
+
+        with patch.object(buildcache, "module_hash", return_value="changed"):
+            _, explanations = self.build()
+
+        self.assertEqual(len(explanations), 3)
+        self.assertEqual(set(explanations.values()), {"data models changed"})
+
+    def test_dependencies_are_hashed_once_per_build(self):
+        self.build()
+
+        with patch.object(
+            buildcache, "dependency_hash", wraps=buildcache.dependency_hash
+        ) as dependency_hash:
+            self.build()
+
+        dependencies = [call.args[1] for call in dependency_hash.call_args_list]
+
+        self.assertEqual(len(dependencies), len(set(dependencies)))
+
+    def test_explain_requires_cache(self):
+        argv = ["rpft", "create", "--explain", "-f", "csv", "-o", "out.json", "in"]
+
+        with patch("sys.argv", argv), patch("rpft.cli.initialize_main_logger"):
+            with redirect_stderr(StringIO()) as stderr, self.assertRaises(SystemExit):
+                main()
+
+        self.assertIn("--explain requires --cache", stderr.getvalue())
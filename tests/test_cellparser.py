@@ -1,7 +1,14 @@
+import random
+from collections import ChainMap
 from unittest import TestCase
 from typing import List
 
-from rpft.parsers.common.cellparser import CellParser, unescape
+from rpft.parsers.common.cellparser import (
+    CellParser,
+    clear_template_cache,
+    template_cache_info,
+    unescape,
+)
 from rpft.parsers.common.rowparser import ParserModel
 
 
@@ -110,6 +117,21 @@ class TestStringSplitter(TestCase):
         self.compare_split_into_lists(" a\n|\nb ", ["a", "b"])
         self.compare_split_into_lists("1; 2\n|\n3; 4", [["1", "2"], ["3", "4"]])
 
+    def test_split_into_lists_is_same_as_splitting_by_each_separator(self):
+        rng = random.Random(0)
+        characters = ["a", " ", "\n", "|", ";", "\\"]
+
+        for _ in range(5000):
+            string = "".join(rng.choices(characters, k=rng.randint(0, 8)))
+            parts = self.parser.split_by_separator(string, "|")
+
+            if type(parts) is str:
+                expected = self.parser.split_by_separator(string, ";")
+            else:
+                expected = [self.parser.split_by_separator(s, ";") for s in parts]
+
+            self.compare_split_into_lists(string, unescape(expected))
+
 
 class TestCellParser(TestCase):
     def setUp(self):
@@ -121,12 +143,36 @@ class TestCellParser(TestCase):
             ("plain string", False),
         )
 
+    def test_strings_without_templates_are_not_rendered(self):
+        clear_template_cache()
+
+        self.assertEqual(
+            CellParser().parse_as_string(" plain string ", context={"var": "abc"}),
+            ("plain string", False),
+        )
+        self.assertEqual(template_cache_info().misses, 0)
+
     def test_templates_are_rendered(self):
         self.assertEqual(
             CellParser().parse_as_string(" {{var}} string ", context={"var": "abc"}),
             ("abc string", False),
         )
 
+    def test_templates_are_rendered_with_layered_context(self):
+        context = ChainMap({"var": "inner"}, {"var": "outer", "other": "abc"})
+
+        self.assertEqual(
+            CellParser().parse_as_string(
+                "{{var}} {{other}} {% for i in range(2) %}{{i}}{% endfor %}",
+                context=context,
+            ),
+            ("inner abc 01", False),
+        )
+        self.assertEqual(
+            CellParser().parse_as_string("{@ [var, other] @}", context=context),
+            (["inner", "abc"], True),
+        )
+
     def test_parse(self):
         out = self.parser.parse("a;b;c")
         self.assertEqual(out, ["a", "b", "c"])
@@ -158,3 +204,20 @@ class TestCellParser(TestCase):
             ((1, 2, [True, "a"]), True),
             "Rendered value should not be string; is_object should be True",
         )
+
+    def test_compiled_templates_are_shared_between_parsers(self):
+        clear_template_cache()
+
+        for i in range(3):
+            self.assertEqual(
+                CellParser().parse_as_string("{{var}}", context={"var": i}),
+                (str(i), False),
+            )
+        self.assertEqual(
+            CellParser().parse_as_string("{@var@}", context={"var": 1}),
+            (1, True),
+        )
+
+        info = template_cache_info()
+        self.assertEqual(info.misses, 2)
+        self.assertEqual(info.hits, 2)
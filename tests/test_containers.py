@@ -1,3 +1,5 @@
+import io
+import json
 import unittest
 
 from rpft.rapidpro.models.containers import RapidProContainer, FlowContainer
@@ -151,3 +153,30 @@ class TestRapidProContainer(unittest.TestCase):
         )
         self.assertEqual(rpc.flows[0].nodes[1].actions[0].flow.uuid, "fake-flow-uuid")
         self.assertEqual(rpc.triggers[0].flow.uuid, "fake-flow-uuid")
+
+    def test_render_to_stream(self):
+        rpc = RapidProContainer()
+        rpc.add_flow(get_flow_with_group_and_flow_node())
+        rpc.add_flow(get_has_group_flow())
+        rpc.add_trigger(
+            Trigger(
+                "K",
+                ["keyword"],
+                flow_name="Second Flow",
+                group_names=["Group"],
+                group_uuids=[],
+            )
+        )
+        stream = io.StringIO()
+
+        rpc.render_to_stream(stream)
+
+        self.assertEqual(stream.getvalue(), json.dumps(rpc.render(), indent=4))
+
+    def test_render_empty_container_to_stream(self):
+        rpc = RapidProContainer()
+        stream = io.StringIO()
+
+        rpc.render_to_stream(stream, indent=2)
+
+        self.assertEqual(stream.getvalue(), json.dumps(rpc.render(), indent=2))
@@ -10,7 +10,7 @@ from rpft.parsers.sheets import (
 )
 from rpft.rapidpro.models.triggers import RapidProTriggerError
 from rpft.rapidpro.simulation import Context, traverse_flow
-from rpft.sources import SheetDataSource
+from rpft.sources import JSONDataSource, SheetDataSource
 
 from tablib import Dataset
 from tests import TESTS_ROOT
@@ -343,6 +343,114 @@ class TestParsing(TestTemplate):
             ["Value3", "Happy3 and Sad3"],
         )
 
+    def test_generate_flows_in_parallel(self):
+        ci_sheet = csv_join(
+            "type,sheet_name,data_sheet,data_row_id,new_name,data_model,status",
+            "create_flow,my_template,nesteddata,,,,",
+            "create_flow,my_basic_flow,,,,,",
+            "data_sheet,nesteddata,,,,NestedRowModel,",
+        )
+        nesteddata = csv_join(
+            "ID,value1,custom_field.happy,custom_field.sad",
+            "row1,Value1,Happy1,Sad1",
+            "row2,Value2,Happy2,Sad2",
+            "row3,Value3,Happy3,Sad3",
+        )
+        my_template = csv_join(
+            "row_id,type,from,message_text,obj_name,obj_id",
+            ",send_message,start,{{value1}},,",
+            ",add_to_group,,{{custom_field.happy}},,abc-{{value1}}",
+        )
+        my_basic_flow = csv_join(
+            "row_id,type,from,message_text",
+            ",send_message,start,Some text",
+        )
+        sheet_dict = {
+            "nesteddata": nesteddata,
+            "my_template": my_template,
+            "my_basic_flow": my_basic_flow,
+        }
+
+        def parse(jobs):
+            return (
+                ContentIndexParser(
+                    SheetDataSource([MockSheetReader(ci_sheet, sheet_dict)]),
+                    "tests.datarowmodels.nestedmodel",
+                )
+                .parse_all(jobs=jobs)
+                .render()
+            )
+
+        serial = parse(1)
+        parallel = parse(2)
+
+        self.assertEqual(
+            [flow["name"] for flow in parallel["flows"]],
+            [flow["name"] for flow in serial["flows"]],
+        )
+        self.assertEqual(
+            [group["name"] for group in parallel["groups"]],
+            [group["name"] for group in serial["groups"]],
+        )
+        self.assertEqual(
+            [group["uuid"] for group in parallel["groups"]],
+            ["abc-Value1", "abc-Value2", "abc-Value3"],
+        )
+        self.assertEqual(
+            traverse_flow(parallel["flows"][1], Context()),
+            [("send_msg", "Value2"), ("add_contact_groups", "Happy2")],
+        )
+
+    def test_deterministic_uuids(self):
+        ci_sheet = csv_join(
+            "type,sheet_name,data_sheet,data_row_id,new_name,data_model,status",
+            "create_flow,my_template,nesteddata,,,,",
+            "create_campaign,my_campaign,,,,,",
+            "data_sheet,nesteddata,,,,NestedRowModel,",
+        )
+        nesteddata = csv_join(
+            "ID,value1,custom_field.happy,custom_field.sad",
+            "row1,Value1,Happy1,Sad1",
+            "row2,Value2,Happy2,Sad2",
+        )
+        my_template = csv_join(
+            "row_id,type,from,condition,message_text",
+            "1,wait_for_response,start,,",
+            ",send_message,1,yes,{{value1}}",
+            ",add_to_group,1,,{{custom_field.happy}}",
+            ",start_new_flow,,,other_flow",
+        )
+        my_campaign = csv_join(
+            "offset,unit,event_type,delivery_hour,message,relative_to,start_mode,flow",
+            "15,H,M,,Messagetext,Created On,I,",
+        )
+        sheet_dict = {
+            "nesteddata": nesteddata,
+            "my_template": my_template,
+            "my_campaign": my_campaign,
+        }
+
+        def parse(jobs=1, uuid_namespace="my chatbot"):
+            return (
+                ContentIndexParser(
+                    SheetDataSource([MockSheetReader(ci_sheet, sheet_dict)]),
+                    "tests.datarowmodels.nestedmodel",
+                )
+                .parse_all(jobs=jobs, uuid_namespace=uuid_namespace)
+                .render()
+            )
+
+        output = parse()
+
+        self.assertEqual(parse(), output)
+        self.assertEqual(parse(jobs=2), output)
+        self.assertNotEqual(
+            output["flows"][0]["nodes"][0]["uuid"],
+            output["flows"][1]["nodes"][0]["uuid"],
+        )
+        self.assertNotEqual(parse(uuid_namespace="other chatbot"), output)
+        self.assertNotEqual(parse(uuid_namespace=None), parse(uuid_namespace=None))
+
     def test_duplicate_create_flow(self):
         ci_sheet = (
             "type,sheet_name,data_sheet,data_row_id,new_name,data_model,status\n"
@@ -1592,3 +1700,37 @@ class TestMultiFile(TestTemplate):
 
         self.assertFlowMessages(flows, "template - a", ["hello georg"])
         self.assertFlowMessages(flows, "template - b", ["hello chiara"])
+
+
+class TestParseFromJSON(TestTemplate):
+    def test_create_flow_from_data_row(self):
+        source = JSONDataSource([])
+        source.objs = [
+            (
+                {
+                    "content_index": [
+                        {"type": "data_sheet", "sheet_name": ["simpledata"]},
+                        {
+                            "type": "create_flow",
+                            "sheet_name": ["my_template"],
+                            "data_sheet": "simpledata",
+                            "data_row_id": "rowA",
+                        },
+                    ],
+                    "my_template": [
+                        {
+                            "row_id": "1",
+                            "type": "send_message",
+                            "from": ["start"],
+                            "message_text": "{{value1}}",
+                        }
+                    ],
+                    "simpledata": [{"ID": "rowA", "value1": "Value1"}],
+                },
+                "data",
+            )
+        ]
+
+        flows = ContentIndexParser(source).parse_all().render()
+
+        self.assertFlowMessages(flows, "my_template - rowA", ["Value1"])
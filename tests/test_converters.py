@@ -1,10 +1,18 @@
 import json
+import os
+import tempfile
+from contextlib import redirect_stderr
+from io import StringIO
+from pathlib import Path
 from unittest import TestCase
+from unittest.mock import patch
 
-from tablib import Dataset
+from tablib import Databook, Dataset
 
-from rpft.converters import to_json
+from rpft.cli import main
+from rpft.converters import flows_to_sheets, sheets_to_uni, to_json, uni_to_sheets
 from rpft.parsers.sheets import AbstractSheetReader, Sheet
+from tests import TESTS_ROOT
 
 
 class TestReaderToJson(TestCase):
@@ -55,6 +63,159 @@ class TestReaderToJson(TestCase):
         )
 
 
+class TestFlowsToSheets(TestCase):
+    def setUp(self):
+        self.input_file = TESTS_ROOT / "output/all_test_flows.json"
+
+        with open(self.input_file, "r", encoding="utf-8") as f:
+            self.flow_names = [flow["name"] for flow in json.load(f)["flows"]]
+
+    def test_parallel_output_matches_serial_output(self):
+        with tempfile.TemporaryDirectory() as serial:
+            parallel = Path(serial) / "parallel"
+            parallel.mkdir()
+            flows_to_sheets(self.input_file, serial, strip_uuids=True)
+            flows_to_sheets(self.input_file, parallel, strip_uuids=True, jobs=2)
+
+            self.assertEqual(
+                sorted(os.listdir(parallel)),
+                sorted(f"{name}.csv" for name in self.flow_names),
+            )
+
+            for name in os.listdir(parallel):
+                self.assertEqual(
+                    (parallel / name).read_bytes(),
+                    (Path(serial) / name).read_bytes(),
+                )
+
+    def test_single_workbook(self):
+        with tempfile.TemporaryDirectory() as folder:
+            path = Path(folder) / "flows.xlsx"
+            flows_to_sheets(
+                self.input_file, path, "xlsx", strip_uuids=True, jobs=2, workbook=True
+            )
+            book = Databook()
+
+            with open(path, "rb") as f:
+                book.load(f, "xlsx")
+
+        *sheets, index = book.sheets()
+
+        self.assertEqual(
+            [sheet.title for sheet in sheets],
+            [name[:31] for name in self.flow_names],
+        )
+        self.assertIn("type", sheets[0].headers)
+        self.assertEqual(index.title, "_flows")
+        self.assertEqual(
+            index.dict,
+            [
+                {"sheet": sheet.title, "flow": name}
+                for sheet, name in zip(sheets, self.flow_names)
+            ],
+        )
+
+    def test_long_flow_names_are_indexed(self):
+        with open(self.input_file, "r", encoding="utf-8") as f:
+            data = json.load(f)
+
+        long_name = "a_flow_with_a_name_longer_than_a_sheet_title"
+
+        for i, flow in enumerate(data["flows"][:2]):
+            flow["name"] = f"{long_name}_{i}"
+
+        with tempfile.TemporaryDirectory() as folder:
+            input_file = Path(folder) / "flows.json"
+            input_file.write_text(json.dumps(data))
+            path = Path(folder) / "flows.xlsx"
+
+            with self.assertLogs("rpft.converters", "WARNING"):
+                flows_to_sheets(input_file, path, "xlsx", workbook=True)
+
+            book = Databook()
+
+            with open(path, "rb") as f:
+                book.load(f, "xlsx")
+
+        *sheets, index = book.sheets()
+        flows = {row["sheet"]: row["flow"] for row in index.dict}
+
+        self.assertEqual(sheets[0].title, long_name[:31])
+        self.assertEqual(sheets[1].title, long_name[:29] + "-1")
+        self.assertEqual(flows[sheets[1].title], f"{long_name}_1")
+
+    def test_flows_without_nodes_are_written_to_workbook(self):
+        with open(self.input_file, "r", encoding="utf-8") as f:
+            data = json.load(f)
+
+        flow = data["flows"][0]
+        flow["nodes"] = []
+        flow["_ui"]["nodes"] = {}
+        data["flows"] = [flow]
+
+        with tempfile.TemporaryDirectory() as folder:
+            input_file = Path(folder) / "flows.json"
+            input_file.write_text(json.dumps(data))
+            path = Path(folder) / "flows.xlsx"
+            flows_to_sheets(input_file, path, workbook=True)
+            book = Databook()
+
+            with open(path, "rb") as f:
+                book.load(f, "xlsx")
+
+        sheet, index = book.sheets()
+
+        self.assertEqual(sheet.title, flow["name"])
+        self.assertEqual(len(sheet), 0)
+        self.assertEqual(index.dict, [{"sheet": flow["name"], "flow": flow["name"]}])
+
+    def test_workbook_requires_xlsx_format(self):
+        argv = ["rpft", "flows_to_sheets", "--workbook", "-f", "csv", "in", "out"]
+
+        with patch("sys.argv", argv), patch("rpft.cli.initialize_main_logger"):
+            with redirect_stderr(StringIO()) as stderr, self.assertRaises(SystemExit):
+                main()
+
+        self.assertIn("-f/--format must be xlsx", stderr.getvalue())
+
+
+class TestUniToSheets(TestCase):
+    def test_xlsx_titles_are_restored(self):
+        long_name = "a_very_long_name_of_a_table_in_the_workbook"
+        data = {
+            "_idems": {"tabulate": {}},
+            "short": [{"a": "1"}],
+            long_name + "_1": [{"b": "2"}],
+            long_name + "_2": [{"c": "3"}],
+            "with/slash": [{"d": "4"}],
+        }
+
+        with tempfile.TemporaryDirectory() as folder:
+            path = Path(folder) / "uni.json"
+            path.write_text(json.dumps(data))
+
+            with self.assertLogs("rpft.converters", "WARNING") as logs:
+                uni_to_sheets(path, Path(folder) / "sheets.xlsx")
+
+            book = Databook()
+
+            with open(Path(folder) / "sheets.xlsx", "rb") as f:
+                book.load(f, "xlsx")
+
+            restored = sheets_to_uni(str(Path(folder) / "sheets.xlsx"))
+
+        titles = [sheet.title for sheet in book.sheets()]
+
+        self.assertEqual(len(logs.output), 3)
+        self.assertEqual(titles[0], "short")
+        self.assertEqual(titles[3], "with-slash")
+        self.assertEqual(titles[4], "_idems_titles")
+        self.assertTrue(all(len(title) <= 31 for title in titles))
+        self.assertEqual(len({title.lower() for title in titles}), 5)
+        self.assertEqual(list(restored)[1:], list(data)[1:])
+        self.assertEqual(restored[long_name + "_2"], [{"c": 3}])
+
+
 class MockSheetReader(AbstractSheetReader):
     def __init__(self, sheets):
         self._sheets = sheets
@@ -0,0 +1,135 @@
+from collections import OrderedDict
+from typing import List
+
+from benedict import benedict
+from pydantic import ConfigDict
+from unittest import TestCase
+
+from rpft.parsers.creation.datarowmodel import DataRowModel
+from rpft.parsers.creation.datasheet import (
+    COLUMNAR_MIN_ROWS,
+    ColumnarRows,
+    DataSheet,
+)
+
+
+class ItemRowModel(DataRowModel):
+    name: str = ""
+    price: int = 0
+    tags: List[str] = []
+
+
+class ExtraRowModel(DataRowModel):
+    model_config = ConfigDict(extra="allow")
+
+    name: str = ""
+
+
+def items(*rows):
+    return [
+        ItemRowModel(ID=row_id, name=name, price=price, tags=[name])
+        for row_id, name, price in rows
+    ]
+
+
+class TestColumnarDataSheet(TestCase):
+    def setUp(self):
+        self.items = items(
+            ("a", "apple", 3),
+            ("b", "banana", 1),
+            ("c", "cherry", 2),
+            ("a", "avocado", 5),
+        )
+        self.columnar = DataSheet(ColumnarRows.from_instances(self.items), ItemRowModel)
+        self.plain = DataSheet(
+            OrderedDict((item.ID, item) for item in self.items), ItemRowModel
+        )
+
+    def assert_same_rows(self, data_sheet, expected):
+        self.assertIsInstance(data_sheet.rows, ColumnarRows)
+        self.assertEqual(list(data_sheet.rows.items()), list(expected.rows.items()))
+
+    def test_rows_are_looked_up_by_id(self):
+        self.assert_same_rows(self.columnar, self.plain)
+        self.assertEqual(self.columnar.rows["a"].name, "avocado")
+        self.assertEqual(self.columnar.rows["c"].tags, ["cherry"])
+        self.assertIsNone(self.columnar.rows.get("missing"))
+        self.assertEqual(self.columnar.to_dict(), self.plain.to_dict())
+
+    def test_filter(self):
+        expression = compile("price > 1", "<expression>", "eval")
+
+        self.assert_same_rows(
+            self.columnar.filter(expression), self.plain.filter(expression)
+        )
+
+    def test_sort(self):
+        expression = compile("name", "<expression>", "eval")
+
+        self.assert_same_rows(
+            self.columnar.sort(expression, reverse=True),
+            self.plain.sort(expression, reverse=True),
+        )
+
+    def test_concat(self):
+        other = items(("b", "blueberry", 4), ("d", "date", 6))
+        columnar = DataSheet.concat(
+            [self.columnar, DataSheet(ColumnarRows.from_instances(other), None)],
+            ItemRowModel,
+        )
+        plain = DataSheet.concat(
+            [
+                self.plain,
+                DataSheet(OrderedDict((item.ID, item) for item in other), None),
+            ],
+            ItemRowModel,
+        )
+
+        self.assert_same_rows(columnar, plain)
+        self.assertEqual(list(columnar.rows), ["a", "b", "c", "d"])
+
+    def test_rows_that_are_not_models_are_not_stored_by_column(self):
+        rows = [
+            benedict({"ID": str(i), "name": f"item {i}"})
+            for i in range(COLUMNAR_MIN_ROWS + 1)
+        ]
+        data_sheet = DataSheet.from_instances(rows, None)
+        expression = compile("name == 'item 7'", "<expression>", "eval")
+
+        self.assertIsInstance(data_sheet.rows, OrderedDict)
+        self.assertEqual(data_sheet.rows["7"]["name"], "item 7")
+        self.assertEqual(list(data_sheet.filter(expression).rows), ["7"])
+
+    def test_large_sheets_of_models_are_stored_by_column(self):
+        rows = items(*((str(i), f"item {i}", i) for i in range(COLUMNAR_MIN_ROWS)))
+
+        self.assertIsInstance(
+            DataSheet.from_instances(rows, ItemRowModel).rows, ColumnarRows
+        )
+        self.assertIsInstance(DataSheet.from_instances(rows, None).rows, ColumnarRows)
+
+
+class TestDataSheetExpressions(TestCase):
+    def setUp(self):
+        rows = [ExtraRowModel(ID="a", name="apple", colour="red")]
+        self.data_sheet = DataSheet(
+            OrderedDict((row.ID, row) for row in rows), ExtraRowModel
+        )
+
+    def test_extra_fields_are_variables(self):
+        expression = compile("colour == 'red'", "<expression>", "eval")
+
+        self.assertEqual(list(self.data_sheet.filter(expression).rows), ["a"])
+
+    def test_rows_cannot_be_modified(self):
+        expression = compile("(name := 'changed') == ''", "<expression>", "eval")
+
+        with self.assertRaises(TypeError):
+            self.data_sheet.filter(expression)
+
+        self.assertEqual(self.data_sheet.rows["a"].name, "apple")
+
+    def test_rows_with_extra_fields_are_not_stored_by_column(self):
+        rows = [ExtraRowModel(ID="a", colour="red")]
+
+        self.assertIsNone(ColumnarRows.from_instances(rows))
@@ -0,0 +1,112 @@
+import copy
+import json
+import re
+import uuid
+from unittest import TestCase
+
+from rpft.rapidpro.diff import diff_exports, format_diff, is_empty
+from tests import TESTS_ROOT
+
+
+class TestDiffExports(TestCase):
+    def setUp(self):
+        with open(TESTS_ROOT / "output/all_test_flows.json", "r") as f:
+            self.old = json.load(f)
+
+        self.new = copy.deepcopy(self.old)
+
+    def test_identical_exports(self):
+        diff = diff_exports(self.old, self.new)
+
+        self.assertTrue(is_empty(diff))
+        self.assertEqual(format_diff(diff), [])
+
+    def test_new_uuids_are_not_changes(self):
+        content = json.dumps(self.old)
+        uuids = set(re.findall(r"[0-9a-f]{8}(?:-[0-9a-f]{4}){3}-[0-9a-f]{12}", content))
+
+        for old_uuid in uuids:
+            content = content.replace(old_uuid, str(uuid.uuid4()))
+
+        self.assertTrue(is_empty(diff_exports(self.old, json.loads(content))))
+
+    def test_changed_action(self):
+        self.new["flows"][0]["nodes"][0]["actions"][0]["text"] = "Changed"
+
+        diff = diff_exports(self.old, self.new)
+        [change] = diff["flows"]["changed"]
+        [node] = change["nodes"]["changed"]
+
+        self.assertEqual(change["name"], "no_switch_nodes")
+        self.assertEqual(node["actions"]["added"][0]["text"], "Changed")
+        self.assertEqual(
+            node["actions"]["removed"][0]["text"], "this is a send message node"
+        )
+        self.assertEqual(
+            format_diff(diff), ["~ flow 'no_switch_nodes': nodes 1 changed"]
+        )
+
+    def test_renamed_flow_is_matched_by_uuid(self):
+        self.new["flows"][1]["name"] = "renamed"
+
+        diff = diff_exports(self.old, self.new)
+
+        self.assertEqual(diff["flows"]["added"], [])
+        self.assertEqual(diff["flows"]["removed"], [])
+        self.assertEqual(
+            format_diff(diff),
+            ["~ flow 'loop_and_multiple_conditions' -> 'renamed': renamed"],
+        )
+
+    def test_added_and_removed_flows_and_nodes(self):
+        removed_flow = self.new["flows"].pop(0)
+        removed_node = self.new["flows"][1]["nodes"].pop(1)
+        self.old["flows"].pop()
+
+        diff = diff_exports(self.old, self.new)
+
+        self.assertEqual(diff["flows"]["added"], ["loop_from_start"])
+        self.assertEqual(diff["flows"]["removed"], [removed_flow["name"]])
+        self.assertEqual(
+            diff["flows"]["changed"][0]["nodes"]["removed"][0]["actions"][0]["text"],
+            removed_node["actions"][0]["text"],
+        )
+
+    def test_changed_router_cases(self):
+        flow = next(f for f in self.new["flows"] if f["name"] == "switch_nodes")
+        node = next(n for n in flow["nodes"] if n.get("router", {}).get("cases"))
+        node["router"]["cases"][0]["arguments"] = ["something else"]
+
+        [change] = diff_exports(self.old, self.new)["flows"]["changed"]
+        [node_change] = change["nodes"]["changed"]
+
+        self.assertEqual(
+            node_change["cases"]["added"][0]["arguments"], ["something else"]
+        )
+        self.assertEqual(len(node_change["cases"]["removed"]), 1)
+        self.assertEqual(node_change["categories"], {"added": [], "removed": []})
+
+    def test_rewired_exit(self):
+        flow = next(f for f in self.new["flows"] if f["name"] == "no_switch_nodes")
+        flow["nodes"][0]["exits"][0]["destination_uuid"] = flow["nodes"][-1]["uuid"]
+
+        diff = diff_exports(self.old, self.new)
+        [change] = diff["flows"]["changed"]
+        [edge] = change["edges"]["changed"]
+
+        self.assertEqual(change["nodes"]["changed"], [])
+        self.assertEqual(edge["uuid"], flow["nodes"][0]["uuid"])
+        self.assertEqual(edge["exits"][0]["exit"], 0)
+        self.assertEqual(edge["exits"][0]["new"], flow["nodes"][-1]["uuid"])
+        self.assertEqual(
+            format_diff(diff), ["~ flow 'no_switch_nodes': edges 1 changed"]
+        )
+
+    def test_owned_exports(self):
+        self.new["flows"][0]["nodes"][0]["actions"][0]["text"] = "Changed"
+        expected = diff_exports(self.old, self.new)
+
+        self.assertEqual(
+            diff_exports(copy.deepcopy(self.old), copy.deepcopy(self.new), owned=True),
+            expected,
+        )
@@ -11,6 +11,7 @@ from rpft.rapidpro.models.actions import Group, AddContactGroupAction
 from rpft.rapidpro.models.containers import RapidProContainer, FlowContainer
 from rpft.rapidpro.models.nodes import BasicNode
 from rpft.rapidpro.simulation import (
+    CompiledFlow,
     Context,
     find_destination_uuid,
     find_node_by_uuid,
@@ -411,16 +412,15 @@ class TestBlocks(TestCase):
         )
 
     def assert_messages(self, output, expected, context=None):
-        self.assertEqual(
-            traverse_flow(output, context or Context()),
-            list(zip(["send_msg"] * len(expected), expected)),
+        self.assert_actions(
+            output, list(zip(["send_msg"] * len(expected), expected)), context
         )
 
     def assert_actions(self, output, expected, context=None):
-        self.assertEqual(
-            traverse_flow(output, context or Context()),
-            expected,
-        )
+        context = context or Context()
+        # The compiled flow does not consume the context, so it is run first.
+        self.assertEqual(CompiledFlow(output).traverse(context), expected)
+        self.assertEqual(traverse_flow(output, context), expected)
 
 
 class TestWebhook(TestBlocks):
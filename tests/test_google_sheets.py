@@ -0,0 +1,116 @@
+import tempfile
+from datetime import datetime, timezone
+from unittest import TestCase
+from unittest.mock import patch
+
+from rpft.parsers.sheets import GoogleSheetCache, create_google_sheet_readers
+
+SPREADSHEETS = {
+    "sheet_a": {
+        "content_index": [["type", "sheet_name"], ["create_flow", "my_flow"]],
+        "my_flow": [["row_id", "type", "message_text"], ["", "send_message", "Hi"]],
+    },
+    "sheet_b": {
+        "data": [["ID", "value"], ["row1", "Line 1\r\nLine 2"], ["row2"]],
+    },
+}
+
+
+class FakeRequest:
+    def __init__(self, service, kind, response):
+        self.service = service
+        self.kind = kind
+        self.response = response
+
+    def execute(self):
+        self.service.requests.append(self.kind)
+
+        return self.response
+
+
+class FakeSheetsService:
+    """Stands in for the client returned by build("sheets", "v4", ...)"""
+
+    def __init__(self):
+        self.requests = []
+
+    def spreadsheets(self):
+        return self
+
+    def values(self):
+        return self
+
+    def get(self, spreadsheetId):
+        sheets = [
+            {"properties": {"title": title}} for title in SPREADSHEETS[spreadsheetId]
+        ]
+
+        return FakeRequest(self, "get", {"sheets": sheets})
+
+    def batchGet(self, spreadsheetId, ranges):
+        value_ranges = [
+            {
+                "range": f"'{title}'!A1:Z1000",
+                "values": SPREADSHEETS[spreadsheetId][title],
+            }
+            for title in ranges
+        ]
+
+        return FakeRequest(self, "batchGet", {"valueRanges": value_ranges})
+
+
+class TestGoogleSheetReaders(TestCase):
+    def setUp(self):
+        self.service = FakeSheetsService()
+        self.modified_times = {
+            "sheet_a": datetime(2024, 1, 1, tzinfo=timezone.utc),
+            "sheet_b": datetime(2024, 1, 2, tzinfo=timezone.utc),
+        }
+        self.cache_dir = tempfile.TemporaryDirectory()
+        patches = [
+            patch("rpft.parsers.sheets.build", return_value=self.service),
+            patch("rpft.parsers.sheets.get_credentials"),
+            patch(
+                "rpft.parsers.sheets.Drive.get_modified_time",
+                side_effect=lambda ids: {i: self.modified_times[i] for i in ids},
+            ),
+        ]
+
+        for p in patches:
+            p.start()
+            self.addCleanup(p.stop)
+
+    def tearDown(self):
+        self.cache_dir.cleanup()
+
+    def read(self, cache=None):
+        return create_google_sheet_readers(["sheet_a", "sheet_b"], cache=cache)
+
+    def test_readers_are_returned_in_order(self):
+        readers = self.read()
+
+        self.assertEqual([r.name for r in readers], ["sheet_a", "sheet_b"])
+        self.assertEqual(list(readers[0].sheets), ["content_index", "my_flow"])
+        self.assertEqual(
+            readers[1].get_sheet("data").table.dict,
+            [
+                {"ID": "row1", "value": "Line 1\nLine 2"},
+                {"ID": "row2", "value": ""},
+            ],
+        )
+
+    def test_unmodified_spreadsheets_are_taken_from_cache(self):
+        self.read(GoogleSheetCache(self.cache_dir.name))
+        self.assertEqual(self.service.requests.count("batchGet"), 2)
+
+        self.modified_times["sheet_b"] = datetime(2024, 2, 1, tzinfo=timezone.utc)
+        self.service.requests.clear()
+        readers = self.read(GoogleSheetCache(self.cache_dir.name))
+
+        self.assertEqual(self.service.requests, ["get", "batchGet"])
+        self.assertEqual(
+            readers[0].get_sheet("my_flow").table[0], ("", "send_message", "Hi")
+        )
+        self.assertEqual(
+            readers[1].get_sheet("data").table[0], ("row1", "Line 1\nLine 2")
+        )
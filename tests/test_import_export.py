@@ -103,6 +103,20 @@ class TestImportExport(unittest.TestCase):
             render_output = container.render()
             self.assertEqual(render_output, container_data, msg=filename)
 
+    def test_owned_container_import(self):
+        self.maxDiff = None
+        containerFilenamesList = self.data_dir.glob(
+            "containers/rapidpro_container_*.json"
+        )
+        for filename in containerFilenamesList:
+            with open(filename, "r") as f:
+                expected_container_data = json.load(f)
+            with open(filename, "r") as f:
+                container_data = json.load(f)
+            container = RapidProContainer.from_dict(container_data, owned=True)
+            render_output = container.render()
+            self.assertEqual(render_output, expected_container_data, msg=filename)
+
     def test_rapidproprev_container_triggers(self):
         # Previous versions of RapidPro had a different trigger formats.
         # Check compatibility in this test.
@@ -3,9 +3,11 @@ import unittest
 from pydantic import create_model, BaseModel
 
 from rpft.parsers.common.model_inference import (
+    clear_model_cache,
     get_value_for_type,
     infer_default_value,
     infer_type,
+    model_cache_info,
     model_from_headers,
     parse_header_annotations,
     type_from_string,
@@ -148,3 +150,26 @@ class TestModelInference(unittest.TestCase):
                 field1=(List[MySubmodel], [MySubmodel(), MySubmodel()]),
             ),
         )
+
+    def test_models_are_cached_by_name_and_headers(self):
+        clear_model_cache()
+
+        model = model_from_headers("mymodel", ["field1", "field2:int"])
+
+        self.assertIs(model_from_headers("mymodel", ("field1", "field2:int")), model)
+        self.assertIsNot(model_from_headers("other", ["field1", "field2:int"]), model)
+        self.assertIsNot(model_from_headers("mymodel", ["field1"]), model)
+        self.assertEqual(model_cache_info().hits, 1)
+        self.assertEqual(model_cache_info().misses, 3)
+
+    def test_cached_models_are_shared_by_normalised_headers(self):
+        clear_model_cache()
+
+        model = model_from_headers("mymodel", ["field1", "obj.a"])
+
+        self.assertIs(model_from_headers("mymodel", [" field1 ", " obj.a "]), model)
+        self.assertEqual(list(model.model_fields), ["field1", "obj"])
+        self.assertEqual(
+            list(model_from_headers("mymodel", ["Field1", "obj.a"]).model_fields),
+            ["Field1", "obj"],
+        )
@@ -102,6 +102,18 @@ class TestRowDataSheet(unittest.TestCase):
     def test_to_tablib_AC(self):
         self.compare_tablibs([rowA, rowC], contentAC_exp)
 
+    def test_rows_are_unparsed_once(self):
+        calls = []
+
+        class CountingRowParser(MockRowParser):
+            def unparse_row(self, row, target_headers=set(), excluded_headers=set()):
+                calls.append(row)
+                return row
+
+        RowDataSheet(CountingRowParser(), [rowA, rowB, rowC]).convert_to_tablib()
+
+        self.assertEqual(calls, [rowA, rowB, rowC])
+
     def test_export_csv(self):
         # Not our job to test the contents (tablib's responsibility),
         # but we want to make sure here the export function works.
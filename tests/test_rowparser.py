@@ -1,7 +1,14 @@
 import unittest
 from typing import List
 
-from rpft.parsers.common.rowparser import ParserModel, RowParser
+from rpft.parsers.common.cellparser import CellParser
+from rpft.parsers.common.rowparser import (
+    ParserModel,
+    RowParser,
+    RowTemplate,
+    get_parse_plan,
+    parse_plan_cache_info,
+)
 from tests.mocks import MockCellParser
 
 
@@ -192,3 +199,57 @@ class TestRowParserDict(unittest.TestCase):
         for inp in inputs:
             out = self.parser.parse_row(inp)
             self.assertEqual(out, self.onetwoModel)
+
+
+class TestRowTemplate(unittest.TestCase):
+    def setUp(self):
+        self.parser = RowParser(MyModel, CellParser())
+
+    def test_templated_cells_are_rendered_for_each_context(self):
+        row = RowTemplate(
+            {
+                "str_field": "{{name}}",
+                "list_field": "a;b",
+                "submodel_field.str_field": "x",
+            }
+        )
+
+        first = self.parser.parse_row(row, {"name": "first"})
+        second = self.parser.parse_row(row, {"name": "second"})
+
+        self.assertEqual(first.str_field, "first")
+        self.assertEqual(second.str_field, "second")
+        self.assertEqual(second.list_field, ["a", "b"])
+        self.assertEqual(second.submodel_field.str_field, "x")
+
+    def test_rows_without_templates_are_parsed_once(self):
+        row = RowTemplate({"str_field": "plain", "list_field.*": "a;b"})
+
+        first = self.parser.parse_row(row, {"name": "first"})
+        second = self.parser.parse_row(row, {"name": "second"})
+
+        self.assertIs(first, second)
+        self.assertEqual(first.list_field, ["a", "b"])
+
+
+class TestParsePlan(unittest.TestCase):
+    def test_plan_is_shared_between_rows_with_same_headers(self):
+        get_parse_plan.cache_clear()
+        headers = ["str_field", "submodel_field.list_field", "list_field.*"]
+
+        for i in range(3):
+            out = RowParser(MyModel, CellParser()).parse_row(
+                dict(zip(headers, [f"s{i}", "a;b", "c;d"]))
+            )
+
+            self.assertEqual(out.str_field, f"s{i}")
+            self.assertEqual(out.submodel_field.list_field, ["a", "b"])
+            self.assertEqual(out.list_field, ["c", "d"])
+
+        info = parse_plan_cache_info()
+        self.assertEqual(info.misses, 1)
+        self.assertEqual(info.hits, 2)
+
+    def test_missing_field_is_reported(self):
+        with self.assertRaisesRegex(ValueError, "Field missing doesn't exist"):
+            RowParser(MyModel, CellParser()).parse_row({"submodel_field.missing": "x"})
@@ -1,6 +1,17 @@
+import tempfile
+from pathlib import Path
 from unittest import TestCase
 
-from rpft.parsers.sheets import CSVSheetReader, Sheet, XLSXSheetReader, JSONSheetReader
+from tablib import Dataset
+
+from rpft.parsers.sheets import (
+    CSVSheetReader,
+    DatasetSheetReader,
+    Sheet,
+    XLSXSheetReader,
+    JSONSheetReader,
+)
+from rpft.parsers.snapshot import SnapshotError, SnapshotSheetReader, write_snapshot
 from tests import TESTS_ROOT
 
 
@@ -23,14 +34,36 @@ class Base:
             self.assertIsNone(self.reader.get_sheet("missing"))
 
 
-class TestCsvSheetReader(Base.SheetReaderTestCase):
+class LazyBase:
+    class LazySheetReaderTestCase(Base.SheetReaderTestCase):
+        def test_sheets_are_listed_without_being_loaded(self):
+            self.assertIn("my_basic_flow", self.reader.sheets)
+            self.assertFalse(
+                any(self.reader.sheets.is_loaded(name) for name in self.reader.sheets)
+            )
+
+        def test_sheets_are_loaded_on_first_access(self):
+            sheet = self.reader.get_sheet("my_basic_flow")
+
+            self.assertEqual(
+                [
+                    name
+                    for name in self.reader.sheets
+                    if self.reader.sheets.is_loaded(name)
+                ],
+                ["my_basic_flow"],
+            )
+            self.assertIs(self.reader.get_sheet("my_basic_flow"), sheet)
+
+
+class TestCsvSheetReader(LazyBase.LazySheetReaderTestCase):
     def setUp(self):
         path = str(TESTS_ROOT / "input/example1/csv_workbook")
         self.reader = CSVSheetReader(path=path)
         self.expected_reader_name = path
 
 
-class TestXlsxSheetReader(Base.SheetReaderTestCase):
+class TestXlsxSheetReader(LazyBase.LazySheetReaderTestCase):
     def setUp(self):
         filename = str(TESTS_ROOT / "input/example1/content_index.xlsx")
         self.reader = XLSXSheetReader(filename=filename)
@@ -42,3 +75,94 @@ class TestJsonSheetReader(Base.SheetReaderTestCase):
         filename = str(TESTS_ROOT / "input/example1/content_index.json")
         self.reader = JSONSheetReader(filename=filename)
         self.expected_reader_name = filename
+
+
+class TestSnapshotSheetReader(LazyBase.LazySheetReaderTestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+        self.source = XLSXSheetReader(
+            str(TESTS_ROOT / "input/example1/content_index.xlsx")
+        )
+        filename = str(Path(self.temp_dir.name) / "content_index.snapshot")
+        self.reader = self.write_and_read(self.source, filename)
+        self.expected_reader_name = filename
+
+    def write_and_read(self, reader, filename):
+        with open(filename, "wb") as f:
+            write_snapshot(reader, f)
+
+        reader = SnapshotSheetReader(filename)
+        self.addCleanup(reader.close)
+
+        return reader
+
+    def test_snapshot_contains_all_sheets(self):
+        self.assertEqual(list(self.reader.sheets), list(self.source.sheets))
+
+        for name, sheet in self.source.sheets.items():
+            table = self.reader.get_sheet(name).table
+            self.assertEqual(table.headers, sheet.table.headers)
+            self.assertEqual(table.dict, sheet.table.dict)
+
+    def test_values_are_preserved(self):
+        source = DatasetSheetReader(
+            [
+                Dataset(
+                    ("ünïcödé", None, ""),
+                    ("a|b;c", "line 1\nline 2", "ünïcödé"),
+                    headers=["col1", "col2", "col3"],
+                    title="values",
+                ),
+                Dataset(title="empty"),
+            ],
+            "datasets",
+        )
+
+        reader = self.write_and_read(
+            source, str(Path(self.temp_dir.name) / "values.snapshot")
+        )
+
+        self.assertEqual(
+            reader.get_sheet("values").table.dict,
+            source.get_sheet("values").table.dict,
+        )
+        self.assertEqual(reader.get_sheet("empty").table.dict, [])
+
+    def test_snapshot_is_released_once_all_sheets_are_loaded(self):
+        *names, last = self.reader.sheets
+
+        for name in names:
+            self.reader.get_sheet(name)
+
+        self.assertIsNotNone(self.reader._buffer)
+
+        self.reader.get_sheet(last)
+
+        self.assertIsNone(self.reader._buffer)
+
+    def test_closed_snapshot_can_be_overwritten(self):
+        filename = self.expected_reader_name
+
+        with SnapshotSheetReader(filename) as reader:
+            sheet = reader.get_sheet("my_basic_flow")
+
+        self.assertRaises(SnapshotError, reader.get_sheet, "content_index")
+        self.assertIs(reader.get_sheet("my_basic_flow"), sheet)
+
+        self.reader.close()
+        Path(filename).unlink()
+        self.write_and_read(self.source, filename)
+
+    def test_only_snapshots_can_be_processed(self):
+        self.assertTrue(SnapshotSheetReader.can_process(self.expected_reader_name))
+        self.assertFalse(
+            SnapshotSheetReader.can_process(
+                str(TESTS_ROOT / "input/example1/content_index.xlsx")
+            )
+        )
+        self.assertFalse(
+            SnapshotSheetReader.can_process(
+                str(TESTS_ROOT / "input/example1/csv_workbook")
+            )
+        )
@@ -59,6 +59,22 @@ class TestSheetParser(TestCase):
             },
         )
 
+    def test_scopes(self):
+        context = {"key": "outer"}
+        parser = SheetParser(
+            tablib.Dataset(("row1f1",), ("row2f1",), headers=("field1",)),
+            row_parser=MockRowParser(),
+            context=context,
+        )
+
+        parser.push_scope()
+        parser.add_to_context("key", "inner")
+        self.assertEqual(parser.parse_next_row()["context"], {"key": "inner"})
+
+        parser.pop_scope()
+        self.assertEqual(parser.parse_next_row()["context"], {"key": "outer"})
+        self.assertEqual(context, {"key": "outer"})
+
     def test_parse_all(self):
         rows = self.parser.parse_all()
 
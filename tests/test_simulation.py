@@ -0,0 +1,289 @@
+from unittest import TestCase
+
+import tablib
+
+from rpft.parsers.creation.flowparser import FlowParser
+from rpft.rapidpro.models.containers import RapidProContainer
+from rpft.rapidpro.simulation import (
+    CompiledContainer,
+    CompiledFlow,
+    Context,
+    explore_flow,
+)
+
+
+def send_msg_node(uuid, text, destination_uuid=None):
+    return {
+        "uuid": uuid,
+        "actions": [{"type": "send_msg", "text": text}],
+        "exits": [{"uuid": f"{uuid}-exit", "destination_uuid": destination_uuid}],
+    }
+
+
+def switch_flow(cases):
+    """
+    Flow waiting for input, then sending the index of the first matching case, or
+    'other' if none match.
+    """
+    nodes = [
+        {
+            "uuid": "switch",
+            "actions": [],
+            "router": {
+                "type": "switch",
+                "operand": "@input.text",
+                "wait": {"type": "msg"},
+                "cases": [
+                    {
+                        "uuid": f"case{i}",
+                        "type": case_type,
+                        "arguments": arguments,
+                        "category_uuid": f"category{i}",
+                    }
+                    for i, (case_type, arguments) in enumerate(cases)
+                ],
+                "categories": [
+                    {"uuid": f"category{i}", "exit_uuid": f"exit{i}"}
+                    for i in range(len(cases))
+                ]
+                + [{"uuid": "other", "exit_uuid": "exit_other"}],
+                "default_category_uuid": "other",
+            },
+            "exits": [
+                {"uuid": f"exit{i}", "destination_uuid": f"msg{i}"}
+                for i in range(len(cases))
+            ]
+            + [{"uuid": "exit_other", "destination_uuid": "msg_other"}],
+        }
+    ]
+    nodes += [send_msg_node(f"msg{i}", str(i)) for i in range(len(cases))]
+    nodes.append(send_msg_node("msg_other", "other"))
+
+    return {"nodes": nodes}
+
+
+class TestCompiledFlow(TestCase):
+    def assert_replies(self, flow, inputs, expected):
+        self.assertEqual(
+            [
+                outputs[-1][1]
+                for outputs in flow.traverse_all(
+                    Context(inputs=[value]) for value in inputs
+                )
+            ],
+            expected,
+        )
+
+    def test_case_matchers(self):
+        flow = CompiledFlow(
+            switch_flow(
+                [
+                    ("has_any_word", ["yes yeah"]),
+                    ("has_phrase", ["no way"]),
+                    ("has_number_between", ["1", "10"]),
+                    ("has_number_gt", ["100"]),
+                    ("has_email", []),
+                    ("has_only_text", ["Exact"]),
+                ]
+            )
+        )
+
+        self.assert_replies(
+            flow,
+            ["Oh YEAH", "NO WAY!", "5", "101", "me@example.com", "Exact", "exact"],
+            ["0", "1", "2", "3", "4", "5", "other"],
+        )
+
+    def test_invalid_case_raises_when_evaluated(self):
+        flow = CompiledFlow(
+            switch_flow([("has_phrase", ["hi"]), ("has_text", ["unexpected"])])
+        )
+
+        self.assert_replies(flow, ["hi"], ["0"])
+
+        with self.assertRaises(ValueError):
+            flow.traverse(Context(inputs=["hello"]))
+
+    def test_context_is_not_consumed(self):
+        flow = CompiledFlow(switch_flow([("has_phrase", ["hi"])]))
+        context = Context(inputs=["hi"])
+
+        self.assertEqual(flow.traverse(context), flow.traverse(context))
+        self.assertEqual(context.inputs, ["hi"])
+
+    def test_running_out_of_inputs(self):
+        flow = CompiledFlow(switch_flow([("has_phrase", ["hi"])]))
+
+        with self.assertRaises(IndexError):
+            flow.traverse(Context())
+
+    def test_step_limit_stops_cycles(self):
+        flow = CompiledFlow(
+            {
+                "nodes": [
+                    send_msg_node("a", "A", "b"),
+                    send_msg_node("b", "B", "a"),
+                ]
+            },
+            max_steps=50,
+        )
+
+        with self.assertRaises(ValueError):
+            flow.traverse(Context())
+
+    def test_find_final_destination(self):
+        flow = CompiledFlow(
+            {
+                "nodes": [
+                    send_msg_node("a", "A", "b"),
+                    send_msg_node("b", "B", "outside"),
+                ]
+            }
+        )
+
+        self.assertEqual(flow.find_final_destination("a", Context()), "outside")
+
+
+class TestExploreFlow(TestCase):
+    def test_branches_into_all_categories(self):
+        flow = switch_flow([("has_phrase", ["hi"]), ("has_number_gt", ["5"])])
+        flow["nodes"].append(send_msg_node("orphan", "Never sent"))
+
+        coverage = explore_flow(flow)
+
+        self.assertEqual(
+            coverage.visit_counts,
+            {
+                "switch": 1,
+                "msg0": 1,
+                "msg1": 1,
+                "msg_other": 1,
+                "orphan": 0,
+            },
+        )
+        self.assertEqual(coverage.unreachable_nodes, ["orphan"])
+        self.assertEqual(coverage.path_count, 4)
+        self.assertEqual(coverage.dead_end_exits, [])
+        self.assertEqual(coverage.invalid_destinations, [])
+
+    def test_paths_are_counted_through_shared_nodes(self):
+        flow = switch_flow([("has_phrase", ["hi"]), ("has_phrase", ["hello"])])
+        for node in flow["nodes"][1:]:
+            node["exits"][0]["destination_uuid"] = "end"
+        flow["nodes"].append(send_msg_node("end", "Bye", "missing"))
+
+        coverage = explore_flow(flow)
+
+        self.assertEqual(coverage.visit_counts["end"], 3)
+        self.assertEqual(coverage.path_count, 4)
+        self.assertEqual(coverage.invalid_destinations, [("end", "missing")])
+
+    def test_cycles_end_paths(self):
+        coverage = explore_flow(
+            {
+                "nodes": [
+                    send_msg_node("a", "A", "b"),
+                    send_msg_node("b", "B", "a"),
+                ]
+            }
+        )
+
+        self.assertEqual(coverage.visit_counts, {"a": 1, "b": 1})
+        self.assertEqual(coverage.path_count, 0)
+
+    def test_groups_added_on_path_decide_group_splits(self):
+        container = RapidProContainer()
+        table = (
+            "row_id,type,from,condition,message_text\n"
+            "1,add_to_group,start,,member\n"
+            "2,split_by_group,1,,member\n"
+            ",send_message,2,member,In group\n"
+            ",send_message,2,,Not in group\n"
+        )
+        FlowParser(container, "groups", tablib.import_set(table, format="csv")).parse()
+        container.update_global_uuids()
+        flow = container.render()["flows"][0]
+
+        coverage = explore_flow(flow)
+
+        self.assertEqual(coverage.path_count, 1)
+        self.assertEqual(len(coverage.unreachable_nodes), 1)
+
+
+class TestCompiledContainer(TestCase):
+    def setUp(self):
+        container = RapidProContainer()
+        for name, table in [
+            (
+                "parent",
+                "row_id,type,from,condition,message_text\n"
+                ",send_message,start,,Start\n"
+                "1,start_new_flow,,,child\n"
+                ",send_message,1,completed,Done\n"
+                ",send_message,1,expired,Gave up\n",
+            ),
+            (
+                "child",
+                "row_id,type,from,condition,message_text\n"
+                "1,wait_for_response,start,,\n"
+                ",send_message,1,yes,Great\n"
+                ",send_message,1,,Oh\n",
+            ),
+        ]:
+            FlowParser(container, name, tablib.import_set(table, format="csv")).parse()
+        container.update_global_uuids()
+        self.chatbot = CompiledContainer(container.render())
+
+    def test_enter_flow_and_resume_parent(self):
+        self.assertEqual(
+            self.chatbot.traverse("parent", Context(inputs=["yes"])),
+            [
+                ("send_msg", "Start"),
+                ("enter_flow", "child"),
+                ("send_msg", "Great"),
+                ("send_msg", "Done"),
+            ],
+        )
+
+    def test_expired_child_flow(self):
+        self.assertEqual(
+            self.chatbot.traverse("parent", Context(inputs=[None])),
+            [
+                ("send_msg", "Start"),
+                ("enter_flow", "child"),
+                ("send_msg", "Gave up"),
+            ],
+        )
+
+    def test_batch_matches_individual_traversals(self):
+        contexts = [
+            Context(inputs=[value], group_names=groups)
+            for value in ["yes", "no", None, "yes"]
+            for groups in [[], ["group"]]
+        ]
+
+        self.assertEqual(
+            self.chatbot.traverse_all("parent", contexts),
+            [self.chatbot.traverse("parent", context) for context in contexts],
+        )
+
+    def test_batch_with_unhashable_variables(self):
+        flow = switch_flow([("has_only_text", ["red"])])
+        router = flow["nodes"][0]["router"]
+        router["operand"] = "@fields.colour"
+        del router["wait"]
+        flow.update(uuid="colours", name="colours")
+        chatbot = CompiledContainer({"flows": [flow]})
+        contexts = [
+            Context(variables={"@fields.colour": colour})
+            for colour in ["red", ["red"], {"red": True}, "blue", ["red"]]
+        ]
+
+        self.assertEqual(
+            chatbot.traverse_all("colours", contexts),
+            [[("send_msg", "0")]] + [[("send_msg", "other")]] * 4,
+        )
+
+    def test_unknown_flow(self):
+        with self.assertRaises(ValueError):
+            self.chatbot.traverse("missing", Context())
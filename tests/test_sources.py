@@ -2,7 +2,9 @@ from unittest import TestCase
 
 from benedict import benedict
 from rpft.parsers.common.rowparser import ParserModel
-from rpft.sources import JSONDataSource
+from rpft.parsers.creation.globalrowmodels import SurveyQuestionRowModel
+from rpft.parsers.creation.surveyparser import SurveyQuestion
+from rpft.sources import IndexedJSONObject, JSONDataSource
 
 
 class TestModel(ParserModel):
@@ -55,6 +57,59 @@ class TestJSONDataSource(TestCase):
             ],
         )
 
+    def test_instances_are_created_once_for_each_key_and_model(self):
+        self.source.objs = [({"o1": [{"k1": "v1"}]}, "data")]
+        first, *_ = self.source.get("o1", TestModel)
+        second, *_ = self.source.get("o1", TestModel)
+        (third, *_), *_ = self.source.get_all("o1", TestModel)
+
+        self.assertEqual(first, [TestModel(k1="v1")])
+        self.assertIsNot(first, second)
+        self.assertIs(first[0], second[0])
+        self.assertIs(first[0], third[0])
+        self.assertEqual(type(self.source.get("o1")[0][0]), benedict)
+
+    def test_survey_questions_do_not_modify_shared_instances(self):
+        question = {
+            "ID": "first",
+            "type": "text",
+            "messages": [{"text": "Question?"}],
+            "variable": "var",
+        }
+        self.source.objs = [({"q": [question]}, "data")]
+        [row], *_ = self.source.get("q", SurveyQuestionRowModel)
+        question = SurveyQuestion("Survey", row)
+        question.initialize_survey_variables("survey")
+        question.apply_prefix_renaming("prefix_")
+
+        [row], *_ = self.source.get("q", SurveyQuestionRowModel)
+
+        self.assertEqual(question.data_row.variable, "prefix_var")
+        self.assertEqual(row.variable, "var")
+        self.assertEqual(row.completion_variable, "")
+
+    def test_sheets_are_tabulated_once(self):
+        self.source.objs = [({"o1": [{"k1": "v1"}]}, "data")]
+
+        self.assertIs(
+            self.source._get_sheet_or_die("o1"), self.source._get_sheet_or_die("o1")
+        )
+
+
+class TestIndexedJSONObject(TestCase):
+    def test_values_are_decoded_by_key(self):
+        obj = IndexedJSONObject(
+            '{"o1": [{"k1": "v1 [{\\"\\"}]"}], "o2": {"k": [1, 2.5, null]},'
+            ' "o3": "[", "o1": []}'
+        )
+
+        self.assertEqual(list(obj), ["o1", "o2", "o3"])
+        self.assertEqual(obj["o1"], [])
+        self.assertEqual(obj["o2"], {"k": [1, 2.5, None]})
+        self.assertEqual(obj["o3"], "[")
+        self.assertNotIn("o4", obj)
+        self.assertRaises(KeyError, obj.__getitem__, "o4")
+
 
 class TestLegacySheetBasedRetrieval(TestCase):
 
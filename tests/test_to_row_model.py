@@ -457,6 +457,23 @@ class TestFlowContainer(TestToRowModels):
         row_models = container.to_rows()
         self.compare_row_models_without_uuid(row_models, [row_data1, row_data2])
 
+    def test_long_chain_of_nodes(self):
+        container = FlowContainer("test_flow")
+        nodes = [BasicNode() for _ in range(5000)]
+        for i, node in enumerate(nodes):
+            node.add_action(SendMessageAction("Same text"))
+            if i + 1 < len(nodes):
+                node.update_default_exit(nodes[i + 1].uuid)
+            container.add_node(node)
+
+        row_models = container.to_rows()
+
+        self.assertEqual(len(row_models), 5000)
+        self.assertEqual(row_models[0].row_id, "msg.Same_text")
+        self.assertEqual(row_models[1].row_id, "msg.Same_text.1")
+        self.assertEqual(row_models[-1].row_id, "msg.Same_text.4999")
+        self.assertEqual(row_models[-1].edges[0].from_, "msg.Same_text.4998")
+
 
 class TestRowModelExport(unittest.TestCase):
     def test_row_model_export(self):
@@ -1,11 +1,16 @@
+import json
+from io import StringIO
 from unittest import TestCase
 
 from rpft.parsers.sheets import DatasetSheetReader
 from rpft.parsers.universal import (
     bookify,
+    dump_entries,
     parse_cell,
     parse_table,
     parse_tables,
+    stream_book,
+    stream_tables,
     stringify,
     tabulate,
 )
@@ -251,6 +256,21 @@ class TestUniversalToWorkbook(TestCase):
             "Input data should not be mutated",
         )
 
+    def test_tables_are_streamed_from_json(self):
+        data = {
+            "group1": [{"a": "a1", "b": "b1"}],
+            "_idems": {"tabulate": {"group2": {"headers": ["B", "A"]}}},
+            "group2": [{"A": "A1", "B": "B1"}],
+        }
+        meta_last = {
+            "group1": data["group1"],
+            "group2": data["group2"],
+            "_idems": data["_idems"],
+        }
+
+        for obj in [data, meta_last]:
+            self.assertEqual(list(stream_book(json.dumps(obj))), bookify(obj))
+
 
 class TestConvertWorkbookToUniversal(TestCase):
 
@@ -272,6 +292,39 @@ class TestConvertWorkbookToUniversal(TestCase):
             ["table1", "table2"],
         )
 
+    def test_sheets_with_dotted_titles_are_combined(self):
+        workbook = DatasetSheetReader(
+            [
+                Dataset(("a1",), headers=("a",), title="group.table1"),
+                Dataset(title="empty"),
+                Dataset(("b1",), headers=("b",), title="group.table2"),
+            ],
+            "test",
+        )
+
+        nested = parse_tables(workbook)
+
+        self.assertEqual(
+            nested,
+            {
+                "_idems": {
+                    "tabulate": {
+                        "group": {
+                            "table1": {"headers": ["a"]},
+                            "table2": {"headers": ["b"]},
+                        },
+                    },
+                },
+                "group": {"table1": [{"a": "a1"}], "table2": [{"b": "b1"}]},
+                "empty": [],
+            },
+        )
+
+        handle = StringIO()
+        dump_entries(stream_tables(workbook), handle, indent=2)
+
+        self.assertEqual(handle.getvalue(), json.dumps(nested, indent=2))
+
 
 class TestConvertTableToNested(TestCase):
 
@@ -345,6 +398,20 @@ class TestConvertTableToNested(TestCase):
             {"k1": [[["k2", 2], ["k3", False]], [["k4", "v4"], ["k5", True]]]},
         )
 
+    def test_numbered_columns_are_list_items(self):
+        parsed = parse_table(
+            headers=["list.2", "list.1.k"],
+            rows=[["b", "a"]],
+        )
+
+        self.assertEqual(parsed["table"][0]["list"], [{"k": "a"}, "b"])
+
+    def test_title_using_dot_notation_is_nested(self):
+        parsed = parse_table(title="group.sheet", headers=["a"], rows=[["1"]])
+
+        self.assertEqual(parsed["group"]["sheet"], [{"a": 1}])
+        self.assertEqual(parsed["group.sheet"], [{"a": 1}])
+
 
 class TestCellConversion(TestCase):
 